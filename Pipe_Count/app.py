@@ -1,7 +1,7 @@
 import streamlit as st
 import cv2
 import numpy as np
-from ultralytics import YOLO
+from ultralytics.engine.pool import MODEL_POOL
 from PIL import Image
 import io
 
@@ -19,10 +19,11 @@ st.write("カメラで撮影または画像をアップロードして、パイ
 # モデルのパスを設定（環境に応じて変更してください）
 MODEL_PATH = './my_trained_model.pt'  # ローカルに配置
 
-# セッション状態の初期化
+# モデルの読み込み（プロセス内の全セッションで共有）
 if 'model' not in st.session_state:
     try:
-        st.session_state.model = YOLO(MODEL_PATH)
+        MODEL_POOL.get(MODEL_PATH)
+        st.session_state.model = MODEL_PATH
         st.success("モデルを正常に読み込みました！")
     except Exception as e:
         st.error(f"モデルの読み込みに失敗しました: {e}")
@@ -68,7 +69,7 @@ if image is not None:
         with st.spinner("検出中..."):
             try:
                 # YOLOで推論
-                results = st.session_state.model(image_bgr)
+                results = MODEL_POOL.predict(st.session_state.model, image_bgr)
                 
                 # 検出された本数を取得
                 detected_count = len(results[0].boxes) if results[0].boxes is not None else 0
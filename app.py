@@ -6,13 +6,12 @@
 import gradio as gr
 import cv2
 import tempfile
-from ultralytics import YOLO
+from ultralytics.engine.pool import MODEL_POOL
 
 
 def yolov12_inference(image, video, model_id, image_size, conf_threshold):
-    model = YOLO(model_id)
     if image:
-        results = model.predict(source=image, imgsz=image_size, conf=conf_threshold)
+        results = MODEL_POOL.predict(model_id, source=image, imgsz=image_size, conf=conf_threshold)
         annotated_image = results[0].plot()
         return annotated_image[:, :, ::-1], None
     else:
@@ -29,12 +28,13 @@ def yolov12_inference(image, video, model_id, image_size, conf_threshold):
         output_video_path = tempfile.mktemp(suffix=".webm")
         out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'vp80'), fps, (frame_width, frame_height))
 
+        predictor = MODEL_POOL.predictor(model_id, imgsz=image_size, conf=conf_threshold)  # reused for every frame
         while cap.isOpened():
             ret, frame = cap.read()
             if not ret:
                 break
 
-            results = model.predict(source=frame, imgsz=image_size, conf=conf_threshold)
+            results = MODEL_POOL.run(predictor, frame)
             annotated_frame = results[0].plot()
             out.write(annotated_frame)
 
@@ -160,6 +160,705 @@ def test_predict_grey_and_4ch():
         f.unlink()  # cleanup
 
 
+def test_predict_pipeline():
+    """Test that pipelined prediction returns the same results in the same order as serial prediction."""
+    model = YOLO(CFG)
+    source = [ASSETS / "bus.jpg", ASSETS / "zidane.jpg"] * 2
+    serial = model(source, imgsz=64, batch=2, conf=0.0)
+    pipelined = model(source, imgsz=64, batch=2, conf=0.0, pipeline=2)
+    assert len(serial) == len(pipelined)
+    for a, b in zip(serial, pipelined):
+        assert a.path == b.path
+        assert torch.equal(a.boxes.data, b.boxes.data)
+    assert {"inference_stall", "postprocess_queue"} <= pipelined[-1].speed.keys()
+
+
+@pytest.mark.parametrize("auto, scaleFill, center", [(False, False, True), (True, False, True), (False, True, False)])
+def test_batch_letterbox(auto, scaleFill, center):
+    """Test the batched torch letterbox is bit-identical to LetterBox on CPU, for down and upscaled images."""
+    from ultralytics.data.augment import BatchLetterBox, LetterBox
+
+    rng = np.random.default_rng(0)
+    for shape in (480, 640), (37, 101), (1080, 1920):
+        im = [rng.integers(0, 256, (*shape, 3), dtype=np.uint8) for _ in range(2)]
+        kwargs = dict(new_shape=(320, 320), auto=auto, scaleFill=scaleFill, center=center)
+        expected = np.stack([LetterBox(**kwargs)(image=x) for x in im])[..., ::-1].transpose(0, 3, 1, 2)
+        assert np.array_equal(BatchLetterBox(**kwargs)(im, device="cpu").numpy(), expected)
+
+    model = YOLO(CFG)
+    results = model([ASSETS / "bus.jpg", ASSETS / "zidane.jpg"], imgsz=64, conf=0.0)
+    batched = model([ASSETS / "bus.jpg", ASSETS / "zidane.jpg"], imgsz=64, conf=0.0, torch_letterbox=True)
+    assert all(torch.equal(a.boxes.data, b.boxes.data) for a, b in zip(results, batched))
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not hasattr(torch, "compile"), reason="torch.compile requires torch>=2.0")
+def test_predict_compile():
+    """Test compile=True predictions match eager predictions, caching one compiled graph per input shape."""
+    model = YOLO(CFG)
+    source = [ASSETS / "bus.jpg", ASSETS / "zidane.jpg"]
+    eager = model(source, imgsz=64, conf=0.0)
+    model.predictor = None  # set up a new compiled AutoBackend
+    compiled = model(source, imgsz=64, conf=0.0, compile=True)
+    assert all(torch.allclose(a.boxes.data, b.boxes.data, atol=1e-3) for a, b in zip(eager, compiled))
+    backend = model.predictor.model
+    assert backend.compile_mode and callable(backend.compile)  # nn.Module.compile() is not shadowed
+    assert list(backend.compiled) == [((2, 3, 64, 64), torch.float32)]  # list sources run as one batch
+    backend.MAX_COMPILED_SHAPES = 1  # new shapes fall back to eager
+    assert backend.compile_shape(torch.zeros(1, 3, 96, 96)) is None
+    assert len(model(source, imgsz=96, conf=0.0)) == 2
+    assert len(backend.compiled) == 1  # uncompiled shapes are not cached
+
+
+def test_predict_tiles():
+    """Test sliced inference returns boxes inside each original image and merges duplicates across tile seams."""
+    from ultralytics.data.split_dota import get_windows
+
+    model = YOLO(CFG)
+    results = model([ASSETS / "bus.jpg", ASSETS / "zidane.jpg"], imgsz=160, tile=320, tile_batch=4, conf=0.0)
+    assert model.predictor.tiles == sum(len(get_windows(r.orig_shape, (320,), (64,))) for r in results)
+    for r in results:
+        assert len(r.boxes) and (r.boxes.xyxy[:, 2:] <= torch.tensor(r.orig_shape[::-1])).all()
+
+    # One object seen by every overlapping 320 pixel tile that contains it merges into a single box
+    box = torch.tensor([290.0, 100.0, 310.0, 140.0])
+    preds = []
+    for x0, y0, x1, y1 in model.predictor.get_tiles((400, 600)):
+        inside = x0 <= box[0] and y0 <= box[1] and box[2] <= x1 and box[3] <= y1
+        offset = torch.tensor([x0, y0, x0, y0], dtype=torch.float32)
+        preds.append(torch.cat([box - offset, torch.tensor([0.9, 0.0])])[None] if inside else torch.zeros(0, 6))
+    merged = model.predictor.merge_tiles(preds, (320, 320), [np.zeros((400, 600, 3), dtype=np.uint8)])
+    assert sum(len(p) for p in preds) > 1 and len(merged[0]) == 1 and torch.equal(merged[0][0, :4], box)
+
+    with pytest.raises(ValueError):
+        model(ASSETS / "bus.jpg", imgsz=160, tile=320, tile_overlap=1.0)
+
+
+def test_inference_server():
+    """Test micro-batched predictions from concurrent threads, asyncio tasks and the local HTTP endpoint."""
+    import asyncio
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ultralytics.engine.server import InferenceServer
+
+    with InferenceServer(YOLO(CFG), max_batch=4, max_wait_ms=50, imgsz=64) as server:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(server.predict, [SOURCE] * 8))
+        assert all(r.path == str(SOURCE) for r in results)
+
+        async def predict_all():
+            return await asyncio.gather(*(server.apredict(Image.open(SOURCE)) for _ in range(4)))
+
+        assert len(asyncio.run(predict_all())) == 4
+
+        url = server.serve()
+        request = urllib.request.Request(f"{url}/predict", data=SOURCE.read_bytes(), method="POST")
+        assert isinstance(json.loads(urllib.request.urlopen(request).read()), list)
+        stats = json.loads(urllib.request.urlopen(f"{url}/stats").read())
+    assert stats["images"] == 13
+    assert sum(stats["queue_latency"].values()) == 13
+    assert max(int(k) for k in stats["batch_sizes"]) <= 4
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_model_pool():
+    """Test ModelPool caches warm backends per key, shares weights and matches regular predictions."""
+    import pickle
+
+    from ultralytics.engine.pool import ModelPool
+
+    model = YOLO(CFG)
+    model.save(TMP / "pool.pt")
+    pool = ModelPool()
+    backend = pool.get(TMP / "pool.pt", imgsz=64)
+    assert pool.get(TMP / "pool.pt", imgsz=64) is backend
+    assert pool.get(TMP / "pool.pt", imgsz=96).model is backend.model  # same weights, different warmup key
+    assert pool.stats()["backends"] == 2 and pool.stats()["shared_bytes"] > 0
+
+    results = pool.predict(TMP / "pool.pt", SOURCE, imgsz=64, conf=0.0)
+    expected = YOLO(TMP / "pool.pt")(SOURCE, imgsz=64, conf=0.0)
+    assert torch.allclose(results[0].boxes.data, expected[0].boxes.data, atol=1e-4)
+
+    predictor = pool.predictor(TMP / "pool.pt", imgsz=96, conf=0.0)  # reused across calls, i.e. video frames
+    assert len(pool.locks) == 1  # backends of every imgsz share the module, so they share its lock
+    assert len(pool.run(predictor, SOURCE)) == len(pool.run(predictor, SOURCE)) == 1
+
+    worker_pool = pickle.loads(pickle.dumps(pool))  # pickled state holds the hashes and shared CPU model only
+    assert not worker_pool.backends and len(worker_pool.modules) == 1
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_dataset_cache_mmap(monkeypatch):
+    """Test cache='mmap' packs pre-resized images into one shard that loads identically to per-file images."""
+    import os
+    import pickle
+    import shutil
+    import weakref
+
+    from ultralytics.data import YOLODataset, base
+    from ultralytics.data.shard import ImageShard, build_shards
+
+    shutil.rmtree(TMP / "shard", ignore_errors=True)
+    (TMP / "shard" / "labels").mkdir(parents=True)
+    (TMP / "shard" / "images").mkdir()
+    for f in "bus.jpg", "zidane.jpg":
+        shutil.copy(ASSETS / f, TMP / "shard" / "images" / f)
+        (TMP / "shard" / "labels" / f).with_suffix(".txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    kwargs = dict(img_path=str(TMP / "shard" / "images"), imgsz=96, augment=False, data={"names": {0: "person"}})
+    plain, dataset = YOLODataset(**kwargs), YOLODataset(**kwargs, cache="mmap")
+    shard = dataset.shard
+    assert shard.file.name == "images.rect96.shard" and not shard.verify(dataset.im_files)
+    for i in range(len(plain)):
+        a, b = plain.load_image(i), dataset.load_image(i)
+        assert np.array_equal(a[0], b[0]) and a[1:] == b[1:]
+    assert pickle.loads(pickle.dumps(shard)).files == shard.files  # spawned workers re-map the file
+
+    mtime = shard.file.stat().st_mtime_ns
+    assert YOLODataset(**kwargs, cache="mmap").shard.file.stat().st_mtime_ns == mtime  # reused
+    os.utime(dataset.im_files[0], ns=(mtime, mtime + 10**9))
+    assert shard.stale(dataset.im_files) == dataset.im_files[:1]
+    assert YOLODataset(**kwargs, cache="mmap").shard.file.stat().st_mtime_ns != mtime  # rebuilt
+
+    opened = []
+
+    class Shard(ImageShard):
+        def __init__(self, file):
+            super().__init__(file)
+            opened.append(weakref.ref(self))
+
+        @classmethod
+        def build(cls, *args, **kwargs):
+            assert opened and all(ref() is None for ref in opened)  # stale shard unmapped before it is replaced
+            return ImageShard.build(*args, **kwargs)
+
+    monkeypatch.setattr(base, "ImageShard", Shard)
+    os.utime(dataset.im_files[0], ns=(mtime, mtime + 2 * 10**9))
+    assert YOLODataset(**kwargs, cache="mmap").shard.file.stat().st_mtime_ns != mtime
+
+    data = TMP / "shard" / "data.yaml"
+    data.write_text(yaml.dump({"path": str(TMP / "shard"), "train": "images", "val": "images", "names": ["person"]}))
+    assert build_shards(str(data), imgsz=96, verify=True) == {"train": [], "val": []}
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_label_store():
+    """Test the columnar label cache round-trips labels, filters classes, reorders and migrates legacy caches."""
+    import pickle
+    import shutil
+
+    from ultralytics.data import YOLODataset
+    from ultralytics.data.dataset import DATASET_CACHE_VERSION
+    from ultralytics.data.labels import LabelStore, is_label_store
+    from ultralytics.data.utils import get_hash, save_dataset_cache_file
+
+    shutil.rmtree(TMP / "labels", ignore_errors=True)
+    (TMP / "labels" / "labels").mkdir(parents=True)
+    (TMP / "labels" / "images").mkdir()
+    polygons = {"bus.jpg": "0 0.1 0.1 0.4 0.1 0.4 0.5\n5 0.5 0.5 0.9 0.5 0.9 0.9 0.5 0.9\n", "zidane.jpg": ""}
+    for f, label in polygons.items():
+        shutil.copy(ASSETS / f, TMP / "labels" / "images" / f)
+        (TMP / "labels" / "labels" / f).with_suffix(".txt").write_text(label)
+    kwargs = dict(img_path=str(TMP / "labels" / "images"), imgsz=64, augment=False, task="segment")
+    dataset = YOLODataset(**kwargs, data={"names": {i: str(i) for i in range(6)}})
+    cache = TMP / "labels" / "labels.cache"
+    assert isinstance(dataset.labels, LabelStore) and is_label_store(cache)
+    labels = list(dataset.labels)
+    assert [len(lb["cls"]) for lb in labels] == [2, 0] and [len(s) for s in labels[0]["segments"]] == [3, 4]
+    assert pickle.loads(pickle.dumps(dataset.labels)).im_files == dataset.im_files  # workers re-map the file
+
+    filtered = dataset.labels.update(include_class=[5], single_cls=True)[0]
+    assert filtered["cls"].tolist() == [[0.0]] and np.array_equal(filtered["segments"][0], labels[0]["segments"][1])
+    reordered = dataset.labels.subset([1, 0])
+    assert reordered.im_files == dataset.im_files[::-1] and len(reordered[1]["bboxes"]) == 2
+
+    # Legacy pickled caches with a matching hash are converted in place without re-scanning
+    h = get_hash(dataset.label_files + dataset.im_files)
+    legacy = {"labels": labels, "hash": h, "results": dataset.labels.meta["results"], "msgs": []}
+    save_dataset_cache_file("", cache, legacy, DATASET_CACHE_VERSION)
+    assert not is_label_store(cache)
+    migrated = YOLODataset(**kwargs, data={"names": {i: str(i) for i in range(6)}})
+    assert is_label_store(cache) and migrated.label_scan == {"reused": 2, "verified": 0, "removed": 0}
+    assert all(np.array_equal(a["bboxes"], b["bboxes"]) for a, b in zip(migrated.labels, labels))
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_label_cache_incremental(monkeypatch):
+    """Test the label cache only re-verifies new or changed files, drops deleted ones and unmaps the old file."""
+    import os
+    import shutil
+    import weakref
+
+    from ultralytics.data import YOLODataset
+    from ultralytics.data.labels import LabelStore
+
+    root = TMP / "incremental"
+    shutil.rmtree(root, ignore_errors=True)
+    (root / "labels").mkdir(parents=True)
+    (root / "images").mkdir()
+    for i in range(4):
+        shutil.copy(ASSETS / "bus.jpg", root / "images" / f"{i}.jpg")
+        (root / "labels" / f"{i}.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    (root / "images" / "bad.jpg").write_bytes(b"not an image")
+    kwargs = dict(img_path=str(root / "images"), imgsz=64, augment=False, data={"names": {0: "person"}})
+
+    dataset = YOLODataset(**kwargs)
+    assert dataset.label_scan == {"reused": 0, "verified": 5, "removed": 0} and len(dataset.labels) == 4
+    assert YOLODataset(**kwargs).label_scan == {"reused": 4, "verified": 0, "removed": 0}  # corrupt image skipped
+
+    shutil.copy(ASSETS / "zidane.jpg", root / "images" / "4.jpg")  # new image without label
+    (root / "labels" / "1.txt").write_text("0 0.5 0.5 0.2 0.2\n0 0.1 0.1 0.1 0.1\n")  # edited label
+    os.utime(root / "labels" / "1.txt", ns=(0, 10**9))  # distinct mtime regardless of filesystem resolution
+    (root / "images" / "3.jpg").unlink()  # deleted image
+
+    mapped, load, save = [], LabelStore.load.__func__, LabelStore.save
+
+    def tracked_load(cls, path):
+        store = load(cls, path)
+        x = store.arrays["shape"]
+        while isinstance(x.base, np.ndarray):
+            x = x.base
+        mapped.append(weakref.ref(x))  # memory map of the whole file
+        return store
+
+    def checked_save(self, path):
+        assert mapped and all(ref() is None for ref in mapped)  # previous file unmapped before it is replaced
+        save(self, path)
+
+    monkeypatch.setattr(LabelStore, "load", classmethod(tracked_load))
+    monkeypatch.setattr(LabelStore, "save", checked_save)
+    del dataset  # release this test's own mapping of the cache
+    dataset = YOLODataset(**kwargs)
+    assert dataset.label_scan == {"reused": 2, "verified": 2, "removed": 1}
+    assert [len(lb["cls"]) for lb in dataset.labels] == [1, 2, 1, 0]
+    assert dataset.labels.meta["results"] == [3, 1, 0, 1, 5]  # found, missing, empty, corrupt, total
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_batch_augment():
+    """Test mosaic, HSV and flip on collated batches match the per-sample DataLoader transforms."""
+    import shutil
+
+    import cv2
+
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import YOLODataset
+    from ultralytics.data.augment import BatchAugment, Mosaic, RandomHSV
+
+    root = TMP / "batch_augment"
+    shutil.rmtree(root, ignore_errors=True)
+    (root / "labels").mkdir(parents=True)
+    (root / "images").mkdir()
+    for f in "bus.jpg", "zidane.jpg":
+        shutil.copy(ASSETS / f, root / "images" / f)
+        (root / "labels" / f).with_suffix(".txt").write_text("0 0.5 0.5 0.2 0.4\n1 0.3 0.6 0.1 0.1\n")
+    hyp = get_cfg(DEFAULT_CFG, {"batch_augment": "mosaic,hsv,flip", "mixup": 0.5})
+    data = {"names": {0: "a", 1: "b"}}
+    dataset = YOLODataset(img_path=str(root / "images"), imgsz=160, augment=True, hyp=hyp, data=data)
+    assert dataset.batch_augment.transforms == ("mosaic", "hsv", "flip")
+    assert not any(isinstance(t, (Mosaic, RandomHSV)) for t in dataset.transforms.transforms)
+
+    batch = dataset.batch_augment(YOLODataset.collate_fn([dataset[i % 2] for i in range(4)]))  # CPU tensors
+    assert batch["img"].shape == (4, 3, 160, 160) and batch["img"].dtype == torch.uint8
+    assert len(batch["cls"]) == len(batch["bboxes"]) == len(batch["batch_idx"]) > 0
+    assert (batch["batch_idx"].diff() >= 0).all() and 0 <= batch["bboxes"].min() <= batch["bboxes"].max() <= 1
+
+    # Flips are exact
+    batch = YOLODataset.collate_fn([dataset[i] for i in range(2)])
+    img, bboxes = batch["img"].clone(), batch["bboxes"].clone()
+    batch = BatchAugment(get_cfg(DEFAULT_CFG, {"fliplr": 1.0}), ("flip",))(batch)
+    assert torch.equal(batch["img"], img.flip(3)) and torch.allclose(batch["bboxes"][:, 0], 1 - bboxes[:, 0])
+
+    # HSV matches OpenCV's 8-bit HSV round-trip up to rounding
+    im = cv2.imread(str(ASSETS / "bus.jpg"))
+    np.random.seed(0)
+    ref = RandomHSV(hgain=0.015, sgain=0.7, vgain=0.4)({"img": im.copy()})["img"]
+    np.random.seed(0)
+    x = BatchAugment(get_cfg(DEFAULT_CFG), ("hsv",)).hsv(torch.from_numpy(im[..., ::-1].copy()).permute(2, 0, 1)[None])
+    diff = np.abs(x[0].permute(1, 2, 0).numpy()[..., ::-1].astype(int) - ref.astype(int))
+    assert diff.mean() < 1 and (diff > 2).mean() < 0.01
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_collate_prefetch():
+    """Test vectorised collate batch indices and the batch prefetcher wrapping an InfiniteDataLoader."""
+    import shutil
+
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import YOLODataset, build_dataloader
+    from ultralytics.data.build import BatchPrefetcher
+
+    root = TMP / "collate"
+    shutil.rmtree(root, ignore_errors=True)
+    (root / "labels").mkdir(parents=True)
+    (root / "images").mkdir()
+    for f, n in ("bus.jpg", 3), ("zidane.jpg", 0):
+        shutil.copy(ASSETS / f, root / "images" / f)
+        (root / "labels" / f).with_suffix(".txt").write_text("".join(f"0 0.{i + 2} 0.5 0.1 0.4\n" for i in range(n)))
+    hyp = get_cfg(DEFAULT_CFG)
+    dataset = YOLODataset(img_path=str(root / "images"), imgsz=64, augment=False, hyp=hyp, data={"names": {0: "a"}})
+    batch = YOLODataset.collate_fn([dataset[0], dataset[1], dataset[0]])
+    assert batch["batch_idx"].tolist() == [0, 0, 0, 2, 2, 2] and batch["batch_idx"].dtype == torch.float32
+    assert batch["img"].shape == (3, 3, 64, 64)
+
+    loader = BatchPrefetcher(build_dataloader(dataset, batch=2, workers=0, shuffle=False), "cpu", batch=2, imgsz=64)
+    batches = list(loader)
+    assert len(loader) == len(batches) == 1 and loader.dataset is dataset  # CPU batches pass through unchanged
+    assert torch.equal(batches[0]["img"], batch["img"][:2])
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_aspect_buckets():
+    """Test aspect ratio buckets produce shuffled rectangular batches, also split across DDP ranks."""
+    import shutil
+
+    import cv2
+
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import YOLODataset, build_dataloader, build_yolo_dataset
+    from ultralytics.data.build import AspectBucketBatchSampler
+
+    root = TMP / "buckets"
+    shutil.rmtree(root, ignore_errors=True)
+    (root / "labels").mkdir(parents=True)
+    (root / "images").mkdir()
+    im = cv2.imread(str(ASSETS / "bus.jpg"))
+    for i in range(10):
+        cv2.imwrite(str(root / "images" / f"{i}.jpg"), cv2.resize(im, [(810, 1080), (800, 300), (900, 160)][i % 3]))
+        (root / "labels" / f"{i}.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    hyp = get_cfg(DEFAULT_CFG)
+    kwargs = dict(img_path=str(root / "images"), imgsz=160, hyp=hyp, batch_size=3, pad=0.0, data={"names": {0: "a"}})
+    dataset = YOLODataset(**kwargs, augment=True, buckets=True)
+    assert dataset.rect and len(dataset.buckets) == 3 and sorted(np.concatenate(dataset.buckets)) == list(range(10))
+    report = dataset.bucket_report()
+    assert report["padding"] < report["square_padding"] and report["pixels"] < report["square_pixels"]
+
+    loader = build_dataloader(dataset, batch=3, workers=0, shuffle=True)
+    epochs = [[(tuple(b["img"].shape[2:]), tuple(b["im_file"])) for b in loader] for _ in range(2)]
+    shapes = {tuple(x) for x in dataset.batch_shapes}
+    for epoch in epochs:
+        assert {s for s, _ in epoch} == shapes and sorted(f for _, files in epoch for f in files) == dataset.im_files
+    assert epochs[0] != epochs[1]  # reshuffled every epoch
+
+    samplers = [AspectBucketBatchSampler(dataset, 3) for _ in range(2)]
+    for rank, sampler in enumerate(samplers):
+        sampler.rank, sampler.num_replicas = rank, 2  # as under DDP with 2 processes
+    ranks = [list(sampler) for sampler in samplers]
+    assert len(ranks[0]) == len(ranks[1]) == len(samplers[0]) == 2
+    assert all(len({dataset.batch[i] for i in b}) == 1 for b in ranks[0] + ranks[1])  # one bucket per batch
+
+    cfg = get_cfg(DEFAULT_CFG, {"imgsz": 160, "buckets": True})
+    assert not build_yolo_dataset(cfg, kwargs["img_path"], 3, kwargs["data"], mode="val").buckets  # val keeps rect
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_stream_dataset():
+    """Test streaming YOLO samples from tar shards, with buffer mosaic partners and ordered validation passes."""
+    import io
+    import os
+    import shutil
+    import tarfile
+
+    import cv2
+
+    from ultralytics.data import YOLOStreamDataset, build_dataloader
+    from ultralytics.data.augment import MixUp
+    from ultralytics.data.stream import tar_files
+
+    root = TMP / "shards"
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True)
+    im = cv2.imencode(".jpg", cv2.resize(cv2.imread(str(ASSETS / "bus.jpg")), (96, 128)))[1].tobytes()
+    for s in range(3):
+        with tarfile.open(root / f"train-{s:06d}.tar", "w") as tar:
+            for j in range(4):
+                k = f"{s * 4 + j:06d}"
+                members = {f"{k}.jpg": im, f"{k}.txt": f"{j % 2} 0.5 0.5 0.2 0.{j + 2}".encode()}
+                for name, x in list(members.items())[: 1 if j == 3 else 2]:  # every 4th sample is a background
+                    info = tarfile.TarInfo(name)
+                    info.size = len(x)
+                    tar.addfile(info, io.BytesIO(x))
+    assert len(tar_files(root)) == 3 and not tar_files(ASSETS)
+
+    kwargs = dict(img_path=str(root), imgsz=64, batch_size=4, data={"names": {0: "a", 1: "b"}}, hyp=DEFAULT_CFG)
+    dataset = YOLOStreamDataset(**kwargs, buffer_size=6)
+    assert len(dataset) == 12 and dataset.counts == [4, 4, 4]
+    assert (TMP / "shards.tar.cache").exists()
+    loader = build_dataloader(dataset, batch=4, workers=0)
+    assert len(loader) == 3
+    for batch in loader:
+        assert batch["img"].shape == (4, 3, 64, 64) and len(dataset.samples) == 5
+    assert isinstance(MixUp(dataset).get_indexes(), int) and MixUp(dataset).get_indexes() in dataset.buffer
+
+    passes = [YOLOStreamDataset(**kwargs, augment=False, buffer_size=6) for _ in range(2)]
+    for rank, d in enumerate(passes):
+        d.rank, d.world_size = rank, 2  # two consumers taking batches round-robin, as DataLoader workers
+    streams = [iter(d) for d in passes]
+    batches = [next(streams[i % 2]) for i in range(6)]  # two validation passes of 3 batches
+    files = [Path(f).name for b in batches for f in b["im_file"]]
+    assert files == [f"{i:06d}.jpg" for i in range(12)] * 2
+    assert [len(b["cls"]) for b in batches[:3]] == [3, 3, 3]  # backgrounds have no labels
+
+    cwd = Path.cwd()
+    os.chdir(root)  # shards given relative to the current directory, cached next to it
+    try:
+        assert YOLOStreamDataset(**{**kwargs, "img_path": "."}).counts == [4, 4, 4]
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_checkpoint_writer():
+    """Test background checkpoint writes are atomic, serialized one at a time and report errors on the next save."""
+    from ultralytics.utils.torch_utils import CheckpointWriter
+
+    files = [TMP / "ckpt_last.pt", TMP / "ckpt_best.pt"]
+    writer = CheckpointWriter()
+    for epoch in range(3):
+        writer.save({"epoch": epoch, "w": torch.full((256, 256), epoch)}, files)
+        assert writer.thread is not None  # only the latest save may be in flight
+    writer.flush()
+    assert writer.thread is None and not list(TMP.glob("ckpt_*.tmp"))
+    for f in files:
+        ckpt = torch.load(f)
+        assert ckpt["epoch"] == 2 and (ckpt["w"] == 2).all()
+
+    writer.save({"epoch": 3}, [TMP / "missing" / "last.pt"])  # fails in the background
+    with pytest.raises(FileNotFoundError):
+        writer.save({"epoch": 4}, files)  # error surfaces on the next save, before it writes
+    writer.flush()  # the error is raised once
+    assert torch.load(files[0])["epoch"] == 2
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_train_val_async(monkeypatch):
+    """Test validation and checkpoint writes overlapped with training still record every epoch, best.pt and stops."""
+    import shutil
+    import time
+
+    from ultralytics.utils.torch_utils import CheckpointWriter
+
+    root = TMP / "val_async"
+    shutil.rmtree(root, ignore_errors=True)
+    (root / "images").mkdir(parents=True)
+    (root / "labels").mkdir()
+    for f in ("bus.jpg", "zidane.jpg"):
+        shutil.copy(ASSETS / f, root / "images" / f)
+        (root / "labels" / f).with_suffix(".txt").write_text("0 0.5 0.5 0.4 0.6\n")
+    data = root / "data.yaml"
+    data.write_text(yaml.dump({"path": str(root), "train": "images", "val": "images", "names": ["person"]}))
+
+    write = CheckpointWriter.write
+    monkeypatch.setattr(CheckpointWriter, "write", staticmethod(lambda *args: time.sleep(0.5) or write(*args)))
+    model, logged = YOLO(CFG), []
+    model.add_callback("on_fit_epoch_end", lambda t: logged.append((t.epoch, t.checkpoint_writer.thread, t.metrics)))
+    model.train(data=str(data), epochs=3, imgsz=32, batch=2, workers=0, plots=False, val_async=True, project=root)
+    trainer = model.trainer
+    assert trainer.val_executor is None
+    assert [e for e, _, _ in logged[:3]] == [0, 1, 2]  # each epoch logged once, in order, then the final validation
+    assert all(thread is not None for _, thread, _ in logged[:3])  # training goes on while checkpoints are written
+    assert trainer.val_pending is None and trainer.stopper.best_epoch > 0
+    results = trainer.read_results_csv()
+    assert results["epoch"] == [1, 2, 3] and "metrics/mAP50-95(B)" in results
+    for (_, _, metrics), map50 in zip(logged, results["metrics/mAP50(B)"]):
+        assert metrics["metrics/mAP50(B)"] == pytest.approx(map50, abs=1e-5)  # logged with the epoch's own results
+    assert trainer.best.exists() and trainer.last.exists()
+
+
+def test_ap_histogram():
+    """Test that streaming confidence histograms reproduce the exact mAP within tolerance."""
+    from ultralytics.utils.metrics import APHistogram, ap_per_class
+
+    torch.manual_seed(0)
+    nc, hist, stats = 5, APHistogram(nc=5), dict(tp=[], conf=[], pred_cls=[], target_cls=[])
+    for _ in range(500):
+        target_cls = torch.randint(0, nc, (int(torch.randint(0, 6, ())),)).float()
+        conf = torch.rand(int(torch.randint(0, 20, ()))) ** 2
+        iou = torch.rand(len(conf), 1) * conf[:, None] * 1.5
+        stat = dict(
+            tp=iou > torch.linspace(0.5, 0.95, 10),
+            conf=conf,
+            pred_cls=torch.randint(0, nc, conf.shape).float(),
+            target_cls=target_cls,
+            target_img=target_cls.unique(),
+        )
+        hist.update(stat)
+        for k in stats:
+            stats[k].append(stat[k])
+    stats = {k: torch.cat(v).numpy() for k, v in stats.items()}
+    ap, ap_hist = ap_per_class(**stats)[5], ap_per_class(**hist.stats())[5]
+    assert abs(ap[:, 0].mean() - ap_hist[:, 0].mean()) < 0.005  # mAP50
+    assert abs(ap.mean() - ap_hist.mean()) < 0.005  # mAP50-95
+    assert (hist.nt_per_class.numpy() == np.bincount(stats["target_cls"].astype(int), minlength=nc)).all()
+
+
+def test_tracker_store():
+    """Test that trackers keep stable IDs for moving boxes and recycle their structure-of-arrays rows."""
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers import BOTSORT, BYTETracker
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+
+    xyxy = torch.tensor([[10.0, 10, 50, 90], [200, 40, 260, 100], [400, 300, 440, 380]])
+    for tracker_type, tracker_class in ("bytetrack", BYTETracker), ("botsort", BOTSORT):
+        args = IterableSimpleNamespace(**yaml_load(ROOT / f"cfg/trackers/{tracker_type}.yaml"))
+        tracker = tracker_class(args, frame_rate=30)
+        for i in range(50):
+            boxes = xyxy + torch.tensor([3.0, 1, 3, 1]) * i  # constant velocity
+            n = 2 if 20 <= i < 25 else 3  # third object occluded for 5 frames
+            data = torch.cat([boxes[:n], torch.tensor([[0.9, 0]]).repeat(n, 1)], 1)
+            tracks = tracker.update(Boxes(data, (640, 640)).numpy())
+            if i > 0:
+                assert tracks.shape == (n, 8)  # xyxy, track ID, score, class, detection index
+                assert set(tracks[:, 4].tolist()) <= {1, 2, 3}
+                assert np.allclose(tracks[:, :4], data[tracks[:, 7].astype(int), :4].numpy(), atol=2)
+        assert sorted(tracks[:, 4].tolist()) == [1, 2, 3]  # occluded track recovered with its original ID
+        assert tracker.store.capacity == 64  # detection rows recycled every frame
+
+
+def test_tracker_streams():
+    """Test that one batched tracker following several streams matches independent per-stream trackers."""
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers import BYTETracker
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+
+    args = IterableSimpleNamespace(**yaml_load(ROOT / "cfg/trackers/bytetrack.yaml"))
+    fps = [30, 15, 25]
+    batched, single = BYTETracker(args, frame_rate=fps), [BYTETracker(args, frame_rate=f) for f in fps]
+    assert batched.max_time_lost.tolist() == [s.max_time_lost[0] for s in single]
+    xyxy = torch.tensor([[10.0, 10, 50, 90], [200, 40, 260, 100], [400, 300, 440, 380]])
+    for i in range(30):
+        if i == 15:  # new video on stream 1 only
+            batched.reset(1)
+            single[1].reset()
+        streams = [s for s in range(3) if (i + s) % 4]  # streams skip frames independently
+        boxes = [xyxy[: s + 1] + torch.tensor([3.0, 1, 3, 1]) * (i + s) for s in streams]
+        dets = [Boxes(torch.cat([b, torch.tensor([[0.9, 0]]).repeat(len(b), 1)], 1), (640, 640)).numpy() for b in boxes]
+        for s, d, tracks in zip(streams, dets, batched.update_streams(dets, streams=streams)):
+            assert np.allclose(tracks, single[s].update(d), atol=1e-3)  # same boxes and per-stream track IDs
+    assert batched.frame_id.tolist() == [s.frame_id[0] for s in single]
+
+
+def test_botsort_reid():
+    """Test BOTSORT ReID embeddings of crops, their per-track feature cache and features pooled from the neck."""
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers import BOTSORT
+    from ultralytics.trackers.utils.reid import ReID, pool_boxes
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.ops import xyxy2xywh
+
+    def frame(i):
+        """Return a frame with a red and a blue box moving towards each other, and their xyxy boxes."""
+        im = np.full((240, 320, 3), 114, dtype=np.uint8)
+        xyxy = np.array([[20 + 4 * i, 60, 60 + 4 * i, 140], [260 - 4 * i, 70, 300 - 4 * i, 150]])
+        for (x1, y1, x2, y2), color in zip(xyxy, ((0, 0, 255), (255, 0, 0))):
+            im[y1:y2, x1:x2] = color
+        return im, torch.tensor(xyxy, dtype=torch.float32)
+
+    encoder = ReID()
+    (im0, xyxy0), (im1, xyxy1) = frame(0), frame(5)
+    f0, f1 = (encoder(im, xyxy2xywh(xyxy).numpy()) for im, xyxy in ((im0, xyxy0), (im1, xyxy1)))
+    assert f0.shape == (2, 128) and np.allclose(np.linalg.norm(f0, axis=1), 1, atol=1e-5)
+    similarity = f0 @ f1.T
+    assert similarity[0, 0] > 0.99 and similarity[1, 1] > 0.99 and similarity[0, 1] < 0.5  # same colors match
+
+    args = IterableSimpleNamespace(**{**yaml_load(ROOT / "cfg/trackers/botsort.yaml"), "with_reid": True})
+    tracker = BOTSORT(args, frame_rate=30)
+    for i in range(10):
+        im, xyxy = frame(i)
+        tracks = tracker.update(Boxes(torch.cat([xyxy, torch.tensor([[0.9, 0]] * 2)], 1), im.shape[:2]).numpy(), im)
+    assert tracks[:, 4].tolist() == [1, 2]
+    assert tracker.store.smooth_feat.shape == (tracker.store.capacity, 128)  # contiguous feature cache
+    assert tracker.store.has_feat[tracker.tracked].all()
+
+    maps = torch.zeros(1, 2, 32, 32)  # stride 8 map of a 256x256 letterbox of a 200x100 image padded by 64 on x
+    maps[0, 0, :16, 8:16] = 1  # top left quarter of the image
+    maps[0, 1] = 1 - maps[0, 0]
+    boxes = torch.tensor([[0.0, 0, 50, 100], [50, 100, 100, 200]])
+    feats = pool_boxes([maps], torch.tensor([8.0]), [boxes], [(200, 100)])[0]
+    assert np.allclose(feats, [[1, 0], [0, 1]], atol=1e-5)
+
+
+def test_botsort_neck_hook():
+    """Test the neck feature hook queues one entry per inference call and is skipped for augmented inference."""
+    from ultralytics.trackers.track import register_neck_hook
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load, yaml_save
+
+    args = IterableSimpleNamespace(**{**yaml_load(ROOT / "cfg/trackers/botsort.yaml"), "with_reid": True})
+    model = YOLO(CFG)
+    model.predict(SOURCE, imgsz=64)
+    predictor, im = model.predictor, torch.zeros(2, 3, 64, 64)
+    register_neck_hook(predictor, args)
+    assert predictor.neck_hooks
+    for _ in range(3):
+        predictor.model.model(im)  # head passes outside an inference call, e.g. torch.compile warmup
+        predictor.inference(im)
+    assert len(predictor.neck_feats) == 3 and all(len(maps[0]) == 2 for maps, _ in predictor.neck_feats)
+
+    predictor.args.augment = True  # the head runs once per augmented scale
+    register_neck_hook(predictor, args)
+    assert predictor.neck_feats is None and not predictor.neck_hooks
+    predictor.inference(im)  # old hooks are removed
+
+    tracker = TMP / "botsort_reid.yaml"
+    yaml_save(tracker, vars(args))
+    for augment in (False, True):
+        results = YOLO(CFG).track([SOURCE] * 2, imgsz=64, conf=1e-4, augment=augment, tracker=tracker)
+        assert len(results) == 2
+
+def test_tracker_gated():
+    """Test that spatially gated sparse association matches dense association, alone and within a tracker."""
+    from ultralytics.trackers.utils import matching
+    from ultralytics.utils.benchmarks import benchmark_association
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        xy = rng.uniform(0, 300, (2, 50, 2))
+        a, b = (np.concatenate([p, p + rng.uniform(5, 40, p.shape)], 1).astype(np.float32) for p in xy)
+        dense = matching.iou_distance(a, b)
+        ia, ib = matching.overlap_candidates(a, b)
+        assert {(i, j) for i, j in zip(*np.nonzero(dense < 1))} <= set(zip(ia, ib))  # no overlapping pair missed
+        costs = matching.iou_distance_pairs(a[ia], b[ib])
+        assert (costs == dense[ia, ib]).all()
+        for expected, result in zip(
+            matching.linear_assignment(dense, 0.8), matching.sparse_assignment(ia, ib, costs, dense.shape, 0.8)
+        ):
+            assert np.array_equal(np.asarray(expected).reshape(result.shape), result)
+    assert benchmark_association(objects=(150,), frames=10)["Identical"].all()  # whole tracker, dense vs gated
+
+
+def test_gmc():
+    """Test GMC camera motion estimates with keypoint reuse, keyframes, prefetching and detection masks."""
+    from ultralytics.trackers.utils.gmc import GMC
+
+    base = cv2.resize(cv2.imread(str(ASSETS / "bus.jpg")), (960, 720))
+    frames = [np.ascontiguousarray(base[2 * t : 2 * t + 480, 4 * t : 4 * t + 640]) for t in range(6)]
+    dets = np.array([[320.0, 240, 100, 200, 0]])  # xywh and index, masked out of the estimate
+    for method in "sparseOptFlow", "ecc":
+        gmc = GMC(method)
+        for i, frame in enumerate(frames):
+            H = gmc.apply(frame, dets)
+            assert np.allclose(H[:, 2], [0, 0] if i == 0 else [-4, -2], atol=0.5)
+            assert gmc.latency > 0
+
+    gmc = GMC("sparseOptFlow", min_motion=2.0)  # a static camera keeps its keyframe
+    assert all(np.allclose(gmc.apply(frames[0]), np.eye(2, 3)) for _ in range(3)) and gmc.skipped == 2
+
+    gmc, calls = GMC("sparseOptFlow", min_motion=2.0), []
+    preprocess = gmc.preprocess
+    gmc.preprocess = lambda *args: calls.append(preprocess(*args)) or calls[-1]
+    gmc.apply(frames[0], dets)
+    assert calls[0][0] is calls[1][0] and gmc.cache is None  # keyframe probe and estimate share one conversion
+
+    gmc = GMC("sparseOptFlow")
+    gmc.prefetch(frames[0])
+    gmc.apply(frames[0])
+    for frame in frames[1:4]:  # frames without detections are prefetched but never applied
+        gmc.prefetch(frame)
+        assert gmc.pending[0] is frame  # only the last prefetched frame is held
+    assert np.allclose(gmc.apply(frames[4])[:, 2], [-16, -8], atol=0.5)  # motion of the skipped frames is included
+    assert gmc.pending is None and gmc.skipped_motion is None
+
+
 @pytest.mark.slow
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 @pytest.mark.skipif(is_github_action_running(), reason="No auth https://github.com/JuanBindez/pytubefix/issues/166")
@@ -197,6 +896,65 @@ def test_track_stream():
         model.track(video_url, imgsz=160, tracker=tracker)
 
 
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+@pytest.mark.parametrize("processes", [False, True])
+def test_load_streams_ring(processes):
+    """Test LoadStreams frame ring buffers return every frame in order when buffering, in threads and processes."""
+    from ultralytics.data.loaders import FrameRing, LoadStreams
+
+    video = str(TMP / "ring.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    (TMP / "ring.streams").write_text(video)
+
+    dataset = LoadStreams(str(TMP / "ring.streams"), buffer=True, processes=processes)
+    frames = [round(im[0].mean() / 10) for _, im, _ in dataset]
+    assert frames == list(range(20))
+    assert dataset.dropped == [0]
+
+    ring = FrameRing((4, 4, 3), capacity=3, fifo=False)  # latest-frame mode skips unread frames
+    for i in range(3):
+        ring.slot()[:] = i
+        ring.commit()
+    assert ring.read()[0, 0, 0] == 2 and ring.dropped == 2
+    assert ring.read(timeout=0.01) is None
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_load_images_and_videos_workers():
+    """Test decode workers return the same batches as serial loading and hold at most their frame budget."""
+    import queue
+    import shutil
+    import threading
+    import time
+
+    from ultralytics.data.loaders import LoadImagesAndVideos
+
+    video = str(TMP / "workers.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    shutil.copy(video, TMP / "workers2.avi")
+    sources = [str(ASSETS / "bus.jpg"), str(ASSETS / "zidane.jpg"), video, str(TMP / "workers2.avi")]
+
+    def load(**kwargs):
+        return [(p, [im.sum() for im in ims], s) for p, ims, s in LoadImagesAndVideos(sources, batch=3, **kwargs)]
+
+    for vid_stride in 1, 3:
+        assert load(vid_stride=vid_stride, workers=2, prefetch=1) == load(vid_stride=vid_stride)
+
+    frames, stop, budget = queue.Queue(), threading.Event(), threading.Semaphore(3)
+    thread = threading.Thread(target=LoadImagesAndVideos._read_video, args=(video, 1, frames, stop, budget))
+    thread.start()
+    time.sleep(0.5)
+    assert frames.qsize() == 3  # decoding waits for the consumer once the frame budget is used
+    stop.set()
+    thread.join()
+
+
 def test_val():
     """Test the validation mode of the YOLO model."""
     YOLO(MODEL).val(data="coco8.yaml", imgsz=32, save_hybrid=True)
@@ -438,6 +1196,26 @@ def test_utils_ops():
     torch.allclose(boxes, xyxyxyxy2xywhr(xywhr2xyxyxyxy(boxes)), rtol=1e-3)
 
 
+@pytest.mark.parametrize(
+    "nm, rotated, multi_label, max_nms",
+    [(0, False, False, 30000), (32, False, True, 30000), (0, False, False, 50), (1, True, False, 30000)],
+)
+def test_utils_ops_batched_nms(nm, rotated, multi_label, max_nms):
+    """Test that batched NMS keeps the same detections as the per-image NMS loop."""
+    from ultralytics.utils.ops import non_max_suppression
+
+    bs, n, nc = 4, 500, 8
+    xy, wh = torch.rand(bs, 2, n) * 320, torch.rand(bs, 2, n) * 64 + 2
+    prediction = torch.cat((xy, wh, torch.rand(bs, nc, n), torch.rand(bs, nm, n)), 1)
+    kwargs = dict(conf_thres=0.5, iou_thres=0.5, nc=nc, rotated=rotated, multi_label=multi_label, max_nms=max_nms)
+    loop = non_max_suppression(prediction.clone(), batched=False, max_time_img=60, **kwargs)
+    batched = non_max_suppression(prediction.clone(), batched=True, **kwargs)
+    assert len(loop) == len(batched) == bs
+    for a, b in zip(loop, batched):
+        assert a.shape == b.shape
+        assert sorted(a.tolist()) == sorted(b.tolist())  # identical up to the order of equal scores
+
+
 def test_utils_files():
     """Test file handling utilities including file age, date, and paths with spaces."""
     from ultralytics.utils.files import file_age, file_date, get_latest_run, spaces_in_path
@@ -502,6 +1280,23 @@ def test_nn_modules_block():
     BottleneckCSP(c1, c2)(x)
 
 
+def test_nn_modules_aattn_backends():
+    """Test that the AAttn SDPA and explicit attention backends produce matching outputs."""
+    from ultralytics.nn.modules.block import USE_SDPA, AAttn, select_attn_backend
+
+    x = torch.randn(2, 64, 16, 16)  # BCHW
+    for area in 1, 4:
+        m = AAttn(64, num_heads=2, area=area).eval()
+        with torch.inference_mode():
+            m.backend = "explicit"
+            ref = m(x)
+            m.backend = None  # auto-select
+            out = m(x)
+        assert out.shape == ref.shape == x.shape
+        assert torch.allclose(out, ref, atol=1e-5)
+    assert select_attn_backend("cpu", torch.float32) == ("sdpa" if USE_SDPA else "explicit")
+
+
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 def test_hub():
     """Test Ultralytics HUB functionalities (e.g. export formats, logout)."""
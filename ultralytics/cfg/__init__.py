@@ -136,6 +136,7 @@ CLI_HELP_MSG = f"""
         yolo copy-cfg
         yolo cfg
         yolo solutions help
+        yolo shard data=coco8.yaml imgsz=640
 
     Docs: https://docs.ultralytics.com
     Solutions: https://docs.ultralytics.com/solutions/
@@ -178,6 +179,7 @@ CFG_FRACTION_KEYS = {  # fractional float arguments with 0.0<=values<=1.0
     "conf",
     "iou",
     "fraction",
+    "tile_overlap",
 }
 CFG_INT_KEYS = {  # integer-only arguments
     "epochs",
@@ -191,17 +193,28 @@ CFG_INT_KEYS = {  # integer-only arguments
     "line_width",
     "nbs",
     "save_period",
+    "pipeline",
+    "decode_workers",
+    "decode_prefetch",
+    "tile",
+    "tile_batch",
+    "shuffle_buffer",
+    "map_bins",
 }
 CFG_BOOL_KEYS = {  # boolean-only arguments
     "save",
+    "save_async",
     "exist_ok",
+    "prefetch",
     "verbose",
     "deterministic",
     "single_cls",
     "rect",
+    "buckets",
     "cos_lr",
     "overlap_mask",
     "val",
+    "val_async",
     "save_json",
     "save_hybrid",
     "half",
@@ -227,6 +240,8 @@ CFG_BOOL_KEYS = {  # boolean-only arguments
     "nms",
     "profile",
     "multi_scale",
+    "decode_processes",
+    "torch_letterbox",
 }
 
 
@@ -617,6 +632,37 @@ def handle_yolo_settings(args: List[str]) -> None:
         LOGGER.warning(f"WARNING ⚠️ settings error: '{e}'. Please see {url} for help.")
 
 
+def handle_yolo_shard(args: List[str]) -> None:
+    """
+    Builds or verifies packed, memory-mapped cache='mmap' image shards ahead of training.
+
+    Args:
+        args (List[str]): An optional 'build' or 'verify' action followed by shard files to verify or dataset
+            arguments, i.e. data=coco8.yaml imgsz=640.
+
+    Examples:
+        >>> handle_yolo_shard(["data=coco8.yaml", "imgsz=640"])  # build train and val shards
+        >>> handle_yolo_shard(["verify", "data=coco8.yaml", "imgsz=640"])  # verify shards against their datasets
+        >>> handle_yolo_shard(["verify", "path/to/images/train.rect640.shard"])  # verify a single shard file
+    """
+    from ultralytics.data.shard import ImageShard, build_shards
+
+    verify = bool(args) and args[0] == "verify"
+    args = merge_equals_args(args[1:] if args and args[0] in {"build", "verify"} else args)
+    files = [a for a in args if "=" not in a]
+    overrides = dict(parse_key_value_pair(a) for a in args if "=" in a)
+    if files:
+        for f in files:
+            problems = ImageShard(f).verify()
+            for p in problems[:10]:
+                LOGGER.warning(f"WARNING ⚠️ {f}: {p}")
+            LOGGER.info(f"{f} {'valid ✅' if not problems else f'{len(problems)} problems ❌'}")
+    elif "data" in overrides:
+        build_shards(verify=verify, **overrides)
+    else:
+        LOGGER.warning("WARNING ⚠️ 'yolo shard' requires data=<dataset.yaml> or shard files, i.e. 'data=coco8.yaml'.")
+
+
 def handle_yolo_solutions(args: List[str]) -> None:
     """
     Processes YOLO solutions arguments and runs the specified computer vision solutions pipeline.
@@ -855,6 +901,7 @@ def entrypoint(debug=""):
         "logout": lambda: handle_yolo_hub(args),
         "copy-cfg": copy_default_cfg,
         "solutions": lambda: handle_yolo_solutions(args[1:]),
+        "shard": lambda: handle_yolo_shard(args[1:]),
     }
     full_args_dict = {**DEFAULT_CFG_DICT, **{k: None for k in TASKS}, **{k: None for k in MODES}, **special}
 
@@ -10,6 +10,7 @@ from .dataset import (
     YOLODataset,
     YOLOMultiModalDataset,
 )
+from .stream import YOLOStreamDataset
 
 __all__ = (
     "BaseDataset",
@@ -17,6 +18,7 @@ __all__ = (
     "SemanticDataset",
     "YOLODataset",
     "YOLOMultiModalDataset",
+    "YOLOStreamDataset",
     "YOLOConcatDataset",
     "GroundingDataset",
     "build_yolo_dataset",
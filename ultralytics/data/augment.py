@@ -3,6 +3,7 @@
 import math
 import random
 from copy import deepcopy
+from functools import lru_cache
 from typing import Tuple, Union
 
 import cv2
@@ -15,7 +16,7 @@ from ultralytics.utils import LOGGER, colorstr
 from ultralytics.utils.checks import check_version
 from ultralytics.utils.instance import Instances
 from ultralytics.utils.metrics import bbox_ioa
-from ultralytics.utils.ops import segment2box, xyxyxyxy2xywhr
+from ultralytics.utils.ops import segment2box, xywh2xyxy, xyxy2xywh, xyxyxyxy2xywhr
 from ultralytics.utils.torch_utils import TORCHVISION_0_10, TORCHVISION_0_11, TORCHVISION_0_13
 
 DEFAULT_MEAN = (0.0, 0.0, 0.0)
@@ -922,6 +923,8 @@ class MixUp(BaseMixTransform):
             >>> print(index)
             42
         """
+        if isinstance(self.dataset, torch.utils.data.IterableDataset):  # streamed, draw from the shuffle buffer
+            return random.choice(self.dataset.buffer)
         return random.randint(0, len(self.dataset) - 1)
 
     def _mix_transform(self, labels):
@@ -1038,11 +1041,31 @@ class RandomPerspective:
             >>> border = (10, 10)
             >>> transformed_img, matrix, scale = affine_transform(img, border)
         """
+        M, s = self.random_matrix(img.shape[:2])
+        # Affine image
+        if (border[0] != 0) or (border[1] != 0) or (M != np.eye(3)).any():  # image changed
+            if self.perspective:
+                img = cv2.warpPerspective(img, M, dsize=self.size, borderValue=(114, 114, 114))
+            else:  # affine
+                img = cv2.warpAffine(img, M[:2], dsize=self.size, borderValue=(114, 114, 114))
+        return img, M, s
+
+    def random_matrix(self, shape):
+        """
+        Draw a random transformation matrix mapping an input image of `shape` onto an output image of `self.size`.
+
+        Args:
+            shape (Tuple[int, int]): Input image (height, width).
+
+        Returns:
+            M (np.ndarray): 3x3 transformation matrix.
+            s (float): Scale factor applied by the transformation.
+        """
         # Center
         C = np.eye(3, dtype=np.float32)
 
-        C[0, 2] = -img.shape[1] / 2  # x translation (pixels)
-        C[1, 2] = -img.shape[0] / 2  # y translation (pixels)
+        C[0, 2] = -shape[1] / 2  # x translation (pixels)
+        C[1, 2] = -shape[0] / 2  # y translation (pixels)
 
         # Perspective
         P = np.eye(3, dtype=np.float32)
@@ -1069,13 +1092,7 @@ class RandomPerspective:
 
         # Combined rotation matrix
         M = T @ S @ R @ P @ C  # order of operations (right to left) is IMPORTANT
-        # Affine image
-        if (border[0] != 0) or (border[1] != 0) or (M != np.eye(3)).any():  # image changed
-            if self.perspective:
-                img = cv2.warpPerspective(img, M, dsize=self.size, borderValue=(114, 114, 114))
-            else:  # affine
-                img = cv2.warpAffine(img, M[:2], dsize=self.size, borderValue=(114, 114, 114))
-        return img, M, s
+        return M, s
 
     def apply_bboxes(self, bboxes, M):
         """
@@ -1562,6 +1579,36 @@ class LetterBox:
         if isinstance(new_shape, int):
             new_shape = (new_shape, new_shape)
 
+        new_unpad, ratio, (top, bottom, left, right) = self._compute_padding(shape, new_shape)
+        if shape[::-1] != new_unpad:  # resize
+            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+        img = cv2.copyMakeBorder(
+            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
+        )  # add border
+        if labels.get("ratio_pad"):
+            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
+
+        if len(labels):
+            labels = self._update_labels(labels, ratio, left, top)
+            labels["img"] = img
+            labels["resized_shape"] = new_shape
+            return labels
+        else:
+            return img
+
+    def _compute_padding(self, shape, new_shape):
+        """
+        Compute the resized shape, scale ratios and border padding that letterbox an image of `shape` into `new_shape`.
+
+        Args:
+            shape (Tuple[int, int]): Image shape (height, width).
+            new_shape (Tuple[int, int]): Target shape (height, width).
+
+        Returns:
+            new_unpad (Tuple[int, int]): Resized image size (width, height) before padding.
+            ratio (Tuple[float, float]): Width and height scale ratios.
+            padding (Tuple[int, int, int, int]): Top, bottom, left and right border sizes.
+        """
         # Scale ratio (new / old)
         r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
         if not self.scaleup:  # only scale down, do not scale up (for better val mAP)
@@ -1582,23 +1629,9 @@ class LetterBox:
             dw /= 2  # divide padding into 2 sides
             dh /= 2
 
-        if shape[::-1] != new_unpad:  # resize
-            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
         top, bottom = int(round(dh - 0.1)) if self.center else 0, int(round(dh + 0.1))
         left, right = int(round(dw - 0.1)) if self.center else 0, int(round(dw + 0.1))
-        img = cv2.copyMakeBorder(
-            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
-        )  # add border
-        if labels.get("ratio_pad"):
-            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
-
-        if len(labels):
-            labels = self._update_labels(labels, ratio, left, top)
-            labels["img"] = img
-            labels["resized_shape"] = new_shape
-            return labels
-        else:
-            return img
+        return new_unpad, ratio, (top, bottom, left, right)
 
     @staticmethod
     def _update_labels(labels, ratio, padw, padh):
@@ -1631,6 +1664,106 @@ class LetterBox:
         return labels
 
 
+class BatchLetterBox(LetterBox):
+    """
+    Batched torch letterbox for inference, bit-identical to LetterBox images resized with OpenCV.
+
+    Raw uint8 BGR images are uploaded to the target device once, then resized, padded, converted to RGB and laid out as
+    BCHW there. Resizing reproduces the fixed-point arithmetic of OpenCV's 8-bit INTER_LINEAR resize with int32 tensor
+    ops, so results match LetterBox exactly on any device.
+
+    Attributes:
+        new_shape (tuple): Target shape (height, width) for resizing.
+        auto (bool): Whether to use minimum rectangle.
+        scaleFill (bool): Whether to stretch the image to new_shape.
+        scaleup (bool): Whether to allow scaling up. If False, only scale down.
+        stride (int): Stride for rounding padding.
+        center (bool): Whether to center the image or align to top-left.
+
+    Methods:
+        __call__: Letterbox a list of images into a single uint8 tensor.
+
+    Examples:
+        >>> letterbox = BatchLetterBox(new_shape=(640, 640))
+        >>> images = [np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(4)]
+        >>> batch = letterbox(images, device="cpu")  # (4, 3, 640, 640) uint8 RGB
+    """
+
+    def __call__(self, images, device="cpu"):
+        """
+        Letterbox a list of BGR images into a uint8 RGB tensor.
+
+        Args:
+            images (List[np.ndarray]): Images of shape (h, w, 3) in BGR order.
+            device (str | torch.device): Device to letterbox on.
+
+        Returns:
+            (torch.Tensor): Letterboxed images of shape (N, 3, H, W) in RGB order, matching
+                np.stack([LetterBox(...)(image=x) for x in images])[..., ::-1].transpose(0, 3, 1, 2).
+
+        Raises:
+            ValueError: If images letterbox to different shapes, i.e. with auto=True and different input shapes.
+        """
+        new_shape = (self.new_shape, self.new_shape) if isinstance(self.new_shape, int) else self.new_shape
+        groups = {}  # {(shape, new_unpad, padding): [image indices]}
+        for i, x in enumerate(images):
+            new_unpad, _, padding = self._compute_padding(x.shape[:2], new_shape)
+            groups.setdefault((x.shape[:2], new_unpad, padding), []).append(i)
+        shapes = {(w + p[2] + p[3], h + p[0] + p[1]) for _, (w, h), p in groups}
+        if len(shapes) > 1:
+            raise ValueError(f"Images letterbox to different shapes {shapes}, use auto=False to batch them")
+        w, h = shapes.pop()
+        out = torch.full((len(images), 3, h, w), 114, dtype=torch.uint8, device=device)
+        for (shape, new_unpad, (top, _, left, _)), index in groups.items():
+            x = torch.stack([torch.from_numpy(np.ascontiguousarray(images[i])).to(device) for i in index])
+            if shape[::-1] != new_unpad:
+                x = self._resize(x, new_unpad)
+            out[index, :, top : top + new_unpad[1], left : left + new_unpad[0]] = x.permute(0, 3, 1, 2).flip(1)
+        return out
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _resize_coefficients(src, dst, clip):
+        """
+        Source indices and 11-bit fixed-point weights of OpenCV's INTER_LINEAR resize along one axis.
+
+        Args:
+            src (int): Source size.
+            dst (int): Destination size.
+            clip (bool): Clip border coordinates and weights, as OpenCV does horizontally. Vertically OpenCV only clips
+                the source indices and keeps the unclipped weights.
+
+        Returns:
+            (Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]): First and second source indices and their weights.
+        """
+        f = ((np.arange(dst) + 0.5) * (1.0 / (dst / src)) - 0.5).astype(np.float32)  # float32 as in OpenCV
+        i = np.floor(f)
+        f -= i
+        i = i.astype(np.int64)
+        if clip:
+            f[(i < 0) | (i >= src - 1)] = 0
+        i0, i1 = i.clip(0, src - 1), (i + 1).clip(0, src - 1)
+        w1 = np.round(f * 2048).astype(np.int32)  # round half to even like cvRound
+        w0 = np.round((1 - f) * 2048).astype(np.int32)
+        return i0, i1, w0, w1
+
+    @staticmethod
+    def _resize(x, size):
+        """Resize a (N, H, W, C) uint8 tensor to size (w, h), reproducing cv2.resize(x, size, cv2.INTER_LINEAR)."""
+        coefficients = BatchLetterBox._resize_coefficients
+        x0, x1, a0, a1 = (torch.from_numpy(v).to(x.device) for v in coefficients(x.shape[2], size[0], True))
+        y0, y1, b0, b1 = (torch.from_numpy(v).to(x.device) for v in coefficients(x.shape[1], size[1], False))
+        a0, a1, b0, b1 = a0[:, None], a1[:, None], b0[:, None, None], b1[:, None, None]
+
+        def horizontal(rows):
+            """Horizontal pass over source rows, in 11-bit fixed point and pre-shifted for the vertical pass."""
+            return (rows[:, :, x0].int() * a0 + rows[:, :, x1].int() * a1) >> 4
+
+        # Vertical pass as in OpenCV's SIMD path: (((b0 * r0) >> 16) + ((b1 * r1) >> 16) + 2) >> 2
+        x = (((b0 * horizontal(x[:, y0])) >> 16) + ((b1 * horizontal(x[:, y1])) >> 16) + 2) >> 2
+        return x.clamp_(0, 255).to(torch.uint8)
+
+
 class CopyPaste(BaseMixTransform):
     """
     CopyPaste class for applying Copy-Paste augmentation to image datasets.
@@ -1664,6 +1797,8 @@ class CopyPaste(BaseMixTransform):
 
     def get_indexes(self):
         """Returns a list of random indexes from the dataset for CopyPaste augmentation."""
+        if isinstance(self.dataset, torch.utils.data.IterableDataset):  # streamed, draw from the shuffle buffer
+            return random.choice(self.dataset.buffer)
         return random.randint(0, len(self.dataset) - 1)
 
     def _mix_transform(self, labels):
@@ -2275,7 +2410,327 @@ class RandomLoadText:
         return labels
 
 
-def v8_transforms(dataset, imgsz, hyp, stretch=False):
+class BatchAugment:
+    """
+    Mosaic, random perspective, mixup, HSV and flip augmentation of collated uint8 batches on the training device.
+
+    Runs the selected stages of v8_transforms once per batch inside the trainer's preprocess_batch instead of once per
+    sample in DataLoader workers, with the same random parameter distributions. Images of the collated batch must be
+    square `imgsz` letterboxes, aligned top-left when mosaic runs on the batch, so the extent of each source image is
+    known. Labels (`cls`, `bboxes`, `keypoints`, `masks` and `batch_idx`) are updated consistently and stay on the image
+    device. CPU tensors work the same way, which makes every stage testable without a GPU.
+
+    Attributes:
+        transforms (tuple): Enabled stages, any of 'mosaic' (mosaic placement, random perspective and mixup), 'hsv' and
+            'flip'.
+        imgsz (int): Training image size.
+        hyp (IterableSimpleNamespace): Augmentation hyperparameters, i.e. mosaic, mixup, hsv_h, fliplr.
+        flip_idx (List[int] | None): Keypoint index mapping for horizontal flips.
+        affine (RandomPerspective): Draws the random perspective matrices.
+
+    Methods:
+        select: Parse the `batch_augment` argument into the stages a dataset supports on collated batches.
+        mosaic: Mosaic placement, random perspective and mixup of a batch.
+        hsv: Random HSV gains for each image of a batch.
+        flip: Random vertical and horizontal flips of a batch.
+
+    Examples:
+        >>> augment = BatchAugment(hyp, transforms=("mosaic", "hsv", "flip"), imgsz=640)
+        >>> batch = augment(batch)  # collated batch with images on the training device
+    """
+
+    TRANSFORMS = ("mosaic", "hsv", "flip")
+
+    def __init__(self, hyp, transforms=TRANSFORMS, imgsz=640, flip_idx=None):
+        """
+        Initialize the batch augmentation stages.
+
+        Args:
+            hyp (IterableSimpleNamespace): Augmentation hyperparameters.
+            transforms (tuple): Stages to apply, a subset of BatchAugment.TRANSFORMS.
+            imgsz (int): Training image size.
+            flip_idx (List[int] | None): Keypoint index mapping for horizontal flips.
+        """
+        self.transforms = tuple(transforms)
+        self.imgsz = imgsz
+        self.hyp = hyp
+        self.flip_idx = flip_idx or None
+        self.affine = RandomPerspective(
+            degrees=hyp.degrees, translate=hyp.translate, scale=hyp.scale, shear=hyp.shear, perspective=hyp.perspective
+        )
+        self.affine.size = (imgsz, imgsz)
+
+    @classmethod
+    def select(cls, batch_augment, mosaic=True):
+        """
+        Parse a `batch_augment` argument into the stages to run on collated batches.
+
+        Args:
+            batch_augment (bool | str | list): True or 'all' for every stage, a comma-separated string or a list of
+                stage names, or False for none.
+            mosaic (bool): Whether the dataset supports mosaic on collated batches. Segment, obb, rect and text datasets
+                need their polygons, batch shapes or per-image texts, which only exist in DataLoader workers.
+
+        Returns:
+            (tuple): Selected stages in application order.
+        """
+        if not batch_augment:
+            return ()
+        names = batch_augment
+        if names is True or names == "all":
+            names = cls.TRANSFORMS
+        elif isinstance(names, str):
+            names = [x.strip() for x in names.split(",") if x.strip()]
+        if set(names) - set(cls.TRANSFORMS):
+            raise ValueError(f"Invalid batch_augment={batch_augment}, valid transforms are {cls.TRANSFORMS}")
+        names = [x for x in cls.TRANSFORMS if x in names]
+        if "mosaic" in names and not mosaic:
+            names.remove("mosaic")
+            LOGGER.warning(
+                "WARNING ⚠️ batch_augment 'mosaic' is not supported for segment, obb, rect or text datasets, "
+                "running mosaic in DataLoader workers instead"
+            )
+        return tuple(names)
+
+    def __call__(self, batch):
+        """
+        Augment a collated batch in place.
+
+        Args:
+            batch (Dict): Collated batch with a uint8 'img' tensor of shape (B, 3, H, W) and normalized labels.
+
+        Returns:
+            (Dict): The augmented batch, with labels moved to the image device.
+        """
+        device = batch["img"].device
+        for k in ("cls", "bboxes", "batch_idx", "keypoints", "masks"):
+            if k in batch:
+                batch[k] = batch[k].to(device, non_blocking=True)
+        if "mosaic" in self.transforms:
+            batch = self.mosaic(batch)
+        if "hsv" in self.transforms:
+            batch["img"] = self.hsv(batch["img"])
+        if "flip" in self.transforms:
+            batch = self.flip(batch)
+        return batch
+
+    def _content_shape(self, shape):
+        """Return the (h, w) an image of original `shape` is resized to by BaseDataset.load_image."""
+        h0, w0 = shape
+        r = self.imgsz / max(h0, w0)
+        return (h0, w0) if r == 1 else (min(math.ceil(h0 * r), self.imgsz), min(math.ceil(w0 * r), self.imgsz))
+
+    @staticmethod
+    def _gather(pairs, batch_idx, n):
+        """
+        Index the labels of (output image, source image) pairs.
+
+        Args:
+            pairs (torch.Tensor): (M, 2) output and source image indices.
+            batch_idx (torch.Tensor): Image index of every label, sorted as produced by collate_fn.
+            n (int): Number of images in the batch.
+
+        Returns:
+            pair (torch.Tensor): Pair index of every gathered label.
+            index (torch.Tensor): Source label index of every gathered label.
+        """
+        counts = torch.bincount(batch_idx.long(), minlength=n)
+        starts = counts.cumsum(0) - counts
+        nk = counts[pairs[:, 1]]
+        pair = torch.repeat_interleave(torch.arange(len(pairs), device=pairs.device), nk)
+        first = nk.cumsum(0) - nk
+        index = starts[pairs[pair, 1]] + torch.arange(len(pair), device=pairs.device) - first[pair]
+        return pair, index
+
+    def _warp(self, im, M):
+        """Warp a (3, H, W) uint8 image with matrix M onto an imgsz square, as cv2.warpPerspective with 114 borders."""
+        s, device = self.imgsz, im.device
+        y, x = torch.meshgrid(torch.arange(s, device=device), torch.arange(s, device=device), indexing="ij")
+        Mi = torch.from_numpy(np.linalg.inv(M)).float().to(device)
+        xy = torch.stack((x, y, torch.ones_like(x)), -1).float() @ Mi.T
+        xy = xy[..., :2] / xy[..., 2:]  # source pixel coordinates
+        h, w = im.shape[1:]
+        grid = torch.stack(((2 * xy[..., 0] + 1) / w - 1, (2 * xy[..., 1] + 1) / h - 1), -1)  # align_corners=False
+        im = torch.nn.functional.grid_sample((im.float() - 114)[None], grid[None], align_corners=False)[0] + 114
+        return im.round_().clamp_(0, 255).to(torch.uint8)
+
+    def mosaic(self, batch):
+        """
+        Apply 4-image mosaic with probability hyp.mosaic, then random perspective and mixup with probability hyp.mixup.
+
+        Mosaic partners are drawn from the same batch. Images without mosaic are centered as LetterBox would before the
+        random perspective.
+
+        Args:
+            batch (Dict): Collated batch of top-left aligned imgsz letterboxes.
+
+        Returns:
+            (Dict): Batch of augmented imgsz images with transformed, clipped and filtered labels.
+        """
+        img, s = batch["img"], self.imgsz
+        n, device = len(img), img.device
+        assert img.shape[2:] == (s, s), f"batch_augment 'mosaic' expects {s}x{s} images, got {tuple(img.shape[2:])}"
+        shapes = [self._content_shape(shape) for shape in batch["ori_shape"]]
+        out = torch.empty_like(img)
+        pairs, matrices, scales, sizes = [], [], [], []  # pairs are (output, source, padw, padh)
+        for i in range(n):
+            if random.uniform(0, 1) <= self.hyp.mosaic:
+                size = 2 * s
+                im = img.new_full((3, size, size), 114)
+                yc, xc = (int(random.uniform(s // 2, 2 * s - s // 2)) for _ in range(2))  # mosaic center
+                for k, j in enumerate([i] + random.choices(range(n), k=3)):
+                    h, w = shapes[j]
+                    if k == 0:  # top left
+                        x1a, y1a, x2a, y2a = max(xc - w, 0), max(yc - h, 0), xc, yc
+                        x1b, y1b, x2b, y2b = w - (x2a - x1a), h - (y2a - y1a), w, h
+                    elif k == 1:  # top right
+                        x1a, y1a, x2a, y2a = xc, max(yc - h, 0), min(xc + w, size), yc
+                        x1b, y1b, x2b, y2b = 0, h - (y2a - y1a), min(w, x2a - x1a), h
+                    elif k == 2:  # bottom left
+                        x1a, y1a, x2a, y2a = max(xc - w, 0), yc, xc, min(size, yc + h)
+                        x1b, y1b, x2b, y2b = w - (x2a - x1a), 0, w, min(y2a - y1a, h)
+                    else:  # bottom right
+                        x1a, y1a, x2a, y2a = xc, yc, min(xc + w, size), min(size, yc + h)
+                        x1b, y1b, x2b, y2b = 0, 0, min(w, x2a - x1a), min(y2a - y1a, h)
+                    im[:, y1a:y2a, x1a:x2a] = img[j, :, y1b:y2b, x1b:x2b]
+                    pairs.append((i, j, x1a - x1b, y1a - y1b))
+                M, scale = self.affine.random_matrix((size, size))
+            else:
+                size, im = s, img[i]
+                h, w = shapes[i]
+                pad = np.eye(3, dtype=np.float32)  # center as LetterBox does before RandomPerspective
+                pad[:2, 2] = int(round((s - w) / 2 - 0.1)), int(round((s - h) / 2 - 0.1))
+                M, scale = self.affine.random_matrix((size, size))
+                M = M @ pad
+                pairs.append((i, i, 0, 0))
+            out[i] = im if size == s and (M == np.eye(3)).all() else self._warp(im, M)
+            matrices.append(M)
+            scales.append(scale)
+            sizes.append(size)
+
+        # Labels in pixels of the mosaic canvas, clipped to it as Mosaic does
+        pairs = torch.tensor(pairs, device=device)
+        pair, index = self._gather(pairs[:, :2], batch["batch_idx"], n)
+        i = pairs[pair, 0]
+        pad = pairs[pair, 2:].float().repeat(1, 2)
+        size = torch.tensor(sizes, device=device, dtype=torch.float32)[i, None]
+        boxes = torch.minimum(xywh2xyxy(batch["bboxes"][index]) * s + pad, size).clamp_(min=0)
+        keypoints = batch["keypoints"][index].clone() if "keypoints" in batch else None
+        if keypoints is not None:
+            keypoints[..., :2] = torch.minimum(keypoints[..., :2] * s + pad[:, None, :2], size[..., None]).clamp_(min=0)
+
+        # Random perspective
+        M = torch.from_numpy(np.stack(matrices)).to(device)[i]
+        xy = torch.cat((boxes[:, [0, 1, 2, 3, 0, 3, 2, 1]].view(-1, 4, 2), boxes.new_ones(len(boxes), 4, 1)), -1)
+        xy = xy @ M.transpose(1, 2)
+        xy = xy[..., :2] / xy[..., 2:]
+        new = torch.cat((xy.amin(1), xy.amax(1)), -1).clamp_(0, s)
+        if keypoints is not None:
+            kxy = torch.cat((keypoints[..., :2], keypoints.new_ones(*keypoints.shape[:2], 1)), -1) @ M.transpose(1, 2)
+            kxy = kxy[..., :2] / kxy[..., 2:]
+            if keypoints.shape[-1] == 3:
+                keypoints[..., 2][((kxy < 0) | (kxy > s)).any(-1)] = 0
+            keypoints[..., :2] = kxy.clamp_(0, s)
+        boxes = boxes * torch.tensor(scales, device=device, dtype=torch.float32)[i, None]
+        w1, h1 = boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]
+        w2, h2 = new[:, 2] - new[:, 0], new[:, 3] - new[:, 1]
+        ar = torch.maximum(w2 / (h2 + 1e-16), h2 / (w2 + 1e-16))
+        keep = (w2 > 2) & (h2 > 2) & (w2 * h2 / (w1 * h1 + 1e-16) > 0.1) & (ar < 100)  # box_candidates
+        labels = {"batch_idx": i, "cls": batch["cls"][index], "bboxes": xyxy2xywh(new) / s}
+        if keypoints is not None:
+            labels["keypoints"] = keypoints / torch.tensor([s, s, 1][: keypoints.shape[-1]], device=device)
+        labels = {k: v[keep] for k, v in labels.items()}
+
+        # MixUp with another augmented image of the batch
+        mix = [(i, random.randrange(n)) for i in range(n) if random.uniform(0, 1) <= self.hyp.mixup]
+        if mix:
+            pairs = torch.tensor(mix, device=device)
+            r = torch.from_numpy(np.random.beta(32.0, 32.0, len(mix))).float().to(device)[:, None, None, None]
+            out[pairs[:, 0]] = (out[pairs[:, 0]] * r + out[pairs[:, 1]] * (1 - r)).to(torch.uint8)
+            pair, index = self._gather(pairs, labels["batch_idx"], n)
+            mixed = {k: v[index] for k, v in labels.items()}
+            mixed["batch_idx"] = pairs[pair, 0]
+            labels = {k: torch.cat((v, mixed[k])) for k, v in labels.items()}
+
+        order = torch.sort(labels.pop("batch_idx"), stable=True)
+        batch.update({k: v[order.indices] for k, v in labels.items()})
+        batch["batch_idx"] = order.values.to(batch["batch_idx"].dtype)
+        batch["img"] = out
+        return batch
+
+    def hsv(self, img):
+        """
+        Apply random hue, saturation and value gains to every image, as RandomHSV does with OpenCV's 8-bit HSV.
+
+        Args:
+            img (torch.Tensor): uint8 RGB images of shape (B, 3, H, W).
+
+        Returns:
+            (torch.Tensor): Augmented uint8 images.
+        """
+        hyp = self.hyp
+        if not (hyp.hsv_h or hyp.hsv_s or hyp.hsv_v):
+            return img
+        r = np.random.uniform(-1, 1, (len(img), 3)) * [hyp.hsv_h, hyp.hsv_s, hyp.hsv_v] + 1  # random gains
+        r = torch.from_numpy(r).float().to(img.device)[..., None, None]
+        x = img.float()
+        v = x.amax(1)
+        d = v - x.amin(1)
+        s = torch.where(v > 0, d * 255 / v, 0).round_()
+        red, green, blue = x.unbind(1)
+        h = torch.where(v == green, 2 + (blue - red) / d, 4 + (red - green) / d)
+        h = torch.where(v == red, (green - blue) / d, h)
+        h = torch.where(d > 0, (h * 30) % 180, 0).round_()  # OpenCV hue range [0, 180)
+
+        # Gains as RandomHSV lookup tables, then HSV to RGB
+        h = ((h * r[:, 0]) % 180).floor_() / 30  # hue sector in [0, 6)
+        s = (s * r[:, 1]).clamp_(0, 255).floor_() / 255
+        v = (v * r[:, 2]).clamp_(0, 255).floor_()
+        k = (torch.tensor([5, 3, 1], device=img.device)[None, :, None, None] + h[:, None]) % 6
+        x = v[:, None] * (1 - s[:, None] * torch.minimum(k, 4 - k).clamp_(0, 1))
+        return x.round_().clamp_(0, 255).to(torch.uint8)
+
+    def flip(self, batch):
+        """
+        Flip every image vertically with probability hyp.flipud, then horizontally with probability hyp.fliplr.
+
+        Args:
+            batch (Dict): Collated batch with normalized labels.
+
+        Returns:
+            (Dict): Batch with flipped images, boxes, keypoints and masks.
+        """
+        img = batch["img"]
+        n, device = len(img), img.device
+        ud = torch.tensor([random.random() < self.hyp.flipud for _ in range(n)], device=device)
+        lr = torch.tensor([random.random() < self.hyp.fliplr for _ in range(n)], device=device)
+        img = torch.where(ud[:, None, None, None], img.flip(2), img)
+        batch["img"] = torch.where(lr[:, None, None, None], img.flip(3), img)
+        i = batch["batch_idx"].long()
+        u, l = ud[i], lr[i]
+        bboxes = batch["bboxes"].clone()
+        bboxes[:, 1] = torch.where(u, 1 - bboxes[:, 1], bboxes[:, 1])
+        bboxes[:, 0] = torch.where(l, 1 - bboxes[:, 0], bboxes[:, 0])
+        if bboxes.shape[1] == 5:  # xywhr, a single mirror maps (w, h, r) to the equivalent (h, w, pi/2 - r)
+            m = u ^ l
+            bboxes[m] = torch.stack((*bboxes[m, :2].T, bboxes[m, 3], bboxes[m, 2], math.pi / 2 - bboxes[m, 4]), 1)
+        batch["bboxes"] = bboxes
+        if "keypoints" in batch:
+            kpts = batch["keypoints"].clone()
+            kpts[..., 1] = torch.where(u[:, None], 1 - kpts[..., 1], kpts[..., 1])
+            kpts[..., 0] = torch.where(l[:, None], 1 - kpts[..., 0], kpts[..., 0])
+            if self.flip_idx is not None:
+                kpts[l] = kpts[l][:, self.flip_idx]
+            batch["keypoints"] = kpts
+        if "masks" in batch:
+            masks = batch["masks"]
+            j = slice(None) if len(masks) == n and self.hyp.overlap_mask else i  # overlap masks are one per image
+            masks = torch.where(ud[j][:, None, None], masks.flip(1), masks)
+            batch["masks"] = torch.where(lr[j][:, None, None], masks.flip(2), masks)
+        return batch
+
+
+def v8_transforms(dataset, imgsz, hyp, stretch=False, batch_augment=()):
     """
     Applies a series of image transformations for training.
 
@@ -2287,6 +2742,8 @@ def v8_transforms(dataset, imgsz, hyp, stretch=False):
         imgsz (int): The target image size for resizing.
         hyp (Namespace): A dictionary of hyperparameters controlling various aspects of the transformations.
         stretch (bool): If True, applies stretching to the image. If False, uses LetterBox resizing.
+        batch_augment (tuple): Stages left to BatchAugment on collated batches, any of 'mosaic', 'hsv' and 'flip'.
+            With 'mosaic', images are only letterboxed top-left here and mosaic, perspective and mixup run later.
 
     Returns:
         (Compose): A composition of image transformations to be applied to the dataset.
@@ -2299,28 +2756,31 @@ def v8_transforms(dataset, imgsz, hyp, stretch=False):
         >>> transforms = v8_transforms(dataset, imgsz=640, hyp=hyp)
         >>> augmented_data = transforms(dataset[0])
     """
-    mosaic = Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic)
-    affine = RandomPerspective(
-        degrees=hyp.degrees,
-        translate=hyp.translate,
-        scale=hyp.scale,
-        shear=hyp.shear,
-        perspective=hyp.perspective,
-        pre_transform=None if stretch else LetterBox(new_shape=(imgsz, imgsz)),
-    )
-
-    pre_transform = Compose([mosaic, affine])
-    if hyp.copy_paste_mode == "flip":
-        pre_transform.insert(1, CopyPaste(p=hyp.copy_paste, mode=hyp.copy_paste_mode))
+    if "mosaic" in batch_augment:
+        pre_transform = LetterBox(new_shape=(imgsz, imgsz), center=False)  # BatchAugment knows where images are
     else:
-        pre_transform.append(
-            CopyPaste(
-                dataset,
-                pre_transform=Compose([Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic), affine]),
-                p=hyp.copy_paste,
-                mode=hyp.copy_paste_mode,
-            )
+        mosaic = Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic)
+        affine = RandomPerspective(
+            degrees=hyp.degrees,
+            translate=hyp.translate,
+            scale=hyp.scale,
+            shear=hyp.shear,
+            perspective=hyp.perspective,
+            pre_transform=None if stretch else LetterBox(new_shape=(imgsz, imgsz)),
         )
+
+        pre_transform = Compose([mosaic, affine])
+        if hyp.copy_paste_mode == "flip":
+            pre_transform.insert(1, CopyPaste(p=hyp.copy_paste, mode=hyp.copy_paste_mode))
+        else:
+            pre_transform.append(
+                CopyPaste(
+                    dataset,
+                    pre_transform=Compose([Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic), affine]),
+                    p=hyp.copy_paste,
+                    mode=hyp.copy_paste_mode,
+                )
+            )
     flip_idx = dataset.data.get("flip_idx", [])  # for keypoints augmentation
     if dataset.use_keypoints:
         kpt_shape = dataset.data.get("kpt_shape", None)
@@ -2330,16 +2790,16 @@ def v8_transforms(dataset, imgsz, hyp, stretch=False):
         elif flip_idx and (len(flip_idx) != kpt_shape[0]):
             raise ValueError(f"data.yaml flip_idx={flip_idx} length must be equal to kpt_shape[0]={kpt_shape[0]}")
 
-    return Compose(
-        [
-            pre_transform,
-            MixUp(dataset, pre_transform=pre_transform, p=hyp.mixup),
-            Albumentations(p=1.0),
-            RandomHSV(hgain=hyp.hsv_h, sgain=hyp.hsv_s, vgain=hyp.hsv_v),
-            RandomFlip(direction="vertical", p=hyp.flipud),
-            RandomFlip(direction="horizontal", p=hyp.fliplr, flip_idx=flip_idx),
-        ]
-    )  # transforms
+    transforms = [pre_transform]
+    if "mosaic" not in batch_augment:
+        transforms.append(MixUp(dataset, pre_transform=pre_transform, p=hyp.mixup))
+    transforms.append(Albumentations(p=1.0))
+    if "hsv" not in batch_augment:
+        transforms.append(RandomHSV(hgain=hyp.hsv_h, sgain=hyp.hsv_s, vgain=hyp.hsv_v))
+    if "flip" not in batch_augment:
+        transforms.append(RandomFlip(direction="vertical", p=hyp.flipud))
+        transforms.append(RandomFlip(direction="horizontal", p=hyp.fliplr, flip_idx=flip_idx))
+    return Compose(transforms)  # transforms
 
 
 # Classification augmentations -----------------------------------------------------------------------------------------
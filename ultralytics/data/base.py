@@ -1,7 +1,7 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
 import glob
-import math
+import inspect
 import os
 import random
 from copy import deepcopy
@@ -14,6 +14,8 @@ import numpy as np
 import psutil
 from torch.utils.data import Dataset
 
+from ultralytics.data.labels import LabelStore
+from ultralytics.data.shard import ImageShard, resize_image, shard_path
 from ultralytics.data.utils import FORMATS_HELP_MSG, HELP_URL, IMG_FORMATS
 from ultralytics.utils import DEFAULT_CFG, LOCAL_RANK, LOGGER, NUM_THREADS, TQDM
 
@@ -25,11 +27,14 @@ class BaseDataset(Dataset):
     Args:
         img_path (str): Path to the folder containing images.
         imgsz (int, optional): Image size. Defaults to 640.
-        cache (bool, optional): Cache images to RAM or disk during training. Defaults to False.
+        cache (bool | str, optional): Cache images to RAM, disk or a memory-mapped shard ('mmap') during training.
+            Defaults to False.
         augment (bool, optional): If True, data augmentation is applied. Defaults to True.
         hyp (dict, optional): Hyperparameters to apply data augmentation. Defaults to None.
         prefix (str, optional): Prefix to print in log messages. Defaults to ''.
         rect (bool, optional): If True, rectangular training is used. Defaults to False.
+        buckets (bool, optional): If True, group images into aspect ratio buckets with rectangular shapes that batches
+            are shuffled within, see AspectBucketBatchSampler. Defaults to False.
         batch_size (int, optional): Size of batches. Defaults to None.
         stride (int, optional): Stride. Defaults to 32.
         pad (float, optional): Padding. Defaults to 0.0.
@@ -39,10 +44,12 @@ class BaseDataset(Dataset):
 
     Attributes:
         im_files (list): List of image file paths.
-        labels (list): List of label data dictionaries.
+        labels (list | LabelStore): Per-image label dictionaries, or a columnar LabelStore producing them on demand.
         ni (int): Number of images in the dataset.
         ims (list): List of loaded images.
         npy_files (list): List of numpy file paths.
+        shard (ImageShard | None): Memory-mapped shard of pre-resized images if cache='mmap'.
+        buckets (List[np.ndarray] | None): Image indices of each aspect ratio bucket if `buckets`, else None.
         transforms (callable): Image transformation function.
     """
 
@@ -61,6 +68,7 @@ class BaseDataset(Dataset):
         single_cls=False,
         classes=None,
         fraction=1.0,
+        buckets=False,
     ):
         """Initialize BaseDataset with given configuration and options."""
         super().__init__()
@@ -74,11 +82,15 @@ class BaseDataset(Dataset):
         self.labels = self.get_labels()
         self.update_labels(include_class=classes)  # single_cls and include_class
         self.ni = len(self.labels)  # number of images
-        self.rect = rect
+        self.rect = rect or buckets
         self.batch_size = batch_size
         self.stride = stride
         self.pad = pad
-        if self.rect:
+        self.buckets = None
+        if buckets:
+            assert self.batch_size is not None
+            self.set_buckets()
+        elif self.rect:
             assert self.batch_size is not None
             self.set_rectangle()
 
@@ -86,9 +98,10 @@ class BaseDataset(Dataset):
         self.buffer = []  # buffer size = batch size
         self.max_buffer_length = min((self.ni, self.batch_size * 8, 1000)) if self.augment else 0
 
-        # Cache images (options are cache = True, False, None, "ram", "disk")
+        # Cache images (options are cache = True, False, None, "ram", "disk", "mmap")
         self.ims, self.im_hw0, self.im_hw = [None] * self.ni, [None] * self.ni, [None] * self.ni
         self.npy_files = [Path(f).with_suffix(".npy") for f in self.im_files]
+        self.shard = None
         self.cache = cache.lower() if isinstance(cache, str) else "ram" if cache is True else None
         if self.cache == "ram" and self.check_cache_ram():
             if hyp.deterministic:
@@ -99,6 +112,8 @@ class BaseDataset(Dataset):
             self.cache_images()
         elif self.cache == "disk" and self.check_cache_disk():
             self.cache_images()
+        elif self.cache == "mmap":
+            self.cache_images_to_shard()
 
         # Transforms
         self.transforms = self.build_transforms(hyp=hyp)
@@ -131,6 +146,10 @@ class BaseDataset(Dataset):
 
     def update_labels(self, include_class: Optional[list]):
         """Update labels to include only these classes (optional)."""
+        if isinstance(self.labels, LabelStore):
+            if include_class is not None or self.single_cls:
+                self.labels = self.labels.update(include_class, self.single_cls)
+            return
         include_class_array = np.array(include_class).reshape(1, -1)
         for i in range(len(self.labels)):
             if include_class is not None:
@@ -152,26 +171,23 @@ class BaseDataset(Dataset):
         """Loads 1 image from dataset index 'i', returns (im, resized hw)."""
         im, f, fn = self.ims[i], self.im_files[i], self.npy_files[i]
         if im is None:  # not cached in RAM
-            if fn.exists():  # load npy
-                try:
-                    im = np.load(fn)
-                except Exception as e:
-                    LOGGER.warning(f"{self.prefix}WARNING ⚠️ Removing corrupt *.npy image file {fn} due to: {e}")
-                    Path(fn).unlink(missing_ok=True)
+            if self.shard is not None and self.shard.rect == rect_mode and f in self.shard:  # pre-resized mmap image
+                im, (h0, w0) = self.shard.load(f)
+            else:
+                if fn.exists():  # load npy
+                    try:
+                        im = np.load(fn)
+                    except Exception as e:
+                        LOGGER.warning(f"{self.prefix}WARNING ⚠️ Removing corrupt *.npy image file {fn} due to: {e}")
+                        Path(fn).unlink(missing_ok=True)
+                        im = cv2.imread(f)  # BGR
+                else:  # read image
                     im = cv2.imread(f)  # BGR
-            else:  # read image
-                im = cv2.imread(f)  # BGR
-            if im is None:
-                raise FileNotFoundError(f"Image Not Found {f}")
+                if im is None:
+                    raise FileNotFoundError(f"Image Not Found {f}")
 
-            h0, w0 = im.shape[:2]  # orig hw
-            if rect_mode:  # resize long side to imgsz while maintaining aspect ratio
-                r = self.imgsz / max(h0, w0)  # ratio
-                if r != 1:  # if sizes are not equal
-                    w, h = (min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz))
-                    im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
-            elif not (h0 == w0 == self.imgsz):  # resize by stretching image to square imgsz
-                im = cv2.resize(im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR)
+                h0, w0 = im.shape[:2]  # orig hw
+                im = resize_image(im, self.imgsz, rect_mode)
 
             # Add to buffer if training with augmentations
             if self.augment:
@@ -208,6 +224,29 @@ class BaseDataset(Dataset):
         if not f.exists():
             np.save(f.as_posix(), cv2.imread(self.im_files[i]), allow_pickle=False)
 
+    def cache_images_to_shard(self):
+        """Map the packed image shard for this dataset, building or rebuilding it if images are missing or changed."""
+        rect_mode = inspect.signature(self.load_image).parameters["rect_mode"].default  # False for RT-DETR
+        file = shard_path(self.img_path, self.imgsz, rect_mode)
+        try:
+            shard = ImageShard(file)
+            assert shard.imgsz == self.imgsz and shard.rect == rect_mode, "shard settings differ"
+            stale = shard.stale(self.im_files)
+            assert not stale, f"{len(stale)} images missing or changed"
+            LOGGER.info(f"{self.prefix}Using image shard {file} ({len(shard)} images)")
+            self.shard = shard
+            return
+        except (FileNotFoundError, ValueError, AssertionError, KeyError) as e:
+            reason = str(e)  # rebuilt outside this block, as the traceback keeps the old shard mapped
+        shard = None  # unmap the old shard, a mapped file cannot be replaced on Windows
+        if file.exists():
+            LOGGER.info(f"{self.prefix}Rebuilding image shard {file}: {reason}")
+        try:
+            self.shard = ImageShard.build(file, self.im_files, self.imgsz, rect_mode, prefix=self.prefix)
+        except OSError as e:
+            self.cache = None
+            LOGGER.warning(f"{self.prefix}WARNING ⚠️ Could not write image shard {file}, not caching images: {e}")
+
     def check_cache_disk(self, safety_margin=0.5):
         """Check image caching requirements vs available disk space."""
         import shutil
@@ -263,11 +302,17 @@ class BaseDataset(Dataset):
         bi = np.floor(np.arange(self.ni) / self.batch_size).astype(int)  # batch index
         nb = bi[-1] + 1  # number of batches
 
-        s = np.array([x.pop("shape") for x in self.labels])  # hw
+        if isinstance(self.labels, LabelStore):
+            s = self.labels.shapes  # hw
+        else:
+            s = np.array([x.pop("shape") for x in self.labels])  # hw
         ar = s[:, 0] / s[:, 1]  # aspect ratio
         irect = ar.argsort()
         self.im_files = [self.im_files[i] for i in irect]
-        self.labels = [self.labels[i] for i in irect]
+        if isinstance(self.labels, LabelStore):
+            self.labels = self.labels.subset(irect)
+        else:
+            self.labels = [self.labels[i] for i in irect]
         ar = ar[irect]
 
         # Set training image shapes
@@ -283,6 +328,66 @@ class BaseDataset(Dataset):
         self.batch_shapes = np.ceil(np.array(shapes) * self.imgsz / self.stride + self.pad).astype(int) * self.stride
         self.batch = bi  # batch index of image
 
+    def set_buckets(self):
+        """
+        Group images into aspect ratio buckets with rectangular shapes, so rectangular batches can be shuffled.
+
+        Images whose own rectangle (as set_rectangle would compute for a batch of one) is the same share a bucket.
+        Buckets smaller than a batch are merged with their aspect ratio neighbours, and every bucket takes the largest
+        shape of its images. Sets `buckets`, and `batch` and `batch_shapes` as the bucket and shape of every image.
+        """
+        s = self.labels.shapes if isinstance(self.labels, LabelStore) else np.array([x["shape"] for x in self.labels])
+        ar = s[:, 0] / s[:, 1]  # aspect ratio
+        shapes = np.where((ar < 1)[:, None], np.stack((ar, np.ones_like(ar)), 1), 1)
+        shapes[ar > 1, 1] = 1 / ar[ar > 1]
+        shapes = np.ceil(shapes * self.imgsz / self.stride + self.pad).astype(int) * self.stride  # per-image shape
+
+        order = ar.argsort(kind="stable")
+        groups = np.split(order, np.flatnonzero((np.diff(shapes[order], axis=0) != 0).any(1)) + 1)
+        buckets, current = [], []
+        for g in groups:
+            current.append(g)
+            if sum(map(len, current)) >= self.batch_size:
+                buckets.append(np.concatenate(current))
+                current = []
+        if current:  # merge a final small bucket into its neighbour
+            buckets[-1:] = [np.concatenate(buckets[-1:] + current)]
+        self.buckets = buckets
+        self.batch_shapes = np.stack([shapes[b].max(0) for b in buckets])
+        self.batch = np.zeros(self.ni, dtype=int)  # bucket index of image
+        for i, b in enumerate(buckets):
+            self.batch[b] = i
+        r = self.bucket_report()
+        LOGGER.info(
+            f"{self.prefix}{len(buckets)} aspect ratio buckets, {r['pixels'] / r['square_pixels']:.0%} of the pixels "
+            f"and {1 - r['padding'] / max(r['square_padding'], 1):.0%} less padding than {self.imgsz}x{self.imgsz} "
+            f"letterboxes"
+        )
+
+    def bucket_report(self):
+        """
+        Compare the pixels of rectangular batch shapes against square `imgsz` letterboxes.
+
+        Returns:
+            (dict): Number of 'images', total 'pixels' and 'padding' pixels with the current batch shapes, and
+                'square_pixels' and 'square_padding' with square imgsz letterboxes.
+        """
+        s = self.labels.shapes if isinstance(self.labels, LabelStore) else np.array([x["shape"] for x in self.labels])
+        r = self.imgsz / s.max(1, keepdims=True)
+        content = np.minimum(np.ceil(s * r), self.imgsz).prod(1).sum()  # resized image pixels, as load_image
+        if self.rect:
+            pixels = int(self.batch_shapes[self.batch].prod(1).sum())
+        else:
+            pixels = self.ni * self.imgsz**2
+        square = self.ni * self.imgsz**2
+        return {
+            "images": self.ni,
+            "pixels": pixels,
+            "padding": int(pixels - content),
+            "square_pixels": square,
+            "square_padding": int(square - content),
+        }
+
     def __getitem__(self, index):
         """Returns transformed label information for given index."""
         return self.transforms(self.get_image_and_label(index))
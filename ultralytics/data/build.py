@@ -1,5 +1,6 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
+import math
 import os
 import random
 from pathlib import Path
@@ -20,8 +21,9 @@ from ultralytics.data.loaders import (
     SourceTypes,
     autocast_list,
 )
+from ultralytics.data.stream import YOLOStreamDataset, tar_files
 from ultralytics.data.utils import IMG_FORMATS, PIN_MEMORY, VID_FORMATS
-from ultralytics.utils import RANK, colorstr
+from ultralytics.utils import LOGGER, RANK, colorstr
 from ultralytics.utils.checks import check_file
 
 
@@ -35,11 +37,14 @@ class InfiniteDataLoader(dataloader.DataLoader):
     def __init__(self, *args, **kwargs):
         """Dataloader that infinitely recycles workers, inherits from DataLoader."""
         super().__init__(*args, **kwargs)
-        object.__setattr__(self, "batch_sampler", _RepeatSampler(self.batch_sampler))
+        if self.batch_sampler is not None:  # streams batch themselves and never end
+            object.__setattr__(self, "batch_sampler", _RepeatSampler(self.batch_sampler))
         self.iterator = super().__iter__()
 
     def __len__(self):
-        """Returns the length of the batch sampler's sampler."""
+        """Returns the length of the batch sampler's sampler, or the number of batches per epoch of a stream."""
+        if isinstance(self.dataset, dataloader.IterableDataset):  # endless stream, len(dataset) samples per epoch
+            return math.ceil(len(self.dataset) / self.dataset.batch_size)
         return len(self.batch_sampler.sampler)
 
     def __iter__(self):
@@ -64,6 +69,103 @@ class InfiniteDataLoader(dataloader.DataLoader):
         self.iterator = self._get_iterator()
 
 
+class BatchPrefetcher:
+    """
+    Wraps a DataLoader so the next batch is copied to a CUDA device on a side stream while the current batch trains.
+
+    Batch tensors are staged through a ring of recycled pinned host buffers, preallocated for `batch` images of `imgsz`
+    and grown only when a larger batch arrives, instead of pinning freshly allocated memory every step. The DataLoader's
+    own pin_memory thread is disabled as the ring replaces it. On other devices batches are yielded unchanged.
+
+    Attributes:
+        loader (InfiniteDataLoader): Wrapped DataLoader, whose other attributes are available on the prefetcher.
+        device (torch.device): Device batches are copied to.
+        stream (torch.cuda.Stream | None): Side stream for host-to-device copies, None if not CUDA.
+        buffers (List[dict]): Pinned host tensors by batch key, reused round-robin.
+
+    Examples:
+        >>> loader = BatchPrefetcher(build_dataloader(dataset, batch=16, workers=8), device="cuda:0", imgsz=640)
+        >>> for batch in loader:
+        ...     assert batch["img"].is_cuda
+    """
+
+    def __init__(self, loader, device, batch=None, imgsz=None, buffers=3):
+        """
+        Initialize the prefetcher and its pinned buffer ring.
+
+        Args:
+            loader (InfiniteDataLoader): DataLoader yielding dictionaries of tensors.
+            device (str | torch.device): Target device.
+            batch (int, optional): Batch size, used with `imgsz` to preallocate the image buffers.
+            imgsz (int, optional): Image size, used with `batch` to preallocate the image buffers.
+            buffers (int): Number of pinned buffer sets. The host waits for the copy out of a set before refilling it.
+        """
+        self.loader = loader
+        self.device = torch.device(device)
+        self.stream = torch.cuda.Stream(self.device) if self.device.type == "cuda" else None
+        self.buffers = [{} for _ in range(buffers)]
+        self.events = [None] * buffers
+        self.step = 0
+        if self.stream is not None:
+            if batch and imgsz:
+                for buffer in self.buffers:
+                    buffer["img"] = torch.empty(batch * 3 * imgsz * imgsz, dtype=torch.uint8, pin_memory=True)
+            if loader.pin_memory:  # the buffer ring pins batches instead
+                loader.pin_memory = False
+                if hasattr(loader, "reset"):
+                    loader.reset()
+
+    def __getattr__(self, name):
+        """Forward other attributes, i.e. dataset, sampler, num_workers and reset(), to the wrapped DataLoader."""
+        if name == "loader":
+            raise AttributeError(name)
+        return getattr(self.loader, name)
+
+    def __len__(self):
+        """Return the number of batches of the wrapped DataLoader."""
+        return len(self.loader)
+
+    def __iter__(self):
+        """Yield batches already on the device, with the copy of the following batch in flight."""
+        if self.stream is None:
+            yield from self.loader
+            return
+        current = torch.cuda.current_stream(self.device)
+        it = iter(self.loader)
+        batch = next(it, None)
+        batch = None if batch is None else self._copy(batch)
+        while batch is not None:
+            current.wait_stream(self.stream)
+            for v in batch.values():
+                if isinstance(v, torch.Tensor) and v.is_cuda:
+                    v.record_stream(current)  # allocated on the side stream, used on the current one
+            following = next(it, None)
+            following = None if following is None else self._copy(following)
+            yield batch
+            batch = following
+
+    def _copy(self, batch):
+        """Stage the tensors of a batch through the next pinned buffer set and copy them to the device async."""
+        k = self.step % len(self.buffers)
+        self.step += 1
+        if self.events[k] is not None:
+            self.events[k].synchronize()  # the previous copy out of this buffer set has finished
+        buffer = self.buffers[k]
+        with torch.cuda.stream(self.stream):
+            for key, v in batch.items():
+                if not isinstance(v, torch.Tensor):
+                    continue
+                pinned = buffer.get(key)
+                if pinned is None or pinned.dtype != v.dtype or pinned.numel() < v.numel():
+                    pinned = buffer[key] = torch.empty(2 * v.numel() or 1, dtype=v.dtype, pin_memory=True)  # grow
+                host = pinned[: v.numel()].view(v.shape)
+                host.copy_(v)
+                batch[key] = host.to(self.device, non_blocking=True)
+            self.events[k] = torch.cuda.Event()
+            self.events[k].record(self.stream)
+        return batch
+
+
 class _RepeatSampler:
     """
     Sampler that repeats forever.
@@ -82,6 +184,65 @@ class _RepeatSampler:
             yield from iter(self.sampler)
 
 
+class AspectBucketBatchSampler(torch.utils.data.Sampler):
+    """
+    Batch sampler drawing shuffled batches from the aspect ratio buckets of a dataset built with `buckets=True`.
+
+    Every batch holds images of one bucket, so it is collated at the bucket's rectangular shape instead of a square
+    letterbox. Images are shuffled within buckets and batches across buckets, with a new order every epoch. Under DDP
+    all ranks plan the same global batch list and each takes every world_size-th batch, padded by repeating batches so
+    every rank runs the same number of steps.
+
+    Attributes:
+        dataset (BaseDataset): Dataset with `buckets` set.
+        batch_size (int): Batch size per rank.
+        shuffle (bool): Shuffle images within buckets and the order of batches.
+        rank (int): Rank of this process, 0 if not distributed.
+        num_replicas (int): Number of distributed processes.
+        seed (int): Base seed of the per-epoch shuffles.
+        epoch (int): Epoch of the next iteration, advanced by every pass.
+
+    Examples:
+        >>> dataset = YOLODataset(img_path="path/to/images", buckets=True, batch_size=16)
+        >>> sampler = AspectBucketBatchSampler(dataset, batch_size=16)
+        >>> loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=dataset.collate_fn)
+    """
+
+    def __init__(self, dataset, batch_size, shuffle=True, rank=-1, seed=0):
+        """Initialize the sampler, reading the rank and world size from torch.distributed if rank is not -1."""
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rank = torch.distributed.get_rank() if rank != -1 else 0  # global rank, `rank` may be LOCAL_RANK
+        self.num_replicas = torch.distributed.get_world_size() if rank != -1 else 1
+        self.seed = seed
+        self.epoch = 0
+
+    def __len__(self):
+        """Return the number of batches per rank and epoch."""
+        n = sum(math.ceil(len(b) / self.batch_size) for b in self.dataset.buckets)
+        return math.ceil(n / self.num_replicas)
+
+    def __iter__(self):
+        """Yield the image indices of this rank's batches for the next epoch."""
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        batches = []
+        for bucket in self.dataset.buckets:
+            bucket = rng.permutation(bucket) if self.shuffle else bucket
+            batches += [bucket[i : i + self.batch_size] for i in range(0, len(bucket), self.batch_size)]
+        if self.shuffle:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        n = len(self) * self.num_replicas
+        batches = (batches * math.ceil(n / len(batches)))[:n]  # equal batch counts on every rank
+        for b in batches[self.rank :: self.num_replicas]:
+            yield b.tolist()
+
+    def set_epoch(self, epoch):
+        """Set the epoch of the next iteration, as DistributedSampler.set_epoch."""
+        self.epoch = epoch
+
+
 def seed_worker(worker_id):  # noqa
     """Set dataloader worker seed https://pytorch.org/docs/stable/notes/randomness.html#dataloader."""
     worker_seed = torch.initial_seed() % 2**32
@@ -90,7 +251,25 @@ def seed_worker(worker_id):  # noqa
 
 
 def build_yolo_dataset(cfg, img_path, batch, data, mode="train", rect=False, stride=32, multi_modal=False):
-    """Build YOLO Dataset."""
+    """Build YOLO Dataset, streamed if img_path points to tar shards."""
+    if not multi_modal and tar_files(img_path):
+        ignored = [k for k in ("rect", "cache", "buckets") if getattr(cfg, k)] + ["fraction"] * (cfg.fraction < 1)
+        if ignored and mode == "train":
+            LOGGER.warning(f"WARNING ⚠️ {', '.join(ignored)} not supported for datasets streamed from tar shards")
+        return YOLOStreamDataset(
+            img_path=img_path,
+            imgsz=cfg.imgsz,
+            batch_size=batch,
+            augment=mode == "train",
+            hyp=cfg,
+            prefix=colorstr(f"{mode}: "),
+            single_cls=cfg.single_cls or False,
+            classes=cfg.classes,
+            data=data,
+            task=cfg.task,
+            buffer_size=cfg.shuffle_buffer,
+            seed=cfg.seed,
+        )
     dataset = YOLOMultiModalDataset if multi_modal else YOLODataset
     return dataset(
         img_path=img_path,
@@ -108,6 +287,7 @@ def build_yolo_dataset(cfg, img_path, batch, data, mode="train", rect=False, str
         classes=cfg.classes,
         data=data,
         fraction=cfg.fraction if mode == "train" else 1.0,
+        buckets=cfg.buckets and mode == "train",  # validation keeps rect batches
     )
 
 
@@ -129,25 +309,34 @@ def build_grounding(cfg, img_path, json_file, batch, mode="train", rect=False, s
         task=cfg.task,
         classes=cfg.classes,
         fraction=cfg.fraction if mode == "train" else 1.0,
+        buckets=cfg.buckets and mode == "train",  # validation keeps rect batches
     )
 
 
 def build_dataloader(dataset, batch, workers, shuffle=True, rank=-1):
     """Return an InfiniteDataLoader or DataLoader for training or validation set."""
+    stream = isinstance(dataset, dataloader.IterableDataset)
+    if stream and rank != -1:  # streams shuffle and split themselves across ranks and workers
+        dataset.rank, dataset.world_size = torch.distributed.get_rank(), torch.distributed.get_world_size()
     batch = min(batch, len(dataset))
     nd = torch.cuda.device_count()  # number of CUDA devices
     nw = min(os.cpu_count() // max(nd, 1), workers)  # number of workers
-    sampler = None if rank == -1 else distributed.DistributedSampler(dataset, shuffle=shuffle)
+    sampler = None if rank == -1 or stream else distributed.DistributedSampler(dataset, shuffle=shuffle)
     generator = torch.Generator()
     generator.manual_seed(6148914691236517205 + RANK)
+    if stream:  # streams collate their own batches
+        dataset.batch_size = batch
+        batching = {"batch_size": None}
+    elif getattr(dataset, "buckets", None):  # rectangular batches from shuffled aspect ratio buckets
+        batching = {"batch_sampler": AspectBucketBatchSampler(dataset, batch, shuffle=shuffle, rank=rank)}
+    else:
+        batching = {"batch_size": batch, "shuffle": shuffle and sampler is None, "sampler": sampler}
     return InfiniteDataLoader(
         dataset=dataset,
-        batch_size=batch,
-        shuffle=shuffle and sampler is None,
+        **batching,
         num_workers=nw,
-        sampler=sampler,
         pin_memory=PIN_MEMORY,
-        collate_fn=getattr(dataset, "collate_fn", None),
+        collate_fn=None if stream else getattr(dataset, "collate_fn", None),
         worker_init_fn=seed_worker,
         generator=generator,
     )
@@ -179,7 +368,7 @@ def check_source(source):
     return source, webcam, screenshot, from_img, in_memory, tensor
 
 
-def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
+def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False, workers=0, prefetch=2, processes=False):
     """
     Loads an inference source for object detection and applies necessary transformations.
 
@@ -188,6 +377,9 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
         batch (int, optional): Batch size for dataloaders. Default is 1.
         vid_stride (int, optional): The frame interval for video sources. Default is 1.
         buffer (bool, optional): Determined whether stream frames will be buffered. Default is False.
+        workers (int, optional): Number of decode workers reading image and video files ahead. Default is 0.
+        prefetch (int, optional): Number of batches decode workers read ahead. Default is 2.
+        processes (bool, optional): Decode images and capture streams in processes instead of threads. Default is False.
 
     Returns:
         dataset (Dataset): A dataset object for the specified input source.
@@ -201,13 +393,15 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
     elif in_memory:
         dataset = source
     elif stream:
-        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer)
+        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer, processes=processes)
     elif screenshot:
         dataset = LoadScreenshots(source)
     elif from_img:
         dataset = LoadPilAndNumpy(source)
     else:
-        dataset = LoadImagesAndVideos(source, batch=batch, vid_stride=vid_stride)
+        dataset = LoadImagesAndVideos(
+            source, batch=batch, vid_stride=vid_stride, workers=workers, prefetch=prefetch, processes=processes
+        )
 
     # Attach source types to the dataset
     setattr(dataset, "source_type", source_type)
@@ -11,12 +11,14 @@ import numpy as np
 import torch
 from PIL import Image
 from torch.utils.data import ConcatDataset
+from torch.utils.data.dataloader import default_collate
 
-from ultralytics.utils import LOCAL_RANK, NUM_THREADS, TQDM, colorstr
+from ultralytics.utils import LOCAL_RANK, NUM_THREADS, TQDM, colorstr, is_dir_writeable
 from ultralytics.utils.ops import resample_segments
 from ultralytics.utils.torch_utils import TORCHVISION_0_18
 
 from .augment import (
+    BatchAugment,
     Compose,
     Format,
     Instances,
@@ -27,9 +29,11 @@ from .augment import (
     v8_transforms,
 )
 from .base import BaseDataset
+from .labels import LabelStore, is_label_store
 from .utils import (
     HELP_URL,
     LOGGER,
+    get_file_stats,
     get_hash,
     img2label_paths,
     load_dataset_cache_file,
@@ -63,32 +67,57 @@ class YOLODataset(BaseDataset):
         assert not (self.use_segments and self.use_keypoints), "Can not use both segments and keypoints."
         super().__init__(*args, **kwargs)
 
-    def cache_labels(self, path=Path("./labels.cache")):
+    def cache_labels(self, path=Path("./labels.cache"), previous=None):
         """
         Cache dataset labels, check images and read shapes.
 
+        Only images that are new, or whose image or label file size or mtime changed since `previous` was built, are
+        verified again and entries of deleted images are dropped. The numbers of reused, re-verified and removed entries
+        are stored in `label_scan`. A changed cache is returned in memory, without references to the `previous` file,
+        for get_labels() to save once the previous file is unmapped.
+
         Args:
-            path (Path): Path where to save the cache file. Default is Path("./labels.cache").
+            path (Path): Path of the cache file. Default is Path("./labels.cache").
+            previous (LabelStore, optional): Labels of the existing cache file to reuse.
 
         Returns:
-            (dict): labels.
+            (LabelStore): Columnar labels with 'results', 'msgs' and 'corrupt' metadata, `previous` if unchanged.
         """
-        x = {"labels": []}
-        nm, nf, ne, nc, msgs = 0, 0, 0, 0, []  # number missing, found, empty, corrupt, messages
+        nm, nf, ne, nc, msgs = 0, 0, 0, 0, {}  # number missing, found, empty, corrupt, messages
         desc = f"{self.prefix}Scanning {path.parent / path.stem}..."
-        total = len(self.im_files)
         nkpt, ndim = self.data.get("kpt_shape", (0, 0))
         if self.use_keypoints and (nkpt <= 0 or ndim not in {2, 3}):
             raise ValueError(
                 "'kpt_shape' in data.yaml missing or incorrect. Should be a list with [number of "
                 "keypoints, number of dims (2 for x,y or 3 for x,y,visible)], i.e. 'kpt_shape: [17, 3]'"
             )
+
+        # Match files against the fingerprints of the previous cache
+        stats = np.concatenate((get_file_stats(self.im_files), get_file_stats(self.label_files)), 1)
+        reuse, corrupt, found, files = np.full(len(self.im_files), -1), {}, 0, set(self.im_files)
+        if previous is not None and len(previous):
+            lookup = {f: i for i, f in enumerate(previous.im_files)}
+            j = np.array([lookup.get(f, -1) for f in self.im_files], dtype=np.int64)
+            stored = np.concatenate((previous.arrays["im_stat"], previous.arrays["label_stat"]), 1)[previous.order]
+            reuse = np.where((j >= 0) & (stored[j] == stats).all(1), j, -1)
+            found = int((j >= 0).sum())
+        if previous is not None:
+            corrupt = {f: c for f, c in previous.meta.get("corrupt", {}).items() if f in files}
+            msgs = {f: m for f, m in previous.meta.get("msgs", {}).items() if f in files}
+        todo = [k for k, f in enumerate(self.im_files) if reuse[k] < 0 and corrupt.get(f) != stats[k].tolist()]
+        removed = len(previous) - found if previous is not None else 0
+        if previous is not None and not todo and not removed and len(corrupt) == len(previous.meta.get("corrupt", {})):
+            self.label_scan = {"reused": len(previous), "verified": 0, "removed": 0}
+            return previous  # unchanged
+
+        # Verify new and changed files
+        labels, verified = [], []
         with ThreadPool(NUM_THREADS) as pool:
             results = pool.imap(
                 func=verify_image_label,
                 iterable=zip(
-                    self.im_files,
-                    self.label_files,
+                    [self.im_files[k] for k in todo],
+                    [self.label_files[k] for k in todo],
                     repeat(self.prefix),
                     repeat(self.use_keypoints),
                     repeat(len(self.data["names"])),
@@ -96,14 +125,17 @@ class YOLODataset(BaseDataset):
                     repeat(ndim),
                 ),
             )
-            pbar = TQDM(results, desc=desc, total=total)
-            for im_file, lb, shape, segments, keypoint, nm_f, nf_f, ne_f, nc_f, msg in pbar:
+            pbar = TQDM(zip(todo, results), desc=desc, total=len(todo))
+            for k, (im_file, lb, shape, segments, keypoint, nm_f, nf_f, ne_f, nc_f, msg) in pbar:
                 nm += nm_f
                 nf += nf_f
                 ne += ne_f
                 nc += nc_f
+                corrupt.pop(self.im_files[k], None)
+                msgs.pop(self.im_files[k], None)
                 if im_file:
-                    x["labels"].append(
+                    verified.append(k)
+                    labels.append(
                         {
                             "im_file": im_file,
                             "shape": shape,
@@ -115,68 +147,105 @@ class YOLODataset(BaseDataset):
                             "bbox_format": "xywh",
                         }
                     )
+                elif nc_f:
+                    corrupt[self.im_files[k]] = stats[k].tolist()
                 if msg:
-                    msgs.append(msg)
+                    msgs[self.im_files[k]] = msg
                 pbar.desc = f"{desc} {nf} images, {nm + ne} backgrounds, {nc} corrupt"
             pbar.close()
 
-        if msgs:
-            LOGGER.info("\n".join(msgs))
+        # Merge reused and verified entries in image order
+        keep = np.nonzero(reuse >= 0)[0]
+        new = LabelStore.from_labels(labels, {"im_stat": stats[verified, :2], "label_stat": stats[verified, 2:]})
+        parts = [previous.subset(reuse[keep]), new] if len(keep) else [new]
+        x = LabelStore.concat(parts).subset(np.argsort(np.concatenate((keep, verified)), kind="stable"), compact=True)
+        n, exists = np.diff(x.arrays["instance_offsets"]), x.arrays["label_stat"][:, 0] >= 0
+        nf, nm, ne = int(exists.sum()), int((~exists).sum()), int((exists & (n == 0)).sum())
+        x.meta = {"results": (nf, nm, ne, len(corrupt), len(self.im_files)), "msgs": msgs, "corrupt": corrupt}
+        self.label_scan = {"reused": len(keep), "verified": len(todo), "removed": removed}
+        if todo and msgs:
+            LOGGER.info("\n".join(msgs.values()))
         if nf == 0:
             LOGGER.warning(f"{self.prefix}WARNING ⚠️ No labels found in {path}. {HELP_URL}")
-        x["hash"] = get_hash(self.label_files + self.im_files)
-        x["results"] = nf, nm, ne, nc, len(self.im_files)
-        x["msgs"] = msgs  # warnings
-        save_dataset_cache_file(self.prefix, path, x, DATASET_CACHE_VERSION)
+        if previous is not None:
+            LOGGER.info(f"{self.prefix}Label cache: {len(keep)} reused, {len(todo)} re-verified, {removed} removed")
         return x
 
+    def save_label_cache(self, path, labels):
+        """Save a LabelStore as the *.cache file at path, returning it memory-mapped from the new file if saved."""
+        if not is_dir_writeable(path.parent):
+            LOGGER.warning(f"{self.prefix}WARNING ⚠️ Cache directory {path.parent} is not writeable, cache not saved.")
+            return labels
+        labels.save(path)
+        LOGGER.info(f"{self.prefix}New cache created: {path}")
+        return LabelStore.load(path)
+
+    def load_label_cache(self, path):
+        """Load a columnar *.cache file, migrating a legacy pickled DATASET_CACHE_VERSION cache without re-scanning."""
+        if is_label_store(path):
+            return LabelStore.load(path)
+        cache = load_dataset_cache_file(path)
+        assert cache["version"] == DATASET_CACHE_VERSION  # legacy cache of the last pickled version
+        assert cache["hash"] == get_hash(self.label_files + self.im_files)  # identical hash
+        files = [lb["im_file"] for lb in cache["labels"]]
+        columns = {"im_stat": get_file_stats(files), "label_stat": get_file_stats(img2label_paths(files))}
+        meta = {"results": cache["results"], "msgs": {}, "corrupt": {}}  # corrupt images are verified once more
+        LOGGER.info(f"{self.prefix}Migrating {path} from version {cache['version']} to a columnar label cache")
+        return self.save_label_cache(path, LabelStore.from_labels(cache["labels"], columns, meta))
+
     def get_labels(self):
-        """Returns dictionary of labels for YOLO training."""
+        """Returns the LabelStore of per-image labels for YOLO training."""
         self.label_files = img2label_paths(self.im_files)
         cache_path = Path(self.label_files[0]).parent.with_suffix(".cache")
         try:
-            cache, exists = load_dataset_cache_file(cache_path), True  # attempt to load a *.cache file
-            assert cache["version"] == DATASET_CACHE_VERSION  # matches current version
-            assert cache["hash"] == get_hash(self.label_files + self.im_files)  # identical hash
-        except (FileNotFoundError, AssertionError, AttributeError):
-            cache, exists = self.cache_labels(cache_path), False  # run cache ops
+            previous = self.load_label_cache(cache_path)  # attempt to load a *.cache file
+        except (FileNotFoundError, AssertionError, AttributeError, ValueError, KeyError):
+            previous = None
+        cache = self.cache_labels(cache_path, previous)  # re-verify new and changed files only
+        exists = cache is previous
+        previous = None  # unmap the previous file, a mapped file cannot be replaced on Windows
+        if not exists:
+            cache = self.save_label_cache(cache_path, cache)
 
         # Display cache
-        nf, nm, ne, nc, n = cache.pop("results")  # found, missing, empty, corrupt, total
+        nf, nm, ne, nc, n = cache.meta["results"]  # found, missing, empty, corrupt, total
         if exists and LOCAL_RANK in {-1, 0}:
             d = f"Scanning {cache_path}... {nf} images, {nm + ne} backgrounds, {nc} corrupt"
             TQDM(None, desc=self.prefix + d, total=n, initial=n)  # display results
-            if cache["msgs"]:
-                LOGGER.info("\n".join(cache["msgs"]))  # display warnings
+            if cache.meta["msgs"]:
+                LOGGER.info("\n".join(cache.meta["msgs"].values()))  # display warnings
 
         # Read cache
-        [cache.pop(k) for k in ("hash", "version", "msgs")]  # remove items
-        labels = cache["labels"]
-        if not labels:
+        labels = cache
+        if not len(labels):
             LOGGER.warning(f"WARNING ⚠️ No images found in {cache_path}, training may not work correctly. {HELP_URL}")
-        self.im_files = [lb["im_file"] for lb in labels]  # update im_files
+        self.im_files = labels.im_files  # update im_files
 
         # Check if the dataset is all boxes or all segments
-        lengths = ((len(lb["cls"]), len(lb["bboxes"]), len(lb["segments"])) for lb in labels)
-        len_cls, len_boxes, len_segments = (sum(x) for x in zip(*lengths))
+        len_boxes, len_segments = labels.counts
         if len_segments and len_boxes != len_segments:
             LOGGER.warning(
                 f"WARNING ⚠️ Box and segment counts should be equal, but got len(segments) = {len_segments}, "
                 f"len(boxes) = {len_boxes}. To resolve this only boxes will be used and all segments will be removed. "
                 "To avoid this please supply either a detect or segment dataset, not a detect-segment mixed dataset."
             )
-            for lb in labels:
-                lb["segments"] = []
-        if len_cls == 0:
+            labels = labels.drop_segments()
+        if len_boxes == 0:
             LOGGER.warning(f"WARNING ⚠️ No labels found in {cache_path}, training may not work correctly. {HELP_URL}")
         return labels
 
     def build_transforms(self, hyp=None):
         """Builds and appends transforms to the list."""
+        self.batch_augment = None  # stages run on collated batches by the trainer
         if self.augment:
             hyp.mosaic = hyp.mosaic if self.augment and not self.rect else 0.0
             hyp.mixup = hyp.mixup if self.augment and not self.rect else 0.0
-            transforms = v8_transforms(self, self.imgsz, hyp)
+            texts = isinstance(self, (YOLOMultiModalDataset, GroundingDataset))  # texts are sampled per image
+            mosaic = not (self.use_segments or self.use_obb or self.rect or texts)
+            stages = BatchAugment.select(getattr(hyp, "batch_augment", False), mosaic=mosaic)
+            transforms = v8_transforms(self, self.imgsz, hyp, batch_augment=stages)
+            if stages:
+                self.batch_augment = BatchAugment(hyp, stages, self.imgsz, flip_idx=self.data.get("flip_idx"))
         else:
             transforms = Compose([LetterBox(new_shape=(self.imgsz, self.imgsz), scaleup=False)])
         transforms.append(
@@ -230,21 +299,20 @@ class YOLODataset(BaseDataset):
 
     @staticmethod
     def collate_fn(batch):
-        """Collates data samples into batches."""
+        """Collates data samples into batches, stacking images straight into shared memory in DataLoader workers."""
         new_batch = {}
         keys = batch[0].keys()
         values = list(zip(*[list(b.values()) for b in batch]))
         for i, k in enumerate(keys):
             value = values[i]
             if k == "img":
-                value = torch.stack(value, 0)
+                value = default_collate(value)  # stacks into a shared-memory tensor in workers, avoiding a copy
             if k in {"masks", "keypoints", "bboxes", "cls", "segments", "obb"}:
                 value = torch.cat(value, 0)
             new_batch[k] = value
-        new_batch["batch_idx"] = list(new_batch["batch_idx"])
-        for i in range(len(new_batch["batch_idx"])):
-            new_batch["batch_idx"][i] += i  # add target image index for build_targets()
+        counts = torch.tensor([len(x) for x in new_batch["batch_idx"]])
         new_batch["batch_idx"] = torch.cat(new_batch["batch_idx"], 0)
+        new_batch["batch_idx"] += torch.repeat_interleave(torch.arange(len(counts)), counts)  # target image index
         return new_batch
 
 
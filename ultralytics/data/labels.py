@@ -0,0 +1,338 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Columnar, memory-mapped store of per-image detection, segmentation and pose labels used for *.cache files.
+
+Instead of a pickled list with one dict of small numpy arrays per image, labels are kept as a handful of concatenated
+arrays plus per-image and per-instance offset arrays in a single file. Loading maps the file, so startup cost does not
+grow with the number of images, and forked DataLoader workers read the labels from shared page cache pages rather than
+touching (and copy-on-write duplicating) millions of Python objects. Per-image label dicts are built on demand.
+
+File layout (all integers little-endian):
+    [64-byte aligned arrays ...][header: JSON][header length: uint64][magic: b'YOLOLBLS']
+
+Columns:
+    im_file (uint8) and im_file_offsets (n + 1): UTF-8 image paths
+    shape (n, 2): original image (height, width)
+    instance_offsets (n + 1): per-image ranges into the instance columns below
+    cls (N, 1), bboxes (N, 4): normalized xywh boxes
+    keypoints (N, nkpt, ndim): present for pose datasets only
+    has_segments (n,): whether the image's label file had polygons
+    segment_offsets (N + 1) and segments (P, 2): per-instance ranges into concatenated normalized polygon points
+    im_stat (n, 2), label_stat (n, 2): (size, mtime_ns) fingerprints of the image and label file when verified, with
+        -1 for a missing label file, so later scans only re-verify new or changed files
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+LABEL_STORE_VERSION = "2.1.0"
+IMAGE_COLUMNS = "shape", "has_segments", "im_stat", "label_stat"  # one row per image
+INSTANCE_COLUMNS = "cls", "bboxes", "keypoints"  # one row per instance
+LABEL_STORE_MAGIC = b"YOLOLBLS"
+
+
+def is_label_store(path):
+    """Return True if the file is a columnar label store, False for legacy pickled *.cache files."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < len(LABEL_STORE_MAGIC):
+            return False
+        f.seek(-len(LABEL_STORE_MAGIC), os.SEEK_END)
+        return f.read() == LABEL_STORE_MAGIC
+
+
+class LabelStore:
+    """
+    Sequence of per-image label dicts backed by columnar arrays.
+
+    Indexing returns a new dict with the keys produced by YOLODataset.cache_labels(), i.e. 'im_file', 'shape', 'cls',
+    'bboxes', 'segments', 'keypoints', 'normalized' and 'bbox_format', holding copies of the stored arrays.
+
+    Attributes:
+        arrays (dict): Column name to array, memory-mapped read-only when loaded from a file.
+        meta (dict): Cache metadata, i.e. 'version', 'results', {image: warning} 'msgs' and {image: fingerprints}
+            'corrupt' for images that failed verification.
+        order (np.ndarray): Indices of the stored images in the order they are exposed, for subsets and reordering.
+        file (Path | None): Backing file while `arrays` are the unmodified mapped columns.
+
+    Methods:
+        from_labels: Build a store from a list of label dicts.
+        concat: Concatenate stores.
+        load: Map a store file.
+        save: Write the store to a file atomically.
+        subset: Return a store exposing the given images.
+        update: Return a store keeping only some classes and/or with all classes set to 0.
+        drop_segments: Return a store with all segments removed.
+
+    Examples:
+        >>> store = LabelStore.from_labels(labels, {"im_stat": im_stat, "label_stat": label_stat})
+        >>> store.save("labels.cache")
+        >>> store = LabelStore.load("labels.cache")
+        >>> store[0]["bboxes"].shape
+        (3, 4)
+    """
+
+    def __init__(self, arrays, meta=None, order=None, file=None):
+        """Initialize the store from its columns, metadata and optional image order."""
+        self.arrays = arrays
+        self.meta = meta or {}
+        self.order = np.arange(len(arrays["shape"])) if order is None else np.asarray(order, dtype=np.int64)
+        self.file = file
+
+    def __getstate__(self):
+        """Pickle only the file path for mapped stores, so spawned DataLoader workers re-map instead of copying."""
+        if self.file is not None:
+            return {"file": self.file, "order": self.order}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        """Restore a pickled store, re-mapping its file if it has one."""
+        if "arrays" in state:
+            self.__dict__.update(state)
+        else:
+            store = self.load(state["file"])
+            self.__init__(store.arrays, store.meta, state["order"], store.file)
+
+    def __len__(self):
+        """Return the number of images."""
+        return len(self.order)
+
+    def __iter__(self):
+        """Iterate over per-image label dicts."""
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, i):
+        """Return the label dict of image i."""
+        a, j = self.arrays, self.order[i]
+        s, e = a["instance_offsets"][j : j + 2]
+        segments = []
+        if a["has_segments"][j]:
+            offsets = a["segment_offsets"][s : e + 1]
+            segments = [np.array(a["segments"][p0:p1]) for p0, p1 in zip(offsets[:-1], offsets[1:])]
+        return {
+            "im_file": self._im_file(j),
+            "shape": tuple(int(x) for x in a["shape"][j]),
+            "cls": np.array(a["cls"][s:e]),
+            "bboxes": np.array(a["bboxes"][s:e]),
+            "segments": segments,
+            "keypoints": np.array(a["keypoints"][s:e]) if "keypoints" in a else None,
+            "normalized": True,
+            "bbox_format": "xywh",
+        }
+
+    def _im_file(self, j):
+        """Decode the image path of stored image j."""
+        s, e = self.arrays["im_file_offsets"][j : j + 2]
+        return bytes(self.arrays["im_file"][s:e]).decode()
+
+    @property
+    def im_files(self):
+        """Return the list of image paths in exposed order."""
+        return [self._im_file(j) for j in self.order]
+
+    @property
+    def shapes(self):
+        """Return the (n, 2) original image (height, width) array in exposed order."""
+        return self.arrays["shape"][self.order]
+
+    @property
+    def counts(self):
+        """Return the number of instances and of instances with segments, over the exposed images."""
+        n = np.diff(self.arrays["instance_offsets"])[self.order]
+        return int(n.sum()), int(n[self.arrays["has_segments"][self.order]].sum())
+
+    @classmethod
+    def from_labels(cls, labels, columns=None, meta=None):
+        """
+        Build a store from label dicts as produced by YOLODataset.cache_labels().
+
+        Args:
+            labels (list): Per-image label dicts.
+            columns (dict, optional): Extra per-image columns, i.e. {'im_stat': (n, 2) array}.
+            meta (dict, optional): Cache metadata stored alongside the labels.
+
+        Returns:
+            (LabelStore): In-memory store.
+        """
+        files = [lb["im_file"].encode() for lb in labels]
+        n_inst = [len(lb["cls"]) for lb in labels]
+        segments = [s for lb in labels for s in lb["segments"]]
+        seg_len = []
+        for lb, n in zip(labels, n_inst):
+            seg_len += [len(s) for s in lb["segments"]] if lb["segments"] else [0] * n
+        arrays = {
+            "im_file": np.frombuffer(b"".join(files), dtype=np.uint8),
+            "im_file_offsets": np.cumsum([0] + [len(f) for f in files], dtype=np.int64),
+            "shape": np.array([lb["shape"] for lb in labels], dtype=np.int32).reshape(-1, 2),
+            "instance_offsets": np.cumsum([0] + n_inst, dtype=np.int64),
+            "cls": np.concatenate([lb["cls"] for lb in labels] or [np.zeros((0, 1))]).astype(np.float32),
+            "bboxes": np.concatenate([lb["bboxes"] for lb in labels] or [np.zeros((0, 4))]).astype(np.float32),
+            "has_segments": np.array([len(lb["segments"]) > 0 for lb in labels], dtype=bool),
+            "segment_offsets": np.cumsum([0] + seg_len, dtype=np.int64),
+            "segments": np.concatenate(segments or [np.zeros((0, 2))]).astype(np.float32),
+            **{k: np.asarray(v) for k, v in (columns or {}).items()},
+        }
+        if labels and labels[0]["keypoints"] is not None:
+            arrays["keypoints"] = np.concatenate([lb["keypoints"] for lb in labels]).astype(np.float32)
+        return cls(arrays, meta)
+
+    @classmethod
+    def concat(cls, stores, meta=None):
+        """
+        Concatenate the exposed images of several stores with the same columns, skipping empty stores.
+
+        Args:
+            stores (list): LabelStore instances.
+            meta (dict, optional): Metadata of the new store.
+
+        Returns:
+            (LabelStore): New in-memory store.
+        """
+        stores = [s.compact() for s in stores if len(s)] or [stores[0].compact()]
+        if len(stores) == 1:
+            return LabelStore(stores[0].arrays, meta)
+        arrays = {}
+        for k in stores[0].arrays:
+            if k.endswith("_offsets"):  # shift ragged offsets by the length of the preceding parts
+                shift = np.cumsum([0] + [s.arrays[k][-1] for s in stores])
+                parts = [s.arrays[k][:-1] + d for s, d in zip(stores, shift)]
+                arrays[k] = np.concatenate(parts + [shift[-1:]]).astype(np.int64)
+            else:
+                arrays[k] = np.concatenate([s.arrays[k] for s in stores])
+        return LabelStore(arrays, meta)
+
+    def compact(self):
+        """Return this store if it exposes all stored images in order, else a compacted in-memory copy."""
+        if len(self.order) == len(self.arrays["shape"]) and (np.diff(self.order) == 1).all():
+            return self
+        return self.subset(np.arange(len(self)), compact=True)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Map a store file read-only.
+
+        Args:
+            path (str | Path): Store file.
+
+        Returns:
+            (LabelStore): Store whose columns are memory-mapped views of the file.
+
+        Raises:
+            ValueError: If the file is not a label store or has a different LABEL_STORE_VERSION.
+        """
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(mm[-8:]) != LABEL_STORE_MAGIC:
+            raise ValueError(f"{path} is not a label store")
+        n = int(mm[-16:-8].view("<u8")[0])
+        header = json.loads(bytes(mm[-16 - n : -16]))
+        if header["meta"].get("version") != LABEL_STORE_VERSION:
+            raise ValueError(f"{path} has label store version {header['meta'].get('version')}")
+        arrays = {}
+        for k, (offset, dtype, shape) in header["arrays"].items():
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            arrays[k] = mm[offset : offset + nbytes].view(dtype).reshape(shape)
+        return cls(arrays, header["meta"], file=Path(path))
+
+    def save(self, path):
+        """Write the exposed images to a store file, replacing it atomically."""
+        store = self.compact()
+        path = Path(path)
+        tmp = path.with_suffix(f"{path.suffix}.tmp")
+        header = {"meta": {**store.meta, "version": LABEL_STORE_VERSION}, "arrays": {}}
+        with open(tmp, "wb") as f:
+            for k, x in store.arrays.items():
+                f.write(b"\0" * (-f.tell() % 64))  # align every column to 64 bytes
+                x = np.ascontiguousarray(x)
+                header["arrays"][k] = (f.tell(), x.dtype.str, x.shape)
+                f.write(x.tobytes())
+            header = json.dumps(header).encode()
+            f.write(header)
+            f.write(np.array([len(header)], dtype="<u8").tobytes())
+            f.write(LABEL_STORE_MAGIC)
+        os.replace(tmp, path)
+
+    def subset(self, indices, compact=False):
+        """
+        Return a store exposing the given images, i.e. a filtered or reordered dataset.
+
+        Args:
+            indices (np.ndarray): Indices into the currently exposed images.
+            compact (bool): Copy the selected rows into new in-memory columns instead of only remapping the order.
+
+        Returns:
+            (LabelStore): The new store, sharing columns with this one unless `compact`.
+        """
+        order = self.order[np.asarray(indices, dtype=np.int64)]
+        if not compact:
+            return LabelStore(self.arrays, self.meta, order, self.file)
+        inst, n = ranges(self.arrays["instance_offsets"], order)
+        return self._select(order, inst, np.repeat(np.arange(len(order)), n))
+
+    def update(self, include_class=None, single_cls=False):
+        """
+        Return a store keeping only instances of the included classes, and/or with every class set to 0.
+
+        Args:
+            include_class (list, optional): Classes to keep, all if None.
+            single_cls (bool): Set all classes to 0.
+
+        Returns:
+            (LabelStore): New in-memory store with the filtered instances.
+        """
+        inst, n = ranges(self.arrays["instance_offsets"], self.order)
+        image = np.repeat(np.arange(len(self.order)), n)
+        if include_class is not None:
+            j = (self.arrays["cls"][inst] == np.array(include_class).reshape(1, -1)).any(1)
+            inst, image = inst[j], image[j]
+        store = self._select(self.order, inst, image)
+        if single_cls:
+            store.arrays["cls"][:] = 0
+        return store
+
+    def drop_segments(self):
+        """Return a store with all segments removed, keeping boxes, classes and keypoints."""
+        arrays = {
+            **self.arrays,
+            "has_segments": np.zeros_like(self.arrays["has_segments"]),
+            "segment_offsets": np.zeros(len(self.arrays["cls"]) + 1, dtype=np.int64),
+            "segments": np.zeros((0, 2), dtype=np.float32),
+        }
+        return LabelStore(arrays, self.meta, self.order)
+
+    def _select(self, order, inst, image):
+        """Build compact in-memory columns for stored images `order` and their instances `inst` of exposed `image`."""
+        a = self.arrays
+        chars, n_chars = ranges(a["im_file_offsets"], order)
+        points, n_points = ranges(a["segment_offsets"], inst)
+        n_inst = np.bincount(image, minlength=len(order))
+        arrays = {
+            "im_file": np.array(a["im_file"][chars]),
+            "im_file_offsets": np.concatenate(([0], np.cumsum(n_chars))).astype(np.int64),
+            "instance_offsets": np.concatenate(([0], np.cumsum(n_inst))).astype(np.int64),
+            "segment_offsets": np.concatenate(([0], np.cumsum(n_points))).astype(np.int64),
+            "segments": np.array(a["segments"][points]),
+            **{k: np.array(a[k][order]) for k in IMAGE_COLUMNS if k in a},
+            **{k: np.array(a[k][inst]) for k in INSTANCE_COLUMNS if k in a},
+        }
+        return LabelStore(arrays, self.meta)
+
+
+def ranges(offsets, idx):
+    """
+    Gather the element indices of several rows of a ragged array.
+
+    Args:
+        offsets (np.ndarray): (n + 1) row start offsets of the ragged array.
+        idx (np.ndarray): Rows to gather, in any order.
+
+    Returns:
+        (np.ndarray): Concatenated element indices of the rows in `idx` order.
+        (np.ndarray): Number of elements of each gathered row.
+    """
+    idx = np.asarray(idx, dtype=np.int64)
+    start, n = offsets[idx], offsets[idx + 1] - offsets[idx]
+    return np.repeat(start - np.cumsum(n) + n, n) + np.arange(n.sum(), dtype=np.int64), n
@@ -3,7 +3,11 @@
 import glob
 import math
 import os
+import queue
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from threading import Thread
@@ -48,6 +52,196 @@ class SourceTypes:
     tensor: bool = False
 
 
+class FrameRing:
+    """
+    Preallocated ring buffer of video frames between one capture producer and one consumer.
+
+    Frames are decoded straight into fixed slots, so capture allocates no memory per frame. The consumer is woken by a
+    condition variable instead of polling. The buffer can live in `multiprocessing.shared_memory` so the producer can
+    run in a separate process.
+
+    Attributes:
+        shape (Tuple[int, int, int]): Frame shape (h, w, c).
+        capacity (int): Number of frame slots.
+        fifo (bool): If True, return every frame in order and block the producer when full. If False, return only the
+            latest frame and count skipped frames as dropped.
+        shared (bool): Whether the buffer is backed by shared memory.
+        frames (np.ndarray): Frame slots of shape (capacity, h, w, c).
+        state (np.ndarray): Shared counters, see the *_IDX class constants.
+
+    Methods:
+        slot: Wait for and return the next writable frame slot.
+        commit: Publish the frame written to the last slot.
+        read: Wait for and return the next frame.
+        close: Stop the producer and wake all waiters.
+        release: Free the buffer memory.
+
+    Examples:
+        >>> ring = FrameRing((480, 640, 3), capacity=4, fifo=True)
+        >>> ring.slot()[:] = 114  # producer, i.e. cap.retrieve(ring.slot())
+        >>> ring.commit()
+        >>> frame = ring.read(timeout=1.0)  # consumer
+    """
+
+    WRITTEN_IDX, READ_IDX, READING_IDX, DROPPED_IDX, FAILED_IDX, CLOSED_IDX = range(6)
+
+    def __init__(self, shape, capacity=30, fifo=True, shared=False):
+        """Initialize a ring of `capacity` frames of `shape`, in shared memory if `shared` is True."""
+        self.shape, self.capacity, self.fifo, self.shared = tuple(shape), capacity, fifo, shared
+        self.shm = None
+        if shared:
+            from multiprocessing import get_context, shared_memory
+
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * 8 + capacity * math.prod(self.shape))
+            self.cond = get_context("spawn").Condition()
+        else:
+            self.cond = threading.Condition()
+        self._attach()
+        self.state[:] = 0
+        self.state[self.READING_IDX] = -1
+        self.owner = True
+
+    def _attach(self):
+        """Create the state and frame array views, over shared memory if used."""
+        if self.shm is None:
+            self.state = np.zeros(8, dtype=np.int64)
+            self.frames = np.zeros((self.capacity, *self.shape), dtype=np.uint8)
+        else:
+            self.state = np.ndarray((8,), dtype=np.int64, buffer=self.shm.buf)
+            self.frames = np.ndarray((self.capacity, *self.shape), dtype=np.uint8, buffer=self.shm.buf, offset=64)
+
+    def __getstate__(self):
+        """Pickle shared-memory rings by name for use in a capture process."""
+        assert self.shared, "Only shared=True FrameRing objects can be passed to other processes"
+        state = self.__dict__.copy()
+        for k in "state", "frames", "shm":
+            state.pop(k)
+        state["name"] = self.shm.name
+        return state
+
+    def __setstate__(self, state):
+        """Attach to the shared memory of a pickled ring."""
+        from multiprocessing import shared_memory
+
+        name = state.pop("name")
+        self.__dict__.update(state)
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = False
+        self._attach()
+
+    @property
+    def closed(self):
+        """Whether the ring has been closed."""
+        return bool(self.state[self.CLOSED_IDX])
+
+    @property
+    def dropped(self):
+        """Number of frames captured but never returned by read()."""
+        return int(self.state[self.DROPPED_IDX])
+
+    @property
+    def failed(self):
+        """Number of frames that failed to decode and were replaced by a blank frame."""
+        return int(self.state[self.FAILED_IDX])
+
+    def _writable(self):
+        """Whether the next slot can be written, i.e. it is not being read and, in FIFO mode, the ring is not full."""
+        written, read = self.state[self.WRITTEN_IDX], self.state[self.READ_IDX]
+        full = self.fifo and written - read >= self.capacity
+        return not full and written % self.capacity != self.state[self.READING_IDX]
+
+    def slot(self, timeout=None):
+        """Wait up to `timeout` seconds for the next writable slot, returning it or None if timed out or closed."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.closed or self._writable(), timeout) or self.closed:
+                return None
+            return self.frames[self.state[self.WRITTEN_IDX] % self.capacity]
+
+    def commit(self, failed=False):
+        """Publish the frame written to the slot returned by slot(), counting it as failed if `failed` is True."""
+        with self.cond:
+            self.state[self.WRITTEN_IDX] += 1
+            self.state[self.FAILED_IDX] += failed
+            self.cond.notify_all()
+
+    def read(self, timeout=None, copy=True):
+        """
+        Wait for the next frame, the oldest unread one in FIFO mode or the latest one otherwise.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a frame, None waits until a frame arrives or the ring closes.
+            copy (bool): Return a copy of the frame. If False, return a view of the slot which the producer may
+                overwrite after the next read() call in FIFO mode, or at any time otherwise.
+
+        Returns:
+            (np.ndarray | None): The frame, or None if timed out or closed with no unread frames.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.state[self.WRITTEN_IDX] > self.state[self.READ_IDX] or self.closed, timeout)
+            written, read = self.state[self.WRITTEN_IDX], self.state[self.READ_IDX]
+            if written == read:
+                return None
+            if not self.fifo:  # skip to the latest frame
+                self.state[self.DROPPED_IDX] += written - 1 - read
+                read = written - 1
+            self.state[self.READING_IDX] = i = read % self.capacity
+        frame = self.frames[i].copy() if copy else self.frames[i]
+        with self.cond:
+            self.state[self.READ_IDX] = read + 1
+            self.state[self.READING_IDX] = -1
+            self.cond.notify_all()
+        return frame
+
+    def close(self):
+        """Close the ring, waking the producer and consumer."""
+        with self.cond:
+            self.state[self.CLOSED_IDX] = 1
+            self.cond.notify_all()
+
+    def release(self):
+        """Release the shared memory, unlinking it if this ring created it."""
+        if self.shm is not None:
+            self.state, self.frames = self.state.copy(), None  # keep counters, drop views before closing the buffer
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+            self.shm = None
+
+
+def capture_frames(ring, cap, stream, frames=float("inf"), vid_stride=1):
+    """
+    Read frames from a video stream into a FrameRing until the stream ends or the ring is closed.
+
+    Args:
+        ring (FrameRing): Ring buffer receiving the frames.
+        cap (cv2.VideoCapture | None): Opened capture object, or None to open `stream` here, i.e. in a capture process.
+        stream (str | int): Stream source, used to re-open the stream if the signal is lost.
+        frames (int | float): Total number of frames in the stream, inf for live streams. The first frame is assumed to
+            have been read from `cap` already.
+        vid_stride (int): Video frame-rate stride.
+    """
+    if cap is None:
+        cap = cv2.VideoCapture(stream)
+    h, w = ring.shape[:2]
+    n = 0  # frame number
+    while not ring.closed and cap.isOpened() and n < (frames - 1):
+        slot = ring.slot(timeout=0.1)  # wait for a free slot in FIFO mode
+        if slot is None:
+            continue
+        n += 1
+        cap.grab()  # .read() = .grab() followed by .retrieve()
+        if n % vid_stride == 0:
+            success, im = cap.retrieve(slot)  # decode straight into the ring slot
+            if not success:
+                slot[:] = 0
+                LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
+                cap.open(stream)  # re-open stream if signal was lost
+            elif im is not slot:  # frame shape changed
+                cv2.resize(im if im.ndim == 3 else cv2.cvtColor(im, cv2.COLOR_GRAY2BGR), (w, h), dst=slot)
+            ring.commit(failed=not success)
+    cap.release()
+
+
 class LoadStreams:
     """
     Stream Loader for various types of video streams.
@@ -59,12 +253,13 @@ class LoadStreams:
         sources (List[str]): The source input paths or URLs for the video streams.
         vid_stride (int): Video frame-rate stride.
         buffer (bool): Whether to buffer input streams.
+        processes (bool): Whether to capture each stream in a separate process through shared memory.
         running (bool): Flag to indicate if the streaming thread is running.
         mode (str): Set to 'stream' indicating real-time capture.
-        imgs (List[List[np.ndarray]]): List of image frames for each stream.
+        rings (List[FrameRing]): Preallocated frame ring buffer for each stream.
         fps (List[float]): List of FPS for each stream.
         frames (List[int]): List of total frames for each stream.
-        threads (List[Thread]): List of threads for each stream.
+        threads (List[Thread | multiprocessing.Process]): List of capture threads or processes for each stream.
         shape (List[Tuple[int, int, int]]): List of shapes for each stream.
         caps (List[cv2.VideoCapture]): List of cv2.VideoCapture objects for each stream.
         bs (int): Batch size for processing.
@@ -86,13 +281,15 @@ class LoadStreams:
     Notes:
         - The class uses threading to efficiently load frames from multiple streams simultaneously.
         - It automatically handles YouTube links, converting them to the best available stream URL.
-        - The class implements a buffer system to manage frame storage and retrieval.
+        - Frames are stored in a preallocated FrameRing per stream, keeping up to 30 frames if buffer=True or only the
+          latest frame otherwise, with skipped frames counted in `dropped`.
     """
 
-    def __init__(self, sources="file.streams", vid_stride=1, buffer=False):
+    def __init__(self, sources="file.streams", vid_stride=1, buffer=False, processes=False):
         """Initialize stream loader for multiple video sources, supporting various stream types."""
         torch.backends.cudnn.benchmark = True  # faster for fixed-size inference
         self.buffer = buffer  # buffer input streams
+        self.processes = processes  # capture streams in separate processes
         self.running = True  # running flag for Thread
         self.mode = "stream"
         self.vid_stride = vid_stride  # video frame-rate stride
@@ -104,7 +301,7 @@ class LoadStreams:
         self.frames = [0] * n
         self.threads = [None] * n
         self.caps = [None] * n  # video capture objects
-        self.imgs = [[] for _ in range(n)]  # images
+        self.rings = [None] * n  # frame ring buffers
         self.shape = [[] for _ in range(n)]  # image shapes
         self.sources = [ops.clean_str(x) for x in sources]  # clean source names for later
         for i, s in enumerate(sources):  # index, source
@@ -133,44 +330,49 @@ class LoadStreams:
             success, im = self.caps[i].read()  # guarantee first frame
             if not success or im is None:
                 raise ConnectionError(f"{st}Failed to read images from {s}")
-            self.imgs[i].append(im)
             self.shape[i] = im.shape
-            self.threads[i] = Thread(target=self.update, args=([i, self.caps[i], s]), daemon=True)
+            self.rings[i] = FrameRing(im.shape, capacity=30 if buffer else 3, fifo=buffer, shared=processes)
+            if processes:
+                from multiprocessing import get_context
+
+                self.caps[i].release()  # re-opened in the capture process, which reads the first frame again
+                self.caps[i] = None
+                args = (self.rings[i], None, s, self.frames[i] + 1, vid_stride)  # +1 as the first frame is re-read
+                self.threads[i] = get_context("spawn").Process(target=capture_frames, args=args, daemon=True)
+            else:
+                self.rings[i].slot()[:] = im
+                self.rings[i].commit()
+                self.threads[i] = Thread(target=self.update, args=([i, self.caps[i], s]), daemon=True)
             LOGGER.info(f"{st}Success ✅ ({self.frames[i]} frames of shape {w}x{h} at {self.fps[i]:.2f} FPS)")
             self.threads[i].start()
         LOGGER.info("")  # newline
 
     def update(self, i, cap, stream):
         """Read stream frames in daemon thread and update image buffer."""
-        n, f = 0, self.frames[i]  # frame number, frame array
-        while self.running and cap.isOpened() and n < (f - 1):
-            if len(self.imgs[i]) < 30:  # keep a <=30-image buffer
-                n += 1
-                cap.grab()  # .read() = .grab() followed by .retrieve()
-                if n % self.vid_stride == 0:
-                    success, im = cap.retrieve()
-                    if not success:
-                        im = np.zeros(self.shape[i], dtype=np.uint8)
-                        LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
-                        cap.open(stream)  # re-open stream if signal was lost
-                    if self.buffer:
-                        self.imgs[i].append(im)
-                    else:
-                        self.imgs[i] = [im]
-            else:
-                time.sleep(0.01)  # wait until the buffer is empty
+        capture_frames(self.rings[i], cap, stream, self.frames[i], self.vid_stride)
+
+    @property
+    def dropped(self):
+        """Number of captured frames per stream that were skipped and never returned."""
+        return [ring.dropped for ring in self.rings]
 
     def close(self):
         """Terminates stream loader, stops threads, and releases video capture resources."""
         self.running = False  # stop flag for Thread
+        for ring in self.rings:
+            ring.close()
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)  # Add timeout
-        for cap in self.caps:  # Iterate through the stored VideoCapture objects
+            if self.processes and thread.is_alive():
+                thread.terminate()
+        for cap in filter(None, self.caps):  # Iterate through the stored VideoCapture objects
             try:
                 cap.release()  # release video capture
             except Exception as e:
                 LOGGER.warning(f"WARNING ⚠️ Could not release VideoCapture object: {e}")
+        for ring in self.rings:
+            ring.release()
         cv2.destroyAllWindows()
 
     def __iter__(self):
@@ -183,25 +385,17 @@ class LoadStreams:
         self.count += 1
 
         images = []
-        for i, x in enumerate(self.imgs):
-            # Wait until a frame is available in each buffer
-            while not x:
+        for i, ring in enumerate(self.rings):
+            # Wait until a frame is available in each buffer, the oldest one if buffering or else the latest one
+            t = time.time()
+            while (im := ring.read(timeout=1 / min(self.fps))) is None:
                 if not self.threads[i].is_alive() or cv2.waitKey(1) == ord("q"):  # q to quit
                     self.close()
                     raise StopIteration
-                time.sleep(1 / min(self.fps))
-                x = self.imgs[i]
-                if not x:
+                if time.time() - t > 1:  # warn at most once per second, i.e. while a capture process starts
                     LOGGER.warning(f"WARNING ⚠️ Waiting for stream {i}")
-
-            # Get and remove the first frame from imgs buffer
-            if self.buffer:
-                images.append(x.pop(0))
-
-            # Get the last frame, and clear the rest from the imgs buffer
-            else:
-                images.append(x.pop(-1) if x else np.zeros(self.shape[i], dtype=np.uint8))
-                x.clear()
+                    t = time.time()
+            images.append(im)
 
         return self.sources, images, [""] * self.bs
 
@@ -300,12 +494,16 @@ class LoadImagesAndVideos:
         frames (int): Total number of frames in the video.
         count (int): Counter for iteration, initialized at 0 during __iter__().
         ni (int): Number of images.
+        workers (int): Number of decode workers reading files ahead, 0 to decode on the calling thread.
+        prefetch (int): Number of batches decode workers read ahead.
+        processes (bool): Whether images are decoded in worker processes instead of threads.
 
     Methods:
         __init__: Initialize the LoadImagesAndVideos object.
         __iter__: Returns an iterator object for VideoStream or ImageFolder.
         __next__: Returns the next batch of images or video frames along with their paths and metadata.
         _new_video: Creates a new video capture object for the given path.
+        _read_ahead: Yields decoded images and video frames in file order from decode workers.
         __len__: Returns the number of batches in the object.
 
     Examples:
@@ -314,13 +512,19 @@ class LoadImagesAndVideos:
         ...     # Process batch of images or video frames
         ...     pass
 
+        Decode 4 batches ahead with 8 worker threads
+        >>> loader = LoadImagesAndVideos("path/to/data", batch=32, workers=8, prefetch=4)
+
     Notes:
         - Supports various image formats including HEIC.
         - Handles both local files and directories.
         - Can read from a text file containing paths to images and videos.
+        - With workers > 0 images are decoded concurrently and videos are decoded ahead in a background thread, while
+          batches keep the same order and contents as with workers=0. Videos always use a thread, as OpenCV releases
+          the GIL while decoding. Up to `prefetch` batches of files and `prefetch` batches of video frames are held.
     """
 
-    def __init__(self, path, batch=1, vid_stride=1):
+    def __init__(self, path, batch=1, vid_stride=1, workers=0, prefetch=2, processes=False):
         """Initialize dataloader for images and videos, supporting various input formats."""
         parent = None
         if isinstance(path, str) and Path(path).suffix == ".txt":  # *.txt file with img/vid/dir on each line
@@ -357,6 +561,10 @@ class LoadImagesAndVideos:
         self.mode = "video" if ni == 0 else "image"  # default to video if no images
         self.vid_stride = vid_stride  # video frame-rate stride
         self.bs = batch
+        self.workers = workers  # decode workers
+        self.prefetch = prefetch  # batches to read ahead
+        self.processes = processes  # decode images in processes
+        self.reader = None  # read-ahead generator
         if any(videos):
             self._new_video(videos[0])  # new video
         else:
@@ -367,10 +575,16 @@ class LoadImagesAndVideos:
     def __iter__(self):
         """Iterates through image/video files, yielding source paths, images, and metadata."""
         self.count = 0
+        if self.workers > 0:
+            if self.reader is not None:
+                self.reader.close()  # stop workers of a previous iteration
+            self.reader = self._read_ahead()
         return self
 
     def __next__(self):
         """Returns the next batch of images or video frames with their paths and metadata."""
+        if self.reader is not None:
+            return self._next_read_ahead()
         paths, imgs, info = [], [], []
         while len(imgs) < self.bs:
             if self.count >= self.nf:  # end of file list
@@ -411,29 +625,149 @@ class LoadImagesAndVideos:
             else:
                 # Handle image files (including HEIC)
                 self.mode = "image"
-                if path.split(".")[-1].lower() == "heic":
-                    # Load HEIC image using Pillow with pillow-heif
-                    check_requirements("pillow-heif")
+                im0 = self._read_image(path)
+                if im0 is None:
+                    LOGGER.warning(f"WARNING ⚠️ Image Read Error {path}")
+                else:
+                    paths.append(path)
+                    imgs.append(im0)
+                    info.append(f"image {self.count + 1}/{self.nf} {path}: ")
+                self.count += 1  # move to the next file
+                if self.count >= self.ni:  # end of image list
+                    break
 
-                    from pillow_heif import register_heif_opener
+        return paths, imgs, info
 
-                    register_heif_opener()  # Register HEIF opener with Pillow
-                    with Image.open(path) as img:
-                        im0 = cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)  # convert image to BGR nparray
+    def _next_read_ahead(self):
+        """Returns the next batch assembled from read-ahead decode workers, matching the batches of __next__()."""
+        paths, imgs, info = [], [], []
+        while len(imgs) < self.bs:
+            item = next(self.reader, None)
+            if item is None:  # end of file list
+                self.count = self.nf
+                if imgs:
+                    return paths, imgs, info  # return last partial batch
                 else:
-                    im0 = imread(path)  # BGR
+                    raise StopIteration
+
+            i, im0, video = item
+            path = self.files[i]
+            if video:
+                self.mode = "video"
+                self.count, self.frame, self.frames, self.fps = i, *video
+                paths.append(path)
+                imgs.append(im0)
+                info.append(f"video {i + 1}/{self.nf} (frame {self.frame}/{self.frames}) {path}: ")
+            else:
+                self.mode = "image"
+                self.count = i + 1
                 if im0 is None:
                     LOGGER.warning(f"WARNING ⚠️ Image Read Error {path}")
                 else:
                     paths.append(path)
                     imgs.append(im0)
-                    info.append(f"image {self.count + 1}/{self.nf} {path}: ")
-                self.count += 1  # move to the next file
+                    info.append(f"image {i + 1}/{self.nf} {path}: ")
                 if self.count >= self.ni:  # end of image list
                     break
 
         return paths, imgs, info
 
+    def _read_ahead(self):
+        """
+        Decode files ahead of the consumer in worker threads or processes, yielding results in file order.
+
+        Yields:
+            (Tuple[int, np.ndarray | None, Tuple | None]): File index, decoded BGR image or None if unreadable, and
+                (frame, frames, fps) for video frames or None for images.
+        """
+        if self.cap:
+            self.cap.release()  # videos are opened by the decode workers
+        if self.processes:
+            from multiprocessing import get_context
+
+            images = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+        else:
+            images = ThreadPoolExecutor(self.workers, thread_name_prefix="decode")
+        videos = ThreadPoolExecutor(1, thread_name_prefix="decode_video") if self.ni < self.nf else None  # file order
+        ahead = max(self.prefetch, 1) * self.bs
+        budget = threading.Semaphore(ahead)  # decoded video frames held across all pending videos
+        pending = deque()  # (index, future, frame queue or None) in file order
+        stop = threading.Event()
+        try:
+            i = 0
+            while pending or i < self.nf:
+                while i < self.nf and len(pending) < ahead:  # schedule files ahead
+                    if self.video_flag[i]:
+                        frames = queue.Queue()
+                        future = videos.submit(self._read_video, self.files[i], self.vid_stride, frames, stop, budget)
+                        pending.append((i, future, frames))
+                    else:
+                        pending.append((i, images.submit(self._read_image, self.files[i]), None))
+                    i += 1
+                j, future, frames = pending.popleft()
+                if frames is None:
+                    yield j, future.result(), None
+                else:
+                    while (item := frames.get()) is not None:
+                        budget.release()
+                        yield j, *item
+                    future.result()  # raise video errors
+        finally:
+            stop.set()  # stop the video worker waiting for frame budget
+            for _, future, _ in pending:
+                future.cancel()
+            images.shutdown()
+            if videos:
+                videos.shutdown()
+
+    @staticmethod
+    def _read_image(path):
+        """Read an image file as a BGR numpy array, including HEIC images, returning None if it cannot be read."""
+        if path.split(".")[-1].lower() == "heic":
+            # Load HEIC image using Pillow with pillow-heif
+            check_requirements("pillow-heif")
+
+            from pillow_heif import register_heif_opener
+
+            register_heif_opener()  # Register HEIF opener with Pillow
+            with Image.open(path) as img:
+                return cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)  # convert image to BGR nparray
+        return imread(path)  # BGR
+
+    @staticmethod
+    def _read_video(path, vid_stride, frames_queue, stop, budget):
+        """
+        Decode every vid_stride-th frame of a video into a queue as (im0, (frame, frames, fps)), then None.
+
+        Every frame takes a slot of the shared `budget` semaphore, released by the consumer when it takes the frame.
+        Videos are decoded one at a time in file order, so the video holding slots is always the next one consumed.
+        """
+        cap = cv2.VideoCapture(path)
+
+        def acquire():
+            """Wait for a frame slot unless the consumer has stopped, returning False if it has."""
+            while not stop.is_set():
+                if budget.acquire(timeout=0.1):
+                    return True
+            return False
+
+        try:
+            if not cap.isOpened():
+                raise FileNotFoundError(f"Failed to open video {path}")
+            fps, frames, frame = int(cap.get(cv2.CAP_PROP_FPS)), int(cap.get(cv2.CAP_PROP_FRAME_COUNT) / vid_stride), 0
+            while frame != frames:
+                if not all(cap.grab() for _ in range(vid_stride)):
+                    break  # end of video or failure
+                success, im0 = cap.retrieve()
+                if success:
+                    frame += 1
+                    if not acquire():
+                        break
+                    frames_queue.put((im0, (frame, frames, fps)))
+        finally:
+            cap.release()
+            frames_queue.put(None)  # end of video
+
     def _new_video(self, path):
         """Creates a new video capture object for the given path and initializes video-related attributes."""
         self.frame = 0
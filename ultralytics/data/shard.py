@@ -0,0 +1,263 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Packed, memory-mapped store of pre-resized training images used by `cache='mmap'`.
+
+Every image is decoded and resized once, exactly as BaseDataset.load_image does, and appended to a single shard file
+instead of one *.npy per image. DataLoader workers map the same file read-only, so images are shared through the OS page
+cache with no per-worker copies and the shard pickles to spawned workers as its path only.
+
+Shard layout (all integers little-endian):
+    [image bytes ...][index: int64 (n, 9)][header: JSON][header length: uint64][magic: b'YOLOSHRD']
+
+Index columns are byte offset, resized height, width and channels, original height and width, crc32 of the image bytes
+and source file size and mtime in nanoseconds. The JSON header holds the version, imgsz, resize mode and file list.
+
+Usage:
+    yolo shard data=coco8.yaml imgsz=640  # build train and val shards ahead of training
+    yolo shard verify data=coco8.yaml imgsz=640  # check shards against their datasets
+    yolo shard verify path/to/images/train.rect640.shard  # check one shard file
+"""
+
+import json
+import math
+import os
+import zlib
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ultralytics.utils import LOGGER, NUM_THREADS, TQDM
+
+SHARD_VERSION = "1.0.0"
+SHARD_MAGIC = b"YOLOSHRD"
+
+
+def resize_image(im, imgsz, rect_mode=True):
+    """Resize the long side of an image to imgsz keeping aspect ratio, or stretch it to a square if not rect_mode."""
+    h0, w0 = im.shape[:2]  # orig hw
+    if rect_mode:  # resize long side to imgsz while maintaining aspect ratio
+        r = imgsz / max(h0, w0)  # ratio
+        if r != 1:  # if sizes are not equal
+            w, h = (min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz))
+            im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+    elif not (h0 == w0 == imgsz):  # resize by stretching image to square imgsz
+        im = cv2.resize(im, (imgsz, imgsz), interpolation=cv2.INTER_LINEAR)
+    return im
+
+
+def shard_path(img_path, imgsz, rect_mode=True):
+    """Return the shard file for a dataset image directory or *.txt list, i.e. 'images/train2017.rect640.shard'."""
+    p = Path(img_path[0] if isinstance(img_path, (list, tuple)) else img_path)
+    return p.parent / f"{p.stem}.{'rect' if rect_mode else 'square'}{imgsz}.shard"
+
+
+class ImageShard:
+    """
+    Read-only memory-mapped image shard.
+
+    Attributes:
+        file (Path): Shard file path.
+        imgsz (int): Size of the long side, or of both sides if not `rect`, of every stored image.
+        rect (bool): Whether images keep their aspect ratio, matching BaseDataset.load_image(rect_mode).
+        files (list): Source image paths in storage order.
+        index (np.ndarray): (n, 9) int64 index with the columns listed in the module docstring.
+
+    Methods:
+        load: Return a writable copy of a stored image and its original shape.
+        stale: Return files that are missing from the shard or changed since it was built.
+        verify: Check shard integrity, optionally against a list of source files.
+        build: Build a shard from a list of image files.
+
+    Examples:
+        >>> shard = ImageShard.build("train.rect640.shard", im_files, imgsz=640)
+        >>> im, (h0, w0) = shard.load(im_files[0])
+        >>> assert not shard.verify(im_files)
+    """
+
+    def __init__(self, file):
+        """Map a shard file and read its header and index."""
+        self.file = Path(file)
+        self.mm = np.memmap(self.file, dtype=np.uint8, mode="r")
+        if bytes(self.mm[-8:]) != SHARD_MAGIC:
+            raise ValueError(f"{self.file} is not an image shard")
+        n = int(self.mm[-16:-8].view("<u8")[0])
+        header = json.loads(bytes(self.mm[-16 - n : -16]))
+        if header["version"] != SHARD_VERSION:
+            raise ValueError(f"{self.file} has shard version {header['version']}, expected {SHARD_VERSION}")
+        self.imgsz, self.rect, self.files = header["imgsz"], header["rect"], header["files"]
+        self.data_size = header["data_size"]
+        self.index = self.mm[self.data_size : self.data_size + len(self.files) * 72].view("<i8").reshape(-1, 9)
+        self.lookup = {f: i for i, f in enumerate(self.files)}
+
+    def __getstate__(self):
+        """Pickle the file path only, so spawned DataLoader workers map the shard instead of receiving a copy."""
+        return {"file": self.file}
+
+    def __setstate__(self, state):
+        """Re-map the shard in a worker process."""
+        self.__init__(state["file"])
+
+    def __len__(self):
+        """Return the number of stored images."""
+        return len(self.files)
+
+    def __contains__(self, f):
+        """Return True if the image file is stored in the shard."""
+        return f in self.lookup
+
+    def view(self, i):
+        """Return a read-only view of stored image i."""
+        offset, h, w, c = self.index[i, :4]
+        return self.mm[offset : offset + h * w * c].reshape(h, w, c)
+
+    def load(self, f):
+        """
+        Load a stored image.
+
+        Args:
+            f (str): Source image path.
+
+        Returns:
+            im (np.ndarray): Resized BGR image, copied out of the page cache so augmentations may modify it in place.
+            hw0 (tuple): Original image (height, width).
+        """
+        i = self.lookup[f]
+        return self.view(i).copy(), tuple(int(x) for x in self.index[i, 4:6])
+
+    def stale(self, files):
+        """Return the files that are missing from the shard or whose size or mtime changed since it was built."""
+        stale = []
+        for f in files:
+            i = self.lookup.get(f)
+            if i is None:
+                stale.append(f)
+                continue
+            try:
+                st = os.stat(f)
+            except OSError:
+                continue  # source deleted, stored copy still valid
+            if (st.st_size, st.st_mtime_ns) != tuple(self.index[i, 7:9]):
+                stale.append(f)
+        return stale
+
+    def verify(self, files=None, data=True):
+        """
+        Check the shard layout, stored shapes and optionally image checksums and source files.
+
+        Args:
+            files (list, optional): Image files that must be stored and up to date.
+            data (bool): Recompute the crc32 of every stored image.
+
+        Returns:
+            (list): Problem descriptions, empty if the shard is valid.
+        """
+        problems = []
+        expected = 0
+        for i, (offset, h, w, c, h0, w0, crc, _, _) in enumerate(self.index):
+            f = self.files[i]
+            if offset != expected or offset + h * w * c > self.data_size:
+                problems.append(f"{f}: bad offset {offset}")
+                break
+            expected = offset + h * w * c
+            if (max(h, w) if self.rect else min(h, w)) != self.imgsz or (not self.rect and h != w) or h0 < 1 or w0 < 1:
+                problems.append(f"{f}: unexpected shape {(h, w, c)} for imgsz={self.imgsz}, rect={self.rect}")
+            elif data and zlib.crc32(self.view(i)) != crc:
+                problems.append(f"{f}: checksum mismatch")
+        if expected != self.data_size and not problems:
+            problems.append(f"image bytes end at {expected}, expected {self.data_size}")
+        if files is not None:
+            problems += [f"{f}: missing or changed since shard was built" for f in self.stale(files)]
+        return problems
+
+    @classmethod
+    def build(cls, file, im_files, imgsz, rect_mode=True, workers=NUM_THREADS, prefix=""):
+        """
+        Decode, resize and pack images into a new shard, replacing `file` atomically once complete.
+
+        Args:
+            file (str | Path): Output shard file.
+            im_files (list): Image files to store, unreadable images are skipped with a warning.
+            imgsz (int): Target image size.
+            rect_mode (bool): Keep aspect ratio (True) or stretch to a square (False), as in BaseDataset.load_image.
+            workers (int): Number of decode threads.
+            prefix (str): Logging prefix.
+
+        Returns:
+            (ImageShard): The new shard.
+        """
+
+        def read(f):
+            """Read and resize one image, returning it with its source stats."""
+            im = cv2.imread(f)  # BGR
+            if im is None:
+                return f, None, None, None
+            return f, resize_image(im, imgsz, rect_mode), im.shape[:2], os.stat(f)
+
+        file = Path(file)
+        tmp = file.with_suffix(".shard.tmp")
+        files, index, offset, skipped = [], [], 0, 0
+        with open(tmp, "wb") as out, ThreadPool(workers) as pool:
+            pbar = TQDM(pool.imap(read, im_files), desc=f"{prefix}Building {file.name}", total=len(im_files))
+            for f, im, hw0, st in pbar:
+                if im is None:
+                    skipped += 1
+                    LOGGER.warning(f"{prefix}WARNING ⚠️ {f}: image not readable, not added to shard")
+                    continue
+                im = np.ascontiguousarray(im)
+                out.write(im.data)
+                files.append(f)
+                index.append((offset, *im.shape, *hw0, zlib.crc32(im), st.st_size, st.st_mtime_ns))
+                offset += im.nbytes
+                pbar.desc = f"{prefix}Building {file.name} ({offset / (1 << 30):.1f}GB)"
+            pbar.close()
+            header = json.dumps(
+                {"version": SHARD_VERSION, "imgsz": imgsz, "rect": rect_mode, "data_size": offset, "files": files}
+            ).encode()
+            out.write(np.array(index, dtype="<i8").reshape(-1, 9).tobytes())
+            out.write(header)
+            out.write(np.array([len(header)], dtype="<u8").tobytes())
+            out.write(SHARD_MAGIC)
+        os.replace(tmp, file)
+        LOGGER.info(f"{prefix}New shard created: {file} ({len(files)} images, {skipped} skipped)")
+        return cls(file)
+
+
+def build_shards(data, imgsz=640, splits=("train", "val"), verify=False, **kwargs):
+    """
+    Build, or only verify, the cache='mmap' image shards of a dataset's splits ahead of training.
+
+    Args:
+        data (str): Dataset YAML, i.e. 'coco8.yaml'.
+        imgsz (int): Training image size.
+        splits (tuple): Dataset splits to process, missing splits are skipped.
+        verify (bool): Verify existing shards against their datasets, including image checksums, instead of building.
+        **kwargs (Any): Other dataset arguments, i.e. task='segment', fraction=0.5.
+
+    Returns:
+        (dict): {split: list of problems}, with an empty list for every valid shard.
+
+    Examples:
+        >>> from ultralytics.data.shard import build_shards
+        >>> build_shards("coco8.yaml", imgsz=640)
+        >>> assert not any(build_shards("coco8.yaml", imgsz=640, verify=True).values())
+    """
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data.build import build_yolo_dataset
+    from ultralytics.data.utils import check_det_dataset
+    from ultralytics.utils import DEFAULT_CFG
+
+    cfg = get_cfg(DEFAULT_CFG, {**kwargs, "data": data, "imgsz": imgsz, "cache": False if verify else "mmap"})
+    data = check_det_dataset(cfg.data)
+    results = {}
+    for split in splits:
+        if not data.get(split):
+            continue
+        dataset = build_yolo_dataset(cfg, data[split], cfg.batch, data, mode="val")  # YOLODataset keeps aspect ratio
+        file = shard_path(data[split], cfg.imgsz)
+        results[split] = ImageShard(file).verify(dataset.im_files, data=verify) if file.exists() else ["not found"]
+        for p in results[split][:10]:
+            LOGGER.warning(f"WARNING ⚠️ {file}: {p}")
+        LOGGER.info(f"{split}: {file} {'valid ✅' if not results[split] else f'{len(results[split])} problems ❌'}")
+    return results
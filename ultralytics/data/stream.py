@@ -0,0 +1,316 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Iterable YOLO dataset streamed from local tar shards in the webdataset layout, so training needs no unpacked files.
+
+A sample is a run of consecutive tar members sharing a key, the member path up to the first dot of its file name. Each
+holds one image and an optional YOLO label text, samples without labels are backgrounds:
+
+    train-000000.tar
+        000001.jpg  # image, any of IMG_FORMATS
+        000001.txt  # YOLO labels, same format as labels/*.txt
+        000002.jpg
+        ...
+
+Point a dataset YAML split at tar files or at a directory holding them, i.e. 'train: shards/train'. Shards are read
+sequentially, split across DDP ranks and DataLoader workers, and shuffled through a per-worker buffer of
+`shuffle_buffer` encoded samples, from which Mosaic, MixUp and CopyPaste also draw their partner images.
+"""
+
+import math
+import random
+import tarfile
+from itertools import chain
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from ultralytics.utils import DEFAULT_CFG, LOGGER, TQDM
+from ultralytics.utils.ops import segments2boxes
+
+from .dataset import YOLODataset
+from .shard import resize_image
+from .utils import IMG_FORMATS, get_hash, load_dataset_cache_file, save_dataset_cache_file
+
+DATASET_CACHE_VERSION = "1.0.0"
+
+
+def tar_files(path):
+    """Return the tar shards of a dataset split given as tar files or directories of them, else an empty list."""
+    files = []
+    for p in map(Path, path if isinstance(path, (list, tuple)) else [path]):
+        shards = sorted(p.glob("*.tar")) if p.is_dir() else [p] if p.suffix == ".tar" and p.is_file() else []
+        if not shards:
+            return []  # image directories and *.txt lists are not streamed
+        files += [str(x) for x in shards]
+    return files
+
+
+def sample_key(name):
+    """Return the webdataset key and extension of a tar member, i.e. ('dir/000001', 'jpg') for 'dir/000001.jpg'."""
+    parent, _, file = name.rpartition("/")
+    stem, _, ext = file.partition(".")
+    return f"{parent}/{stem}" if parent else stem, ext.lower()
+
+
+def parse_labels(text, keypoint=False, nkpt=0, ndim=0):
+    """
+    Parse YOLO label text as verify_image_label parses label files.
+
+    Args:
+        text (str): Label text, one object per line.
+        keypoint (bool): Labels hold `nkpt` keypoints of `ndim` values after each box.
+        nkpt (int): Number of keypoints per object.
+        ndim (int): Values per keypoint, 2 or 3.
+
+    Returns:
+        lb (np.ndarray): (n, 5) float32 class and normalized xywh box per object.
+        segments (List[np.ndarray]): Polygon per object if the labels are segments, else empty.
+        keypoints (np.ndarray | None): (n, nkpt, 3) keypoints if `keypoint`, else None.
+    """
+    lb = [x.split() for x in text.strip().splitlines() if len(x)]
+    segments, keypoints = [], None
+    if any(len(x) > 6 for x in lb) and not keypoint:  # is segment
+        classes = np.array([x[0] for x in lb], dtype=np.float32)
+        segments = [np.array(x[1:], dtype=np.float32).reshape(-1, 2) for x in lb]  # (cls, xy1...)
+        lb = np.concatenate((classes.reshape(-1, 1), segments2boxes(segments)), 1)  # (cls, xywh)
+    ncol = (5 + nkpt * ndim) if keypoint else 5
+    lb = np.array(lb, dtype=np.float32).reshape(-1, ncol) if len(lb) else np.zeros((0, ncol), dtype=np.float32)
+    if len(lb):
+        points = lb[:, 5:].reshape(-1, ndim)[:, :2] if keypoint else lb[:, 1:]
+        assert points.max() <= 1, f"non-normalized or out of bounds coordinates {points[points > 1]}"
+        assert lb.min() >= 0, f"negative label values {lb[lb < 0]}"
+    if keypoint:
+        keypoints = lb[:, 5:].reshape(-1, nkpt, ndim)
+        if ndim == 2:
+            kpt_mask = np.where((keypoints[..., 0] < 0) | (keypoints[..., 1] < 0), 0.0, 1.0).astype(np.float32)
+            keypoints = np.concatenate([keypoints, kpt_mask[..., None]], axis=-1)  # (nl, nkpt, 3)
+    return lb[:, :5], segments, keypoints
+
+
+class YOLOStreamDataset(torch.utils.data.IterableDataset):
+    """
+    YOLO detection, segmentation, pose or OBB dataset streamed from tar shards instead of indexed image files.
+
+    Every DataLoader worker of every rank reads its own share of the shards, or, with fewer shards than workers, every
+    shard keeping its share of the samples. Training streams never end: shards are reshuffled and re-read after every
+    pass and InfiniteDataLoader takes len(loader) batches per epoch, so all ranks run the same number of steps. Samples
+    pass through a shuffle buffer of encoded images and parsed labels, and the buffer doubles as the pool of partner
+    images for Mosaic, MixUp and CopyPaste. Validation streams are read in order, each worker taking every
+    num_workers-th batch so the DataLoader returns batches in the original order. Augmentations, label formatting and
+    collation are shared with YOLODataset; rect batches, image caching and `fraction` need random access and are not
+    supported.
+
+    Attributes:
+        files (List[str]): Tar shard paths.
+        counts (List[int]): Number of samples in each shard, scanned once and cached next to the shards.
+        buffer_size (int): Samples held per worker by the training shuffle buffer.
+        samples (list): The current worker's buffer of (name, image bytes, labels) samples.
+        rank (int): Global rank of this process, set by build_dataloader.
+        world_size (int): Number of DDP processes, set by build_dataloader.
+        seed (int): Seed of the shard order of every pass, shared by all ranks and workers.
+
+    Examples:
+        >>> dataset = YOLOStreamDataset("path/to/shards", imgsz=640, batch_size=16, data={"names": {0: "person"}})
+        >>> loader = build_dataloader(dataset, batch=16, workers=8)
+        >>> batch = next(iter(loader))
+    """
+
+    # augmentations, label formatting and collation are the same as YOLODataset's
+    build_transforms = YOLODataset.build_transforms
+    close_mosaic = YOLODataset.close_mosaic
+    update_labels_info = YOLODataset.update_labels_info
+    collate_fn = staticmethod(YOLODataset.collate_fn)
+
+    def __init__(
+        self,
+        img_path,
+        imgsz=640,
+        batch_size=16,
+        augment=True,
+        hyp=DEFAULT_CFG,
+        prefix="",
+        single_cls=False,
+        classes=None,
+        data=None,
+        task="detect",
+        buffer_size=1000,
+        seed=0,
+    ):
+        """
+        Initialize the dataset, counting the samples of every shard.
+
+        Args:
+            img_path (str | list): Tar shards or directories holding them.
+            imgsz (int): Target image size.
+            batch_size (int): Batch size, used to interleave validation batches across workers.
+            augment (bool): Apply training augmentations and shuffle.
+            hyp (IterableSimpleNamespace): Augmentation hyperparameters.
+            prefix (str): Logging prefix.
+            single_cls (bool): Train all classes as one.
+            classes (list, optional): Only keep labels of these classes.
+            data (dict): Dataset YAML dictionary.
+            task (str): One of 'detect', 'segment', 'pose' or 'obb'.
+            buffer_size (int): Samples held per worker to shuffle and draw mosaic partners from.
+            seed (int): Seed of the shard order.
+        """
+        super().__init__()
+        self.img_path = img_path
+        self.imgsz = imgsz
+        self.batch_size = batch_size
+        self.augment = augment
+        self.prefix = prefix
+        self.single_cls = single_cls
+        self.classes = classes
+        self.data = data
+        self.use_segments = task == "segment"
+        self.use_keypoints = task == "pose"
+        self.use_obb = task == "obb"
+        assert not (self.use_segments and self.use_keypoints), "Can not use both segments and keypoints."
+        self.rect = False
+        self.buckets = None
+        self.buffer_size = max(buffer_size, 1) if augment else 1  # validation keeps the stream order
+        self.seed = seed
+        self.rank, self.world_size = 0, 1
+        self.samples = []
+        self.files = tar_files(img_path)
+        if not self.files:
+            raise FileNotFoundError(f"{prefix}No tar shards found in {img_path}")
+        self.counts = self.count_samples()
+        self.transforms = self.build_transforms(hyp=hyp)
+
+    def count_samples(self):
+        """Return the number of samples of every shard, from the *.tar.cache file next to the shards if still valid."""
+        parent = Path(self.files[0]).resolve().parent
+        path = parent.with_suffix(".tar.cache") if parent.name else parent / "shards.tar.cache"  # shards in "/"
+        h = get_hash(self.files)
+        try:
+            cache = load_dataset_cache_file(path)
+            assert cache["version"] == DATASET_CACHE_VERSION and cache["hash"] == h
+            return [cache["counts"][f] for f in self.files]
+        except (FileNotFoundError, AssertionError, AttributeError, KeyError, ModuleNotFoundError):
+            pass
+        counts = {}
+        for f in TQDM(self.files, desc=f"{self.prefix}Counting samples in {len(self.files)} tar shards"):
+            with tarfile.open(f) as tar:  # seeks over member data, reading headers only
+                keys = (sample_key(m.name) for m in tar if m.isfile())
+                counts[f] = len({k for k, ext in keys if ext in IMG_FORMATS})
+        save_dataset_cache_file(self.prefix, path, {"hash": h, "counts": counts}, DATASET_CACHE_VERSION)
+        return [counts[f] for f in self.files]
+
+    def __len__(self):
+        """Return the number of samples per rank and epoch."""
+        return sum(self.counts) // self.world_size
+
+    @property
+    def buffer(self):
+        """Return the buffer indices that Mosaic, MixUp and CopyPaste draw partner images from."""
+        return range(len(self.samples))
+
+    def read(self, files, keep=None):
+        """
+        Read (name, image bytes, labels) samples from tar shards sequentially.
+
+        Args:
+            files (List[str]): Tar shards, read in this order.
+            keep (Callable, optional): Only decode samples whose running index i passes keep(i).
+
+        Yields:
+            (tuple): Member name of the image, its encoded bytes and the parsed (lb, segments, keypoints) labels.
+        """
+        nkpt, ndim = self.data.get("kpt_shape", (0, 0)) if self.use_keypoints else (0, 0)
+        i = -1
+        for f in files:
+            with tarfile.open(f, "r|") as tar:  # sequential stream
+                key, members = None, {}
+                for m in chain(tar, [None]):
+                    k, ext = sample_key(m.name) if m else (None, None)
+                    if k != key and members:
+                        im = next((x for e, x in members.items() if e in IMG_FORMATS), None)
+                        if im is not None:
+                            i += 1
+                            if keep is None or keep(i):
+                                yield from self.parse(f"{f}/{im[0]}", im[1], members.get("txt"), nkpt, ndim)
+                        members = {}
+                    if m is not None and m.isfile():  # i + 1 is the index of the sample being read
+                        members[ext] = (m.name, tar.extractfile(m).read() if keep is None or keep(i + 1) else None)
+                    key = k
+
+    def parse(self, name, im, lb, nkpt, ndim):
+        """Yield a sample with its parsed and class-filtered labels, or nothing with a warning if the labels are bad."""
+        try:
+            lb, segments, keypoints = parse_labels(lb[1].decode() if lb else "", self.use_keypoints, nkpt, ndim)
+            assert lb[:, 0].max(initial=0) < len(self.data["names"]), f"class {int(lb[:, 0].max())} exceeds names"
+        except Exception as e:
+            LOGGER.warning(f"{self.prefix}WARNING ⚠️ {name}: ignoring corrupt labels: {e}")
+            return
+        if self.classes is not None:
+            j = np.isin(lb[:, 0], self.classes)
+            lb, segments = lb[j], [s for s, x in zip(segments, j) if x]
+            keypoints = keypoints[j] if keypoints is not None else None
+        if self.single_cls:
+            lb[:, 0] = 0
+        yield name, im, (lb, segments, keypoints)
+
+    def get_image_and_label(self, index):
+        """Decode and resize buffered sample `index` and return its labels, as BaseDataset.get_image_and_label."""
+        name, im, (lb, segments, keypoints) = self.samples[index]
+        im0 = cv2.imdecode(np.frombuffer(im, np.uint8), cv2.IMREAD_COLOR)  # BGR
+        if im0 is None:
+            raise FileNotFoundError(f"Image Not Found {name}")
+        im = resize_image(im0, self.imgsz)
+        label = {
+            "im_file": name,
+            "cls": lb[:, 0:1].copy(),
+            "bboxes": lb[:, 1:].copy(),
+            "segments": [s.copy() for s in segments],
+            "keypoints": None if keypoints is None else keypoints.copy(),
+            "normalized": True,
+            "bbox_format": "xywh",
+            "img": im,
+            "ori_shape": im0.shape[:2],
+            "resized_shape": im.shape[:2],
+        }
+        label["ratio_pad"] = (im.shape[0] / im0.shape[0], im.shape[1] / im0.shape[1])  # for evaluation
+        return self.update_labels_info(label)
+
+    def __iter__(self):
+        """Yield collated batches of this rank and worker endlessly, InfiniteDataLoader takes len(loader) per epoch."""
+        info = torch.utils.data.get_worker_info()
+        worker, workers = (info.id, info.num_workers) if info else (0, 1)
+        consumer, consumers = self.rank * workers + worker, self.world_size * workers
+        nb = math.ceil(sum(self.counts) / self.batch_size)  # batches per validation pass
+        self.samples, batch = [], []
+        for p in range(2**31):
+            files = self.files
+            if not self.augment:  # DataLoader takes batches from workers round-robin, continuing across passes
+                stream = self.read(files, keep=lambda i, k=p * nb: (k + i // self.batch_size) % consumers == consumer)
+            else:
+                files = random.Random(self.seed + p).sample(files, len(files))  # same on every rank and worker
+                if len(files) >= consumers:
+                    stream = self.read(files[consumer::consumers])
+                else:  # fewer shards than consumers, read all of them and keep every consumers-th sample
+                    stream = self.read(files, keep=lambda i: i % consumers == consumer)
+            for sample in stream:
+                self.samples.append(sample)
+                if len(self.samples) >= self.buffer_size:  # the buffer carries over into the next pass
+                    batch.append(self.take(random.randrange(len(self.samples))))
+                    if len(batch) == self.batch_size:
+                        yield self.collate_fn(batch)
+                        batch = []
+            if batch and not self.augment:  # last batch of a validation pass
+                yield self.collate_fn(batch)
+                batch = []
+
+    def take(self, i):
+        """Transform buffered sample i before removing it, so mosaic partners exist even in a one-sample buffer."""
+        labels = self.transforms(self.get_image_and_label(i))
+        self.samples[i] = self.samples[-1]
+        self.samples.pop()
+        return labels
+
+    def __repr__(self):
+        """Return a short description of the dataset."""
+        n = sum(self.counts)
+        return f"{self.__class__.__name__}({len(self.files)} shards, {n} samples, buffer={self.buffer_size})"
@@ -55,6 +55,29 @@ def get_hash(paths):
     return h.hexdigest()  # return hash
 
 
+def get_file_stats(paths):
+    """
+    Return per-file fingerprints of a list of paths, stat-ing files in parallel for network filesystems.
+
+    Args:
+        paths (list): File paths.
+
+    Returns:
+        (np.ndarray): (n, 2) int64 array of (size, mtime_ns), with -1 for missing files.
+    """
+
+    def stat(p):
+        """Return the (size, mtime_ns) of a file or (-1, -1) if it does not exist."""
+        try:
+            st = os.stat(p)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return -1, -1
+
+    with ThreadPool(NUM_THREADS) as pool:
+        return np.array(pool.map(stat, paths, chunksize=256), dtype=np.int64).reshape(-1, 2)
+
+
 def exif_size(img: Image.Image):
     """Returns exif-corrected PIL size."""
     s = img.size  # (width, height)
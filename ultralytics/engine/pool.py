@@ -0,0 +1,266 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Process-wide pool of warm inference models with weights shared across worker processes.
+
+Checkpoints are unpickled and fused once per weights hash and kept on CPU in shared memory. Callers receive AutoBackend
+instances cached by (weights hash, device, half, imgsz), so repeated requests for the same model skip torch_safe_load,
+fusing and warmup. Workers forked after loading inherit the shared parameters, and a pool passed to spawned workers as
+a multiprocessing argument sends shared-memory handles instead of copies, so N workers hold a single copy of the
+weights.
+
+Usage:
+    from ultralytics.engine.pool import MODEL_POOL
+
+    backend = MODEL_POOL.get("yolo11n.pt", device="cpu", imgsz=640)  # cached AutoBackend
+    results = MODEL_POOL.predict("yolo11n.pt", "bus.jpg", imgsz=640, conf=0.25)  # cached backend, fresh predictor
+    predictor = MODEL_POOL.predictor("yolo11n.pt", imgsz=640, conf=0.25)  # one predictor for the frames of a video
+    results = MODEL_POOL.run(predictor, frame)
+    print(MODEL_POOL.stats())
+"""
+
+import hashlib
+import threading
+import time
+from copy import deepcopy
+from pathlib import Path
+
+from ultralytics.nn.autobackend import AutoBackend
+from ultralytics.utils import LOGGER
+from ultralytics.utils.downloads import attempt_download_asset
+from ultralytics.utils.torch_utils import select_device
+
+
+def task_predictor(task):
+    """Return the YOLO predictor class for a task, i.e. DetectionPredictor for 'detect'."""
+    from ultralytics.models import yolo
+
+    return {
+        "classify": yolo.classify.ClassificationPredictor,
+        "detect": yolo.detect.DetectionPredictor,
+        "segment": yolo.segment.SegmentationPredictor,
+        "pose": yolo.pose.PosePredictor,
+        "obb": yolo.obb.OBBPredictor,
+    }[task]
+
+
+class ModelPool:
+    """
+    Registry of fused models and warm AutoBackend instances shared by all callers in a process.
+
+    Attributes:
+        shared (bool): Move the fused CPU FP32 weights into shared memory so worker processes reuse them.
+        hashes (dict): Cache of {(path, size, mtime_ns): sha256} so unchanged files are hashed once.
+        modules (dict): Fused models keyed by (weights hash, device, half). The CPU FP32 entry is the shared one, other
+            devices and dtypes get a private copy.
+        backends (dict): Warm AutoBackend instances keyed by (weights hash, device, half, imgsz).
+        locks (dict): Inference locks keyed by (weights hash, device, half). Backends of different imgsz share one
+            module, whose Detect head caches shape-dependent anchors, so their calls are serialized together.
+        times (dict): Seconds taken to build each modules and backends entry, i.e. the cold start cost paid once.
+
+    Methods:
+        hash: Return the sha256 of a weights file.
+        load: Load and fuse a checkpoint once, returning its hash and the shared CPU model.
+        get: Return a cached warm AutoBackend.
+        predictor: Return a predictor around a cached AutoBackend.
+        run: Run a pooled predictor, serialized with other users of its model.
+        predict: Run a fresh predictor on a cached AutoBackend.
+        stats: Return pool contents, shared weight bytes and cold start times.
+        clear: Release all cached models.
+
+    Examples:
+        >>> pool = ModelPool()
+        >>> backend = pool.get("yolo11n.pt", device="cpu", imgsz=640)
+        >>> assert pool.get("yolo11n.pt", device="cpu", imgsz=640) is backend
+        >>> results = pool.predict("yolo11n.pt", "bus.jpg")
+        >>> ctx = torch.multiprocessing.get_context("spawn")
+        >>> ctx.Process(target=worker, args=(pool,)).start()  # worker shares the weights loaded above
+    """
+
+    def __init__(self, shared=True):
+        """Initialize an empty pool, optionally keeping CPU weights in shared memory."""
+        self.shared = shared
+        self.hashes = {}
+        self.modules = {}
+        self.backends = {}
+        self.locks = {}  # per-module inference locks
+        self.times = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        """Pickle only the hashes and shared CPU models, so spawned workers receive shared-memory handles."""
+        modules = {k: m for k, m in self.modules.items() if k[1:] == ("cpu", False)}
+        return {"shared": self.shared, "hashes": self.hashes, "modules": modules}
+
+    def __setstate__(self, state):
+        """Restore a pool received by a worker process, rebuilding backends lazily from the shared models."""
+        self.__init__(state["shared"])
+        self.hashes.update(state["hashes"])
+        self.modules.update(state["modules"])
+
+    def hash(self, file):
+        """Return the sha256 hex digest of a weights file, reusing the cached value while its size and mtime match."""
+        stat = Path(file).stat()
+        key = (str(file), stat.st_size, stat.st_mtime_ns)
+        if key not in self.hashes:
+            h = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            self.hashes[key] = h.hexdigest()
+        return self.hashes[key]
+
+    def load(self, weights):
+        """
+        Load and fuse a checkpoint once per weights hash.
+
+        Args:
+            weights (str | Path): PyTorch *.pt weights, downloaded if it is a known asset name.
+
+        Returns:
+            h (str): The sha256 of the weights file.
+            model (torch.nn.Module): The fused CPU FP32 model in eval mode, in shared memory if `shared`.
+        """
+        from ultralytics.nn.tasks import attempt_load_one_weight
+
+        file = attempt_download_asset(str(weights))
+        with self._lock:
+            h = self.hash(file)
+            key = (h, "cpu", False)
+            if key not in self.modules:
+                t = time.perf_counter()
+                model = attempt_load_one_weight(file)[0].requires_grad_(False)
+                model = model.fuse(verbose=False).eval()
+                if self.shared:
+                    model.share_memory()
+                self.modules[key] = model
+                self.times[key] = time.perf_counter() - t
+            return h, self.modules[key]
+
+    def get(self, weights, device="cpu", half=False, imgsz=640):
+        """
+        Return a warm AutoBackend for a model, building it on first request.
+
+        Args:
+            weights (str | Path): PyTorch *.pt weights.
+            device (str | torch.device): Inference device, i.e. 'cpu', 0 or 'cuda:0'.
+            half (bool): Use FP16 weights.
+            imgsz (int | tuple): Warmup image size, part of the cache key.
+
+        Returns:
+            (AutoBackend): Backend shared with every other caller using the same key. The CPU FP32 backend wraps the
+                shared-memory model directly, other devices and dtypes wrap a private copy made once per pool.
+        """
+        return self.backends[self._build(weights, device, half, imgsz)]
+
+    def _build(self, weights, device, half, imgsz):
+        """Build the AutoBackend for a model if it is not cached yet, returning its cache key."""
+        h, model = self.load(weights)
+        device = select_device(device, verbose=False)
+        imgsz = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        key = (h, str(device), bool(half), imgsz)
+        with self._lock:
+            if key not in self.backends:
+                t = time.perf_counter()
+                if key[:3] not in self.modules:
+                    self.modules[key[:3]] = deepcopy(model)  # AutoBackend moves and casts the module in place
+                backend = AutoBackend(self.modules[key[:3]], device=device, fp16=half, fuse=False, verbose=False)
+                backend.eval()
+                backend.warmup(imgsz=(1, 3, *imgsz))
+                self.backends[key] = backend
+                self.locks.setdefault(key[:3], threading.Lock())
+                self.times[key] = time.perf_counter() - t
+                LOGGER.debug(f"ModelPool: built {Path(str(weights)).name} {key[1:]} in {self.times[key]:.2f}s")
+        return key
+
+    def predictor(self, weights, device="cpu", half=False, imgsz=640, **kwargs):
+        """
+        Create a lightweight predictor around the cached AutoBackend of a model.
+
+        Reuse it for consecutive calls with the same arguments, i.e. the frames of a video, and call it with run().
+
+        Args:
+            weights (str | Path): PyTorch *.pt weights.
+            device (str | torch.device): Inference device.
+            half (bool): Use FP16 weights.
+            imgsz (int | tuple): Inference image size.
+            **kwargs (Any): Other prediction arguments, i.e. conf=0.25, classes=[0], verbose=False.
+
+        Returns:
+            (BasePredictor): Predictor of the model's task using the pooled backend.
+        """
+        key = self._build(weights, device, half, imgsz)
+        backend = self.backends[key]
+        args = {"conf": 0.25, "batch": 1, "save": False, **kwargs, "mode": "predict", "imgsz": imgsz, "device": key[1]}
+        predictor = task_predictor(backend.model.task)(overrides=args)
+        predictor.setup_model(backend, verbose=False)
+        predictor.done_warmup = True
+        return predictor
+
+    def run(self, predictor, source=None):
+        """
+        Run a predictor from predictor() on a source.
+
+        Calls sharing a module are serialized, including those of different imgsz, as YOLO models cache shape-dependent
+        anchors during forward.
+
+        Args:
+            predictor (BasePredictor): Predictor returned by predictor().
+            source (str | Path | int | list | tuple | np.ndarray | PIL.Image.Image | torch.Tensor): Prediction source.
+
+        Returns:
+            (List[ultralytics.engine.results.Results]): The prediction results.
+        """
+        with self._lock:
+            key = next(k for k, b in self.backends.items() if b is predictor.model)
+        with self.locks[key[:3]]:
+            return predictor(source=source)
+
+    def predict(self, weights, source=None, device="cpu", half=False, imgsz=640, **kwargs):
+        """
+        Predict with a pooled model, creating a lightweight predictor around the cached AutoBackend.
+
+        Args:
+            weights (str | Path): PyTorch *.pt weights.
+            source (str | Path | int | list | tuple | np.ndarray | PIL.Image.Image | torch.Tensor): Prediction source.
+            device (str | torch.device): Inference device.
+            half (bool): Use FP16 weights.
+            imgsz (int | tuple): Inference image size.
+            **kwargs (Any): Other prediction arguments, i.e. conf=0.25, classes=[0], verbose=False.
+
+        Returns:
+            (List[ultralytics.engine.results.Results]): The prediction results.
+        """
+        return self.run(self.predictor(weights, device, half, imgsz, **kwargs), source)
+
+    def stats(self):
+        """
+        Return the pool contents and cold start costs.
+
+        Returns:
+            (dict): Number of models and backends, bytes of weights held in shared memory and a {key: seconds} map of
+                the one-off load, fuse and warmup times.
+        """
+        with self._lock:
+            shared = sum(
+                t.numel() * t.element_size()
+                for m in self.modules.values()
+                for t in (*m.parameters(), *m.buffers())
+                if t.is_shared()
+            )
+            return {
+                "models": len(self.modules),
+                "backends": len(self.backends),
+                "shared_bytes": shared,
+                "times": dict(self.times),
+            }
+
+    def clear(self):
+        """Release all cached models and backends."""
+        with self._lock:
+            self.modules.clear()
+            self.backends.clear()
+            self.locks.clear()
+            self.times.clear()
+
+
+MODEL_POOL = ModelPool()  # default process-wide pool
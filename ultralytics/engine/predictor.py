@@ -31,6 +31,7 @@ Usage - formats:
 """
 
 import platform
+import queue
 import re
 import threading
 from pathlib import Path
@@ -41,7 +42,7 @@ import torch
 
 from ultralytics.cfg import get_cfg, get_save_dir
 from ultralytics.data import load_inference_source
-from ultralytics.data.augment import LetterBox, classify_transforms
+from ultralytics.data.augment import BatchLetterBox, LetterBox, classify_transforms
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.utils import DEFAULT_CFG, LOGGER, MACOS, WINDOWS, callbacks, colorstr, ops
 from ultralytics.utils.checks import check_imgsz, check_imshow
@@ -76,6 +77,8 @@ class BasePredictor:
         device (torch.device): Device used for prediction.
         dataset (Dataset): Dataset used for prediction.
         vid_writer (dict): Dictionary of {save_path: video_writer, ...} writer for saving video output.
+        dataset_count (int | None): Snapshot of dataset.count for the current batch in pipelined mode.
+        tiles (int): Number of image tiles predicted by sliced inference in the current stream.
     """
 
     def __init__(self, cfg=DEFAULT_CFG, overrides=None, _callbacks=None):
@@ -91,6 +94,7 @@ class BasePredictor:
         if self.args.conf is None:
             self.args.conf = 0.25  # default conf=0.25
         self.done_warmup = False
+        self.tiles = 0  # number of sliced inference tiles
         if self.args.show:
             self.args.show = check_imshow(warn=True)
 
@@ -110,6 +114,7 @@ class BasePredictor:
         self.transforms = None
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.txt_path = None
+        self.dataset_count = None
         self._lock = threading.Lock()  # for automatic thread-safe inference
         callbacks.add_integration_callbacks(self)
 
@@ -121,7 +126,9 @@ class BasePredictor:
             im (torch.Tensor | List(np.ndarray)): BCHW for tensor, [(HWC) x B] for list.
         """
         not_tensor = not isinstance(im, torch.Tensor)
-        if not_tensor:
+        if not_tensor and self.args.torch_letterbox and all(x.ndim == 3 and x.shape[2] == 3 for x in im):
+            im = self.batch_pre_transform(im)  # uint8 RGB (n, 3, h, w) on device
+        elif not_tensor:
             im = np.stack(self.pre_transform(im))
             im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW, (n, 3, h, w)
             im = np.ascontiguousarray(im)  # contiguous
@@ -142,6 +149,13 @@ class BasePredictor:
         )
         return self.model(im, augment=self.args.augment, visualize=visualize, embed=self.args.embed, *args, **kwargs)
 
+    def compile_model(self, im, profiler):
+        """Compile the model with torch.compile for the shape of `im` if compile=True, timing it with `profiler`."""
+        skip = self.args.augment or self.args.visualize or self.args.embed
+        if getattr(self.model, "compile_mode", False) and not skip:
+            with profiler:
+                self.model.compile_shape(im)
+
     def pre_transform(self, im):
         """
         Pre-transform input image before inference.
@@ -160,6 +174,24 @@ class BasePredictor:
         )
         return [letterbox(image=x) for x in im]
 
+    def batch_pre_transform(self, im):
+        """
+        Letterbox input images as one batch on the inference device, bit-identical to pre_transform().
+
+        Args:
+            im (List(np.ndarray)): [(h, w, 3) x N] BGR images.
+
+        Returns:
+            (torch.Tensor): (N, 3, h, w) uint8 RGB images on self.device.
+        """
+        same_shapes = len({x.shape for x in im}) == 1
+        letterbox = BatchLetterBox(
+            self.imgsz,
+            auto=same_shapes and (self.model.pt or (getattr(self.model, "dynamic", False) and not self.model.imx)),
+            stride=self.model.stride,
+        )
+        return letterbox(im, device=self.device)
+
     def postprocess(self, preds, img, orig_imgs):
         """Post-processes predictions for an image and returns them."""
         return preds
@@ -205,6 +237,9 @@ class BasePredictor:
             batch=self.args.batch,
             vid_stride=self.args.vid_stride,
             buffer=self.args.stream_buffer,
+            workers=self.args.decode_workers,
+            prefetch=self.args.decode_prefetch,
+            processes=self.args.decode_processes,
         )
         self.source_type = self.dataset.source_type
         if not getattr(self, "stream", True) and (
@@ -239,28 +274,24 @@ class BasePredictor:
                 self.model.warmup(imgsz=(1 if self.model.pt or self.model.triton else self.dataset.bs, 3, *self.imgsz))
                 self.done_warmup = True
 
-            self.seen, self.windows, self.batch = 0, [], None
+            self.seen, self.windows, self.batch, self.tiles = 0, [], None, 0
             profilers = (
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
+                ops.Profile(device=self.device),  # torch.compile, excluded from inference
             )
             self.run_callbacks("on_predict_start")
-            for self.batch in self.dataset:
-                self.run_callbacks("on_predict_batch_start")
+            if self.args.pipeline and not self.args.visualize:
+                batches = self.pipelined_batches(profilers, *args, **kwargs)
+            else:
+                batches = self.serial_batches(profilers, *args, **kwargs)
+            for self.batch, im, preds, speed in batches:
+                if self.args.embed:
+                    yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
+                    continue
                 paths, im0s, s = self.batch
 
-                # Preprocess
-                with profilers[0]:
-                    im = self.preprocess(im0s)
-
-                # Inference
-                with profilers[1]:
-                    preds = self.inference(im, *args, **kwargs)
-                    if self.args.embed:
-                        yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
-                        continue
-
                 # Postprocess
                 with profilers[2]:
                     self.results = self.postprocess(preds, im, im0s)
@@ -268,13 +299,11 @@ class BasePredictor:
 
                 # Visualize, save, write results
                 n = len(im0s)
+                speed["postprocess"] = profilers[2].dt * 1e3
+                speed = {k: v if k.endswith("queue") else v / n for k, v in speed.items()}  # ms per image
                 for i in range(n):
                     self.seen += 1
-                    self.results[i].speed = {
-                        "preprocess": profilers[0].dt * 1e3 / n,
-                        "inference": profilers[1].dt * 1e3 / n,
-                        "postprocess": profilers[2].dt * 1e3 / n,
-                    }
+                    self.results[i].speed = dict(speed)
                     if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
                         s[i] += self.write_results(i, Path(paths[i]), im, s)
 
@@ -292,28 +321,158 @@ class BasePredictor:
 
         # Print final results
         if self.args.verbose and self.seen:
-            t = tuple(x.t / self.seen * 1e3 for x in profilers)  # speeds per image
+            t = tuple(x.t / self.seen * 1e3 for x in profilers[:3])  # speeds per image
             LOGGER.info(
                 f"Speed: %.1fms preprocess, %.1fms inference, %.1fms postprocess per image at shape "
                 f"{(min(self.args.batch, self.seen), 3, *im.shape[2:])}" % t
             )
+            if self.tiles:
+                t = sum(x.t for x in profilers[:3])
+                LOGGER.info(f"Tiles: {self.tiles} tiles of {self.args.tile}px at {self.tiles / t:.1f} tiles/s")
+            if profilers[3].t:
+                n = len(self.model.compiled)
+                LOGGER.info(f"Compile: {profilers[3].t:.1f}s torch.compile for {n} input shape(s)")
         if self.args.save or self.args.save_txt or self.args.save_crop:
             nl = len(list(self.save_dir.glob("labels/*.txt")))  # number of labels
             s = f"\n{nl} label{'s' * (nl > 1)} saved to {self.save_dir / 'labels'}" if self.args.save_txt else ""
             LOGGER.info(f"Results saved to {colorstr('bold', self.save_dir)}{s}")
         self.run_callbacks("on_predict_end")
 
+    def serial_batches(self, profilers, *args, **kwargs):
+        """
+        Preprocess and run inference on each dataset batch in turn on the calling thread.
+
+        Args:
+            profilers (tuple): Preprocess, inference, postprocess and compile ops.Profile objects.
+
+        Yields:
+            (tuple): Dataset batch, preprocessed images, model predictions and a dict of batch speeds in ms.
+        """
+        for self.batch in self.dataset:
+            self.run_callbacks("on_predict_batch_start")
+            with profilers[0]:
+                im = self.preprocess(self.batch[1])
+            self.compile_model(im, profilers[3])
+            with profilers[1]:
+                preds = self.inference(im, *args, **kwargs)
+            yield self.batch, im, preds, {"preprocess": profilers[0].dt * 1e3, "inference": profilers[1].dt * 1e3}
+
+    def pipelined_batches(self, profilers, *args, **kwargs):
+        """
+        Preprocess and run inference on dataset batches on worker threads, overlapping them with postprocessing.
+
+        Batch N+1 is read and preprocessed on one thread while batch N runs through the model on a second thread and
+        batch N-1 is postprocessed by the caller. Stages are connected by queues of size `args.pipeline`, batches are
+        yielded in dataset order and all callbacks run on the calling thread, with 'on_predict_batch_start' called
+        when a batch leaves the pipeline.
+
+        Args:
+            profilers (tuple): Preprocess, inference, postprocess and compile ops.Profile objects.
+
+        Yields:
+            (tuple): Dataset batch, preprocessed images, model predictions and a dict of batch speeds in ms, including
+                the time each stage stalled waiting for its input and the queue depths seen by the inference and
+                postprocess stages.
+        """
+        stop = threading.Event()
+        pre_queue, inf_queue = queue.Queue(self.args.pipeline), queue.Queue(self.args.pipeline)
+
+        def put(q, item):
+            """Put an item on a queue, returning False if the pipeline was stopped."""
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q):
+            """Get an item from a queue, returning None if the pipeline was stopped."""
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        def preprocess():
+            """Read and preprocess batches."""
+            try:
+                batches = iter(self.dataset)
+                while True:
+                    with ops.Profile() as stall:
+                        batch = next(batches, None)
+                    if batch is None:
+                        break
+                    with profilers[0]:
+                        im = self.preprocess(batch[1])
+                    speed = {"preprocess": profilers[0].dt * 1e3, "preprocess_stall": stall.dt * 1e3}
+                    if not put(pre_queue, (batch, getattr(self.dataset, "count", None), im, speed)):
+                        return
+                put(pre_queue, None)
+            except Exception as e:
+                put(pre_queue, e)
+
+        @smart_inference_mode()
+        def inference():
+            """Run inference on preprocessed batches."""
+            try:
+                while True:
+                    depth = pre_queue.qsize()
+                    with ops.Profile() as stall:
+                        item = get(pre_queue)
+                    if item is None or isinstance(item, Exception):
+                        put(inf_queue, item)
+                        return
+                    batch, count, im, speed = item
+                    self.compile_model(im, profilers[3])
+                    with profilers[1]:
+                        preds = self.inference(im, *args, **kwargs)
+                    speed.update(inference=profilers[1].dt * 1e3, inference_stall=stall.dt * 1e3, inference_queue=depth)
+                    if not put(inf_queue, (batch, count, im, preds, speed)):
+                        return
+            except Exception as e:
+                put(inf_queue, e)
+
+        threads = [threading.Thread(target=f, daemon=True) for f in (preprocess, inference)]
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                depth = inf_queue.qsize()
+                with ops.Profile() as stall:
+                    item = inf_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                batch, self.dataset_count, im, preds, speed = item
+                speed.update(postprocess_queue=depth, postprocess_stall=stall.dt * 1e3)
+                self.batch = batch
+                self.run_callbacks("on_predict_batch_start")
+                yield batch, im, preds, speed
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+            self.dataset_count = None
+
     def setup_model(self, model, verbose=True):
-        """Initialize YOLO model with given parameters and set it to evaluation mode."""
-        self.model = AutoBackend(
-            weights=model or self.args.model,
-            device=select_device(self.args.device, verbose=verbose),
-            dnn=self.args.dnn,
-            data=self.args.data,
-            fp16=self.args.half,
-            batch=self.args.batch,
-            fuse=True,
-            verbose=verbose,
+        """Initialize YOLO model with given parameters and set it to evaluation mode, reusing a built AutoBackend."""
+        self.model = (
+            model
+            if isinstance(model, AutoBackend)
+            else AutoBackend(
+                weights=model or self.args.model,
+                device=select_device(self.args.device, verbose=verbose),
+                dnn=self.args.dnn,
+                data=self.args.data,
+                fp16=self.args.half,
+                batch=self.args.batch,
+                fuse=True,
+                verbose=verbose,
+                compile_mode=self.args.compile,
+            )
         )
 
         self.device = self.model.device  # update device
@@ -327,7 +486,7 @@ class BasePredictor:
             im = im[None]  # expand for batch dim
         if self.source_type.stream or self.source_type.from_img or self.source_type.tensor:  # batch_size >= 1
             string += f"{i}: "
-            frame = self.dataset.count
+            frame = self.dataset.count if self.dataset_count is None else self.dataset_count
         else:
             match = re.search(r"frame (\d+)/", s[i])
             frame = int(match[1]) if match else None  # 0 if frame undetermined
@@ -0,0 +1,315 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Dynamic micro-batching inference service for many concurrent callers.
+
+Requests submitted from any number of threads or asyncio tasks are gathered into batches of up to `max_batch` images,
+waiting at most `max_wait_ms` for a batch to fill, and run through the model in a single forward pass. Each caller
+receives its own Results object through a future.
+
+Usage:
+    from ultralytics import YOLO
+    from ultralytics.engine.server import InferenceServer
+
+    with InferenceServer(YOLO("yolo11n.pt"), max_batch=8, max_wait_ms=5) as server:
+        result = server.predict("bus.jpg")  # blocking, from any thread
+        result = await server.apredict(image)  # from an asyncio task
+        print(server.stats())
+"""
+
+import asyncio
+import bisect
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ultralytics.utils import LOGGER
+from ultralytics.utils.patches import imread
+from ultralytics.utils.torch_utils import smart_inference_mode
+
+LATENCY_BINS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)  # queue latency histogram upper edges (ms)
+
+
+class InferenceServer:
+    """
+    Micro-batching inference service around a YOLO model.
+
+    Attributes:
+        predictor (BasePredictor): Task predictor providing preprocess, inference and postprocess.
+        max_batch (int): Maximum number of images per forward pass.
+        max_wait_ms (float): Maximum time to wait for a batch to fill after its first request arrives.
+        requests (queue.Queue): Pending (image, path, future, submit time) requests.
+        batch_sizes (dict): Histogram of {batch size: count} of executed forward passes.
+        latencies (list): Histogram counts of request queue latency for LATENCY_BINS, plus an overflow bin.
+
+    Methods:
+        start: Start the batching worker thread.
+        close: Stop the worker, failing requests that are still queued.
+        submit: Queue an image and return a concurrent.futures.Future of its Results.
+        predict: Blocking prediction of a single image.
+        apredict: Asyncio prediction of a single image.
+        stats: Return throughput, queue latency and batch size statistics.
+        serve: Serve predictions over a local HTTP endpoint.
+
+    Examples:
+        >>> from ultralytics import YOLO
+        >>> server = InferenceServer(YOLO("yolo11n.pt"), max_batch=8, max_wait_ms=5).start()
+        >>> futures = [server.submit("bus.jpg") for _ in range(16)]
+        >>> results = [f.result() for f in futures]
+        >>> server.close()
+    """
+
+    def __init__(self, model, max_batch=8, max_wait_ms=5.0, **kwargs):
+        """
+        Initialize the server with a model and batching limits.
+
+        Args:
+            model (str | Path | Model): Model weights or an ultralytics Model instance, i.e. YOLO("yolo11n.pt").
+            max_batch (int): Maximum number of images per forward pass.
+            max_wait_ms (float): Maximum time in milliseconds to wait for more requests once one is queued.
+            **kwargs (Any): Prediction arguments, i.e. conf=0.25, imgsz=640, device=0, half=True.
+        """
+        if isinstance(model, (str, Path)):
+            from ultralytics import YOLO
+
+            model = YOLO(model)
+        args = {**model.overrides, "conf": 0.25, **kwargs, "mode": "predict", "batch": max_batch, "save": False}
+        self.predictor = model._smart_load("predictor")(overrides=args, _callbacks=model.callbacks)
+        self.predictor.setup_model(model=model.model, verbose=False)
+        self.predictor.setup_source(np.zeros((32, 32, 3), dtype=np.uint8))  # set imgsz, transforms and source_type
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.requests = queue.Queue()
+        self.thread = None
+        self.running = False
+        self.httpd = None
+        self._lock = threading.Lock()  # for stats
+        self.reset_stats()
+
+    def __enter__(self):
+        """Start the server when used as a context manager."""
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        """Close the server on leaving the context manager."""
+        self.close()
+
+    def start(self):
+        """Warm up the model and start the batching worker thread."""
+        if not self.running:
+            self.predictor.model.warmup(imgsz=(1, 3, *self.predictor.imgsz))
+            self.running = True
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+        return self
+
+    def close(self):
+        """Stop the HTTP endpoint and worker thread, failing any requests still in the queue."""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        if self.running:
+            self.running = False
+            self.requests.put(None)  # wake worker
+            self.thread.join()
+        while not self.requests.empty():
+            request = self.requests.get_nowait()
+            if request is not None:
+                request[2].set_exception(RuntimeError("InferenceServer closed before request was processed"))
+
+    def submit(self, source, path=""):
+        """
+        Queue a single image for batched prediction.
+
+        Args:
+            source (str | Path | bytes | np.ndarray | PIL.Image.Image): Image file, encoded image bytes, BGR HWC numpy
+                array or PIL image.
+            path (str): Path reported in the Results object, defaults to the source path for files.
+
+        Returns:
+            (concurrent.futures.Future): Future resolving to the Results object for this image.
+        """
+        if not self.running:
+            raise RuntimeError("InferenceServer is not running, call start() first")
+        future = Future()
+        try:
+            im, path = self.load(source, path)
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        self.requests.put((im, path, future, time.perf_counter()))
+        return future
+
+    def predict(self, source, path="", timeout=None):
+        """Predict a single image, blocking until its batch has been processed, returning a Results object."""
+        return self.submit(source, path).result(timeout)
+
+    async def apredict(self, source, path=""):
+        """Predict a single image from an asyncio task without blocking the event loop, returning a Results object."""
+        return await asyncio.wrap_future(self.submit(source, path))
+
+    @staticmethod
+    def load(source, path=""):
+        """Load a source into a BGR HWC numpy image, returning the image and its path."""
+        if isinstance(source, (str, Path)):
+            im, path = imread(str(source)), path or str(source)
+            if im is None:
+                raise FileNotFoundError(f"Image Not Found {source}")
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            im = cv2.imdecode(np.frombuffer(source, np.uint8), cv2.IMREAD_COLOR)
+            if im is None:
+                raise ValueError("Could not decode image bytes")
+        elif isinstance(source, Image.Image):
+            im = np.ascontiguousarray(np.asarray(source.convert("RGB"))[:, :, ::-1])
+        elif isinstance(source, np.ndarray):
+            im = source
+        else:
+            raise TypeError(f"Unsupported source type {type(source).__name__}")
+        return im, path
+
+    def _collect(self):
+        """Block for the first request, then gather more until max_batch or max_wait_ms is reached."""
+        first = self.requests.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self.requests.put(None)  # keep the stop signal for the next _collect() call
+                break
+            batch.append(request)
+        return batch
+
+    @smart_inference_mode()
+    def _worker(self):
+        """Run batched forward passes and scatter the Results to each request's future."""
+        while self.running:
+            batch = self._collect()
+            if not batch:
+                continue
+            ims, paths, futures, t_submit = zip(*batch)
+            t_start = time.perf_counter()
+            try:
+                predictor = self.predictor
+                predictor.batch = (list(paths), list(ims), [""] * len(ims))
+                im = predictor.preprocess(list(ims))
+                t_pre = time.perf_counter()
+                preds = predictor.inference(im)
+                t_inf = time.perf_counter()
+                results = predictor.postprocess(preds, im, list(ims))
+                t_post = time.perf_counter()
+            except Exception as e:
+                for f in futures:
+                    f.set_exception(e)
+                continue
+            n = len(ims)
+            speed = {
+                "preprocess": (t_pre - t_start) * 1e3 / n,
+                "inference": (t_inf - t_pre) * 1e3 / n,
+                "postprocess": (t_post - t_inf) * 1e3 / n,
+            }
+            for r, f, t in zip(results, futures, t_submit):
+                r.speed = {**speed, "queue": (t_start - t) * 1e3}
+                f.set_result(r)
+            self._update_stats(n, [(t_start - t) * 1e3 for t in t_submit])
+
+    def reset_stats(self):
+        """Reset throughput, queue latency and batch size statistics."""
+        with self._lock:
+            self.t0 = time.perf_counter()
+            self.images = 0
+            self.batch_sizes = {}
+            self.latencies = [0] * (len(LATENCY_BINS) + 1)
+
+    def _update_stats(self, n, latencies):
+        """Record a batch of n images and the queue latency of each request in ms."""
+        with self._lock:
+            self.images += n
+            self.batch_sizes[n] = self.batch_sizes.get(n, 0) + 1
+            for ms in latencies:
+                self.latencies[bisect.bisect_left(LATENCY_BINS, ms)] += 1
+
+    def stats(self):
+        """
+        Return serving statistics since start or the last reset_stats().
+
+        Returns:
+            (dict): Throughput in images/s and batches/s, mean batch size, a {batch size: count} histogram and a
+                {'<=ms' bin: count} queue latency histogram.
+        """
+        with self._lock:
+            dt = max(time.perf_counter() - self.t0, 1e-9)
+            batches = sum(self.batch_sizes.values())
+            bins = [f"<={x}ms" for x in LATENCY_BINS] + [f">{LATENCY_BINS[-1]}ms"]
+            return {
+                "images": self.images,
+                "batches": batches,
+                "images/s": self.images / dt,
+                "batches/s": batches / dt,
+                "mean_batch": self.images / max(batches, 1),
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "queue_latency": dict(zip(bins, self.latencies)),
+            }
+
+    def serve(self, host="127.0.0.1", port=0):
+        """
+        Serve predictions over a minimal local HTTP endpoint on a background thread.
+
+        POST /predict with encoded image bytes as the body returns the Results summary as JSON, GET /stats returns
+        stats(). Intended for local testing and as a stand-in for a production HTTP front-end.
+
+        Args:
+            host (str): Host address to bind.
+            port (int): Port to bind, 0 selects a free port.
+
+        Returns:
+            (str): Base URL of the endpoint, i.e. 'http://127.0.0.1:8000'.
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, data):
+                body = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != "/predict":
+                    return self._reply(404, {"error": f"Unknown path {self.path}"})
+                try:
+                    body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                    self._reply(200, server.predict(body).summary())
+                except Exception as e:
+                    self._reply(400, {"error": str(e)})
+
+            def do_GET(self):
+                if self.path != "/stats":
+                    return self._reply(404, {"error": f"Unknown path {self.path}"})
+                self._reply(200, server.stats())
+
+            def log_message(self, format, *args):
+                pass  # silence per-request logging
+
+        self.start()
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        url = f"http://{host}:{self.httpd.server_address[1]}"
+        LOGGER.info(f"InferenceServer listening on {url}")
+        return url
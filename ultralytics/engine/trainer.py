@@ -22,6 +22,7 @@ from torch import distributed as dist
 from torch import nn, optim
 
 from ultralytics.cfg import get_cfg, get_save_dir
+from ultralytics.data.build import BatchPrefetcher
 from ultralytics.data.utils import check_cls_dataset, check_det_dataset
 from ultralytics.nn.tasks import attempt_load_one_weight, attempt_load_weights
 from ultralytics.utils import (
@@ -43,6 +44,7 @@ from ultralytics.utils.dist import ddp_cleanup, generate_ddp_command
 from ultralytics.utils.files import get_latest_run
 from ultralytics.utils.torch_utils import (
     TORCH_2_4,
+    CheckpointWriter,
     EarlyStopping,
     ModelEMA,
     autocast,
@@ -69,6 +71,7 @@ class BaseTrainer:
         last (Path): Path to the last checkpoint.
         best (Path): Path to the best checkpoint.
         save_period (int): Save checkpoint every x epochs (disabled if < 1).
+        checkpoint_writer (CheckpointWriter): Writes checkpoints, on a background thread if `save_async`.
         batch_size (int): Batch size for training.
         epochs (int): Number of epochs to train for.
         start_epoch (int): Starting epoch for training.
@@ -84,6 +87,7 @@ class BaseTrainer:
         scheduler (torch.optim.lr_scheduler._LRScheduler): Learning rate scheduler.
         best_fitness (float): The best fitness value achieved.
         fitness (float): Current fitness value.
+        val_pending (dict | None): Background validation of the last epoch awaiting its result if `val_async`.
         loss (float): Current loss value.
         tloss (float): Total loss value.
         loss_names (list): List of loss names.
@@ -116,6 +120,7 @@ class BaseTrainer:
             yaml_save(self.save_dir / "args.yaml", vars(self.args))  # save run args
         self.last, self.best = self.wdir / "last.pt", self.wdir / "best.pt"  # checkpoint paths
         self.save_period = self.args.save_period
+        self.checkpoint_writer = CheckpointWriter(background=self.args.save_async)
 
         self.batch_size = self.args.batch
         self.epochs = self.args.epochs or 100  # in case users accidentally pass epochs=None with timed training
@@ -140,6 +145,8 @@ class BaseTrainer:
         # Epoch level metrics
         self.best_fitness = None
         self.fitness = None
+        self.val_pending = None  # background validation of the last epoch if `val_async`
+        self.val_executor = None
         self.loss = None
         self.tloss = None
         self.loss_names = ["Loss"]
@@ -285,6 +292,8 @@ class BaseTrainer:
         # Dataloaders
         batch_size = self.batch_size // max(world_size, 1)
         self.train_loader = self.get_dataloader(self.trainset, batch_size=batch_size, rank=LOCAL_RANK, mode="train")
+        if self.args.prefetch and self.device.type == "cuda":
+            self.train_loader = BatchPrefetcher(self.train_loader, self.device, batch_size, self.args.imgsz)
         if RANK in {-1, 0}:
             # Note: When training DOTA dataset, double batch size could get OOM on images with >2000 objects.
             self.test_loader = self.get_dataloader(
@@ -348,7 +357,7 @@ class BaseTrainer:
                 self.scheduler.step()
 
             self.model.train()
-            if RANK != -1:
+            if RANK != -1 and hasattr(self.train_loader.sampler, "set_epoch"):  # bucket batch samplers advance alone
                 self.train_loader.sampler.set_epoch(epoch)
             pbar = enumerate(self.train_loader)
             # Update dataloader attributes (optional)
@@ -428,19 +437,26 @@ class BaseTrainer:
                 final_epoch = epoch + 1 >= self.epochs
                 self.ema.update_attr(self.model, include=["yaml", "nc", "args", "names", "stride", "class_weights"])
 
+                self.finish_validation()  # apply the previous epoch's background validation, if any
+
                 # Validation
-                if self.args.val or final_epoch or self.stopper.possible_stop or self.stop:
-                    self.metrics, self.fitness = self.validate()
-                self.save_metrics(metrics={**self.label_loss_items(self.tloss), **self.metrics, **self.lr})
-                self.stop |= self.stopper(epoch + 1, self.fitness) or final_epoch
+                validate = self.args.val or final_epoch or self.stopper.possible_stop or self.stop
+                deferred = validate and self.args.val_async and not (final_epoch or self.stop)
+                if deferred:
+                    self.validate_async()  # metrics, EarlyStopping, checkpoints and loggers follow with the result
+                else:
+                    if validate:
+                        self.metrics, self.fitness = self.validate()
+                    self.save_metrics(metrics={**self.label_loss_items(self.tloss), **self.metrics, **self.lr})
+                    self.stop |= self.stopper(epoch + 1, self.fitness) or final_epoch
+
+                    # Save model
+                    if self.args.save or final_epoch:
+                        self.save_model()
+                        self.run_callbacks("on_model_save")
                 if self.args.time:
                     self.stop |= (time.time() - self.train_time_start) > (self.args.time * 3600)
 
-                # Save model
-                if self.args.save or final_epoch:
-                    self.save_model()
-                    self.run_callbacks("on_model_save")
-
             # Scheduler
             t = time.time()
             self.epoch_time = t - self.epoch_time_start
@@ -451,7 +467,8 @@ class BaseTrainer:
                 self._setup_scheduler()
                 self.scheduler.last_epoch = self.epoch  # do not move
                 self.stop |= epoch >= self.epochs  # stop if exceeded epochs
-            self.run_callbacks("on_fit_epoch_end")
+            if not (RANK in {-1, 0} and deferred):  # else run by finish_validation with this epoch's metrics
+                self.run_callbacks("on_fit_epoch_end")
             self._clear_memory()
 
             # Early Stopping
@@ -467,6 +484,11 @@ class BaseTrainer:
             # Do final val with best.pt
             seconds = time.time() - self.train_time_start
             LOGGER.info(f"\n{epoch - self.start_epoch + 1} epochs completed in {seconds / 3600:.3f} hours.")
+            self.finish_validation()  # i.e. after a timed stop
+            if self.val_executor is not None:
+                self.val_executor.shutdown()
+                self.val_executor = None
+            self.checkpoint_writer.flush()  # final_eval reads last.pt and best.pt
             self.final_eval()
             if self.args.plots:
                 self.plot_metrics()
@@ -510,40 +532,47 @@ class BaseTrainer:
 
         return pd.read_csv(self.csv).to_dict(orient="list")
 
-    def save_model(self):
-        """Save model training checkpoints with additional metadata."""
-        import io
-
-        # Serialize ckpt to a byte buffer once (faster than repeated torch.save() calls)
-        buffer = io.BytesIO()
-        torch.save(
-            {
-                "epoch": self.epoch,
-                "best_fitness": self.best_fitness,
-                "model": None,  # resume and final checkpoints derive from EMA
-                "ema": deepcopy(self.ema.ema).half(),
-                "updates": self.ema.updates,
-                "optimizer": convert_optimizer_state_dict_to_fp16(deepcopy(self.optimizer.state_dict())),
-                "train_args": vars(self.args),  # save as dict
-                "train_metrics": {**self.metrics, **{"fitness": self.fitness}},
-                "train_results": self.read_results_csv(),
-                "date": datetime.now().isoformat(),
-                "version": __version__,
-                "license": "AGPL-3.0 (https://ultralytics.com/license)",
-                "docs": "https://docs.ultralytics.com",
-            },
-            buffer,
-        )
-        serialized_ckpt = buffer.getvalue()  # get the serialized content to save
+    def checkpoint(self):
+        """Return a CPU snapshot of the training state for a checkpoint, which training may continue past."""
+        optimizer = convert_optimizer_state_dict_to_fp16(deepcopy(self.optimizer.state_dict()))
+        for state in optimizer["state"].values():
+            state.update({k: v.cpu() for k, v in state.items() if isinstance(v, torch.Tensor)})
+        return {
+            "epoch": self.epoch,
+            "model": None,  # resume and final checkpoints derive from EMA
+            "ema": deepcopy(self.ema.ema).half().cpu(),
+            "updates": self.ema.updates,
+            "optimizer": optimizer,
+            "train_args": dict(vars(self.args)),  # save as dict
+            "date": datetime.now().isoformat(),
+            "version": __version__,
+            "license": "AGPL-3.0 (https://ultralytics.com/license)",
+            "docs": "https://docs.ultralytics.com",
+        }
+
+    def save_model(self, ckpt=None):
+        """
+        Save model training checkpoints with additional metadata, on a background thread if `save_async`.
 
-        # Save checkpoints
-        self.last.write_bytes(serialized_ckpt)  # save last.pt
+        Args:
+            ckpt (dict, optional): Training state from `checkpoint()` at an earlier epoch, saved once its validation
+                finished. Defaults to the current state.
+        """
+        ckpt = ckpt or self.checkpoint()
+        ckpt["best_fitness"] = self.best_fitness
+        ckpt["train_metrics"] = {**self.metrics, **{"fitness": self.fitness}}
+        ckpt["train_results"] = self.read_results_csv()
+
+        # Save checkpoints, serialized once for all files
+        epoch = ckpt["epoch"]
+        files = [self.last]  # save last.pt
         if self.best_fitness == self.fitness:
-            self.best.write_bytes(serialized_ckpt)  # save best.pt
-        if (self.save_period > 0) and (self.epoch % self.save_period == 0):
-            (self.wdir / f"epoch{self.epoch}.pt").write_bytes(serialized_ckpt)  # save epoch, i.e. 'epoch3.pt'
+            files.append(self.best)  # save best.pt
+        if (self.save_period > 0) and (epoch % self.save_period == 0):
+            files.append(self.wdir / f"epoch{epoch}.pt")  # save epoch, i.e. 'epoch3.pt'
         # if self.args.close_mosaic and self.epoch == (self.epochs - self.args.close_mosaic - 1):
-        #    (self.wdir / "last_mosaic.pt").write_bytes(serialized_ckpt)  # save mosaic checkpoint
+        #    files.append(self.wdir / "last_mosaic.pt")  # save mosaic checkpoint
+        self.checkpoint_writer.save(ckpt, files)
 
     def get_dataset(self):
         """
@@ -609,6 +638,60 @@ class BaseTrainer:
             self.best_fitness = fitness
         return metrics, fitness
 
+    def validate_async(self):
+        """
+        Validate an EMA snapshot of this epoch on a background thread while the next epoch trains.
+
+        On CUDA the validator runs on its own stream. The epoch's results row, EarlyStopping update and checkpoints are
+        deferred to `finish_validation`, called at the end of the next epoch, so best.pt holds the validated weights and
+        the `on_fit_epoch_end` loggers record the metrics under this epoch.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        model = deepcopy(self.ema.ema)
+        stream = None
+        if self.device.type == "cuda":
+            stream = torch.cuda.Stream(self.device)
+            stream.wait_stream(torch.cuda.current_stream(self.device))  # snapshot copied before validation reads it
+        self.val_executor = self.val_executor or ThreadPoolExecutor(1, thread_name_prefix="validator")
+        self.val_pending = {
+            "epoch": self.epoch,
+            "result": self.val_executor.submit(self._validate_snapshot, model, stream),
+            "loss": -self.loss.detach().cpu().numpy(),  # fitness if the validator returns none
+            "tloss": self.tloss,
+            "loss_items": self.label_loss_items(self.tloss),
+            "lr": dict(self.lr),
+            "ckpt": self.checkpoint() if self.args.save else None,
+        }
+
+    def _validate_snapshot(self, model, stream):
+        """Run the validator on a model snapshot and CUDA stream, returning its metrics."""
+        with torch.cuda.stream(stream):
+            return self.validator(self, model=model)
+
+    def finish_validation(self):
+        """Wait for the pending background validation, then apply its fitness, EarlyStopping, checkpoints and logs."""
+        if self.val_pending is None:
+            return
+        pending, self.val_pending = self.val_pending, None
+        metrics = pending["result"].result()
+        fitness = metrics.pop("fitness", pending["loss"])
+        if not self.best_fitness or self.best_fitness < fitness:
+            self.best_fitness = fitness
+        self.metrics, self.fitness = metrics, fitness
+        epoch = pending["epoch"]
+        self.save_metrics(metrics={**pending["loss_items"], **metrics, **pending["lr"]}, epoch=epoch)
+        self.stop |= self.stopper(epoch + 1, fitness)
+        if pending["ckpt"] is not None:
+            self.save_model(pending["ckpt"])
+            self.run_callbacks("on_model_save")
+        current = self.epoch, self.tloss, self.lr
+        self.epoch, self.tloss, self.lr = epoch, pending["tloss"], pending["lr"]  # state of the validated epoch
+        try:
+            self.run_callbacks("on_fit_epoch_end")
+        finally:
+            self.epoch, self.tloss, self.lr = current
+
     def get_model(self, cfg=None, weights=None, verbose=True):
         """Get model and raise NotImplementedError for loading cfg files."""
         raise NotImplementedError("This task trainer doesn't support loading cfg files")
@@ -655,14 +738,15 @@ class BaseTrainer:
         """Plots training labels for YOLO model."""
         pass
 
-    def save_metrics(self, metrics):
-        """Saves training metrics to a CSV file."""
+    def save_metrics(self, metrics, epoch=None):
+        """Saves training metrics of an epoch, the current one by default, to a CSV file."""
         keys, vals = list(metrics.keys()), list(metrics.values())
         n = len(metrics) + 2  # number of cols
         s = "" if self.csv.exists() else (("%s," * n % tuple(["epoch", "time"] + keys)).rstrip(",") + "\n")  # header
         t = time.time() - self.train_time_start
+        epoch = self.epoch if epoch is None else epoch
         with open(self.csv, "a") as f:
-            f.write(s + ("%.6g," * n % tuple([self.epoch + 1, t] + vals)).rstrip(",") + "\n")
+            f.write(s + ("%.6g," * n % tuple([epoch + 1, t] + vals)).rstrip(",") + "\n")
 
     def plot_metrics(self):
         """Plot and display metrics visually."""
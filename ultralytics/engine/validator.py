@@ -113,7 +113,7 @@ class BaseValidator:
             self.data = trainer.data
             # force FP16 val during training
             self.args.half = self.device.type != "cpu" and trainer.amp
-            model = trainer.ema.ema or trainer.model
+            model = model or trainer.ema.ema or trainer.model  # model is an EMA snapshot if validating in background
             model = model.half() if self.args.half else model.float()
             # self.model = model
             self.loss = torch.zeros_like(trainer.loss_items, device=trainer.device)
@@ -129,6 +129,7 @@ class BaseValidator:
                 dnn=self.args.dnn,
                 data=self.args.data,
                 fp16=self.args.half,
+                compile_mode=self.args.compile,
             )
             # self.model = model
             self.device = model.device  # update device
@@ -165,6 +166,8 @@ class BaseValidator:
             Profile(device=self.device),
             Profile(device=self.device),
         )
+        dt_compile = Profile(device=self.device)  # torch.compile time, excluded from inference time
+        compiling = not self.training and model.compile_mode
         bar = TQDM(self.dataloader, desc=self.get_desc(), total=len(self.dataloader))
         self.init_metrics(de_parallel(model))
         self.jdict = []  # empty before each val
@@ -176,6 +179,9 @@ class BaseValidator:
                 batch = self.preprocess(batch)
 
             # Inference
+            if compiling and not augment:
+                with dt_compile:
+                    model.compile_shape(batch["img"])
             with dt[1]:
                 preds = model(batch["img"], augment=augment)
 
@@ -210,6 +216,8 @@ class BaseValidator:
                     *tuple(self.speed.values())
                 )
             )
+            if dt_compile.t:
+                LOGGER.info(f"Compile: {dt_compile.t:.1f}s torch.compile for {len(model.compiled)} input shape(s)")
             if self.args.save_json and self.jdict:
                 with open(str(self.save_dir / "predictions.json"), "w") as f:
                     LOGGER.info(f"Saving {f.name}...")
@@ -2,7 +2,7 @@
 
 import torch
 
-from ultralytics.data.augment import LetterBox
+from ultralytics.data.augment import BatchLetterBox, LetterBox
 from ultralytics.engine.predictor import BasePredictor
 from ultralytics.engine.results import Results
 from ultralytics.utils import ops
@@ -82,3 +82,7 @@ class RTDETRPredictor(BasePredictor):
         """
         letterbox = LetterBox(self.imgsz, auto=False, scaleFill=True)
         return [letterbox(image=x) for x in im]
+
+    def batch_pre_transform(self, im):
+        """Scale-fill input images as one batch on the inference device, bit-identical to pre_transform()."""
+        return BatchLetterBox(self.imgsz, auto=False, scaleFill=True)(im, device=self.device)
@@ -1,5 +1,9 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
+import torch
+import torchvision
+
+from ultralytics.data.split_dota import get_windows
 from ultralytics.engine.predictor import BasePredictor
 from ultralytics.engine.results import Results
 from ultralytics.utils import ops
@@ -18,8 +22,44 @@ class DetectionPredictor(BasePredictor):
         predictor = DetectionPredictor(overrides=args)
         predictor.predict_cli()
         ```
+
+        Sliced inference of large images in overlapping 640 pixel tiles, 16 tiles per forward pass
+        ```python
+        results = YOLO("yolo11n.pt").predict("large.jpg", tile=640, tile_overlap=0.2, tile_batch=16)
+        ```
     """
 
+    def get_tiles(self, shape):
+        """Return (n, 4) xyxy tile windows covering an image of `shape` (h, w) for sliced inference."""
+        return get_windows(shape, crop_sizes=(self.args.tile,), gaps=(int(self.args.tile * self.args.tile_overlap),))
+
+    def preprocess(self, im):
+        """Prepares input images before inference, cutting each image into overlapping tiles if `tile` is set."""
+        if self.args.tile and not isinstance(im, torch.Tensor):
+            if self.args.task != "detect":
+                raise ValueError(f"Sliced inference supports task=detect only, not task={self.args.task}")
+            if self.args.tile_overlap >= 1:
+                raise ValueError(
+                    f"'tile_overlap={self.args.tile_overlap}' is an invalid value. Valid 'tile_overlap' values are "
+                    "between 0.0 and 1.0 excluding 1.0, as tiles that overlap fully never advance."
+                )
+            im = [x[y0:y1, x0:x1] for x in im for x0, y0, x1, y1 in self.get_tiles(x.shape[:2])]
+            self.tiles += len(im)
+        return super().preprocess(im)
+
+    def inference(self, im, *args, **kwargs):
+        """Runs inference, passing sliced inference tiles through the model in batches of at most `tile_batch`."""
+        if not self.args.tile or len(im) <= self.args.tile_batch:
+            return super().inference(im, *args, **kwargs)
+        inference = super().inference
+        preds = [inference(x, *args, **kwargs) for x in im.split(self.args.tile_batch)]
+        return torch.cat([p[0] if isinstance(p, (list, tuple)) else p for p in preds])
+
+    def compile_model(self, im, profiler):
+        """Compile the model for each `tile_batch` chunk shape of sliced inference tiles, or for `im` otherwise."""
+        for x in im.split(self.args.tile_batch) if self.args.tile else [im]:
+            super().compile_model(x, profiler)
+
     def postprocess(self, preds, img, orig_imgs):
         """Post-processes predictions and returns a list of Results objects."""
         preds = ops.non_max_suppression(
@@ -31,11 +71,46 @@ class DetectionPredictor(BasePredictor):
             classes=self.args.classes,
         )
 
+        tiled = self.args.tile and isinstance(orig_imgs, list)
         if not isinstance(orig_imgs, list):  # input images are a torch.Tensor, not a list
             orig_imgs = ops.convert_torch2numpy_batch(orig_imgs)
+        if tiled:
+            preds = self.merge_tiles(preds, img.shape[2:], orig_imgs)
 
         results = []
         for pred, orig_img, img_path in zip(preds, orig_imgs, self.batch[0]):
-            pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], orig_img.shape)
+            if not tiled:
+                pred[:, :4] = ops.scale_boxes(img.shape[2:], pred[:, :4], orig_img.shape)
             results.append(Results(orig_img, path=img_path, names=self.model.names, boxes=pred))
         return results
+
+    def merge_tiles(self, preds, shape, orig_imgs):
+        """
+        Merge per-tile detections of sliced inference into detections for each original image.
+
+        Tile boxes are scaled from the letterboxed tile to the tile crop, shifted by the tile offset and merged across
+        overlapping tile seams with NMS.
+
+        Args:
+            preds (List[torch.Tensor]): (n, 6) detections for each tile, in tile order.
+            shape (Tuple[int, int]): Letterboxed tile shape (h, w).
+            orig_imgs (List[np.ndarray]): Original images the tiles were cut from.
+
+        Returns:
+            (List[torch.Tensor]): (n, 6) merged detections in original image coordinates for each image.
+        """
+        merged, i = [], 0
+        for orig_img in orig_imgs:
+            h, w = orig_img.shape[:2]
+            boxes = []
+            for x0, y0, x1, y1 in self.get_tiles((h, w)):
+                pred = preds[i]
+                i += 1
+                pred[:, :4] = ops.scale_boxes(shape, pred[:, :4], (min(y1, h) - y0, min(x1, w) - x0))
+                pred[:, :4] += pred.new_tensor([x0, y0, x0, y0])
+                boxes.append(pred)
+            pred = torch.cat(boxes)
+            c = torch.zeros_like(pred[:, 5]) if self.args.agnostic_nms else pred[:, 5]  # classes
+            keep = torchvision.ops.batched_nms(pred[:, :4], pred[:, 4], c, self.args.iou)
+            merged.append(pred[keep[: self.args.max_det]])
+        return merged
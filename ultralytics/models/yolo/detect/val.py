@@ -10,7 +10,7 @@ from ultralytics.data import build_dataloader, build_yolo_dataset, converter
 from ultralytics.engine.validator import BaseValidator
 from ultralytics.utils import LOGGER, ops
 from ultralytics.utils.checks import check_requirements
-from ultralytics.utils.metrics import ConfusionMatrix, DetMetrics, box_iou
+from ultralytics.utils.metrics import APHistogram, ConfusionMatrix, DetMetrics, box_iou
 from ultralytics.utils.plotting import output_to_target, plot_images
 
 
@@ -84,6 +84,7 @@ class DetectionValidator(BaseValidator):
         self.seen = 0
         self.jdict = []
         self.stats = dict(tp=[], conf=[], pred_cls=[], target_cls=[], target_img=[])
+        self.histogram = APHistogram(self.nc, self.args.map_bins, self.device) if self.args.map_bins else None
 
     def get_desc(self):
         """Return a formatted string summarizing class metrics of YOLO model."""
@@ -139,8 +140,7 @@ class DetectionValidator(BaseValidator):
             stat["target_img"] = cls.unique()
             if npr == 0:
                 if nl:
-                    for k in self.stats.keys():
-                        self.stats[k].append(stat[k])
+                    self.update_stats(stat)
                     if self.args.plots:
                         self.confusion_matrix.process_batch(detections=None, gt_bboxes=bbox, gt_cls=cls)
                 continue
@@ -157,8 +157,7 @@ class DetectionValidator(BaseValidator):
                 stat["tp"] = self._process_batch(predn, bbox, cls)
             if self.args.plots:
                 self.confusion_matrix.process_batch(predn, bbox, cls)
-            for k in self.stats.keys():
-                self.stats[k].append(stat[k])
+            self.update_stats(stat)
 
             # Save
             if self.args.save_json:
@@ -171,6 +170,14 @@ class DetectionValidator(BaseValidator):
                     self.save_dir / "labels" / f"{Path(batch['im_file'][si]).stem}.txt",
                 )
 
+    def update_stats(self, stat):
+        """Accumulate the statistics of one image, into confidence histograms if `map_bins` is set."""
+        if self.histogram is not None:
+            self.histogram.update(stat)
+        else:
+            for k in self.stats.keys():
+                self.stats[k].append(stat[k])
+
     def finalize_metrics(self, *args, **kwargs):
         """Set final values for metrics speed and confusion matrix."""
         self.metrics.speed = self.speed
@@ -178,11 +185,16 @@ class DetectionValidator(BaseValidator):
 
     def get_stats(self):
         """Returns metrics statistics and results dictionary."""
-        stats = {k: torch.cat(v, 0).cpu().numpy() for k, v in self.stats.items()}  # to numpy
-        self.nt_per_class = np.bincount(stats["target_cls"].astype(int), minlength=self.nc)
-        self.nt_per_image = np.bincount(stats["target_img"].astype(int), minlength=self.nc)
-        stats.pop("target_img", None)
-        if len(stats) and stats["tp"].any():
+        if self.histogram is not None:
+            stats = self.histogram.stats()
+            self.nt_per_class = self.histogram.nt_per_class.cpu().numpy()
+            self.nt_per_image = self.histogram.nt_per_image.cpu().numpy()
+        else:
+            stats = {k: torch.cat(v, 0).cpu().numpy() for k, v in self.stats.items()}  # to numpy
+            self.nt_per_class = np.bincount(stats["target_cls"].astype(int), minlength=self.nc)
+            self.nt_per_image = np.bincount(stats["target_img"].astype(int), minlength=self.nc)
+            stats.pop("target_img", None)
+        if len(stats) and stats.get("tp", np.zeros(0)).any():
             self.metrics.process(**stats)
         return self.metrics.results_dict
 
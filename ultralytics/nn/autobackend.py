@@ -3,6 +3,7 @@
 import ast
 import json
 import platform
+import time
 import zipfile
 from collections import OrderedDict, namedtuple
 from pathlib import Path
@@ -80,6 +81,8 @@ class AutoBackend(nn.Module):
     models across various platforms.
     """
 
+    MAX_COMPILED_SHAPES = 8  # torch.compile input shapes to cache before running new shapes uncompiled
+
     @torch.no_grad()
     def __init__(
         self,
@@ -91,6 +94,7 @@ class AutoBackend(nn.Module):
         batch=1,
         fuse=True,
         verbose=True,
+        compile_mode=False,
     ):
         """
         Initialize the AutoBackend for inference.
@@ -104,6 +108,8 @@ class AutoBackend(nn.Module):
             batch (int): Batch-size to assume for inference.
             fuse (bool): Fuse Conv2D + BatchNorm layers for optimization. Defaults to True.
             verbose (bool): Enable verbose logging. Defaults to True.
+            compile_mode (bool | str): Compile PyTorch models with torch.compile for each static input shape and dtype,
+                True or a torch.compile mode, i.e. 'reduce-overhead'. Defaults to False.
         """
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
@@ -498,6 +504,13 @@ class AutoBackend(nn.Module):
             for p in model.parameters():
                 p.requires_grad = False
 
+        # torch.compile
+        if compile_mode and not (pt and hasattr(torch, "compile")):
+            LOGGER.warning("WARNING ⚠️ 'compile=True' requires a PyTorch model and torch>=2.0, running uncompiled.")
+            compile_mode = False
+        compiled_forward, compiled = None, {}  # {(shape, dtype): compile time in s, None if compilation failed}
+        compile_full = False  # MAX_COMPILED_SHAPES reached, new shapes run uncompiled
+
         self.__dict__.update(locals())  # assign all variables to self
 
     def forward(self, im, augment=False, visualize=False, embed=None):
@@ -521,7 +534,10 @@ class AutoBackend(nn.Module):
 
         # PyTorch
         if self.pt or self.nn_module:
-            y = self.model(im, augment=augment, visualize=visualize, embed=embed)
+            if self.compile_mode and not (augment or visualize or embed) and self.compile_shape(im) is not None:
+                y = self.compiled_forward(im)
+            else:
+                y = self.model(im, augment=augment, visualize=visualize, embed=embed)
 
         # TorchScript
         elif self.jit:
@@ -715,6 +731,46 @@ class AutoBackend(nn.Module):
         """
         return torch.tensor(x).to(self.device) if isinstance(x, np.ndarray) else x
 
+    def compile_shape(self, im):
+        """
+        Compile the PyTorch model for the shape and dtype of `im` unless already compiled, running it once to do so.
+
+        Compiled graphs are cached per input shape and dtype. New shapes beyond MAX_COMPILED_SHAPES, i.e. dynamic input
+        sizes, and shapes that fail to compile run uncompiled.
+
+        Args:
+            im (torch.Tensor): Input image tensor of the shape and dtype to compile for.
+
+        Returns:
+            (float | None): Time spent compiling this shape in seconds, or None if the shape runs uncompiled.
+        """
+        if self.fp16 and im.dtype != torch.float16:
+            im = im.half()  # as in forward()
+        key = (tuple(im.shape), im.dtype)
+        if key in self.compiled:
+            return self.compiled[key]
+        if len(self.compiled) >= self.MAX_COMPILED_SHAPES:  # not cached, so dynamic shapes do not grow the cache
+            if not self.compile_full:
+                self.compile_full = True
+                LOGGER.warning(
+                    f"WARNING ⚠️ More than {self.MAX_COMPILED_SHAPES} input shapes for torch.compile, "
+                    "running new shapes uncompiled."
+                )
+            return None
+        t = time.perf_counter()
+        try:
+            if self.compiled_forward is None:  # compile forward() rather than the module to keep it unregistered
+                mode = self.compile_mode if isinstance(self.compile_mode, str) else None
+                self.compiled_forward = torch.compile(self.model.forward, mode=mode, dynamic=False)
+            self.compiled_forward(im)  # compile on first call
+            if self.device.type == "cuda":
+                torch.cuda.synchronize(self.device)
+            self.compiled[key] = time.perf_counter() - t
+        except Exception as e:
+            LOGGER.warning(f"WARNING ⚠️ torch.compile failed for input shape {key[0]}, running uncompiled: {e}")
+            self.compiled[key] = None
+        return self.compiled[key]
+
     def warmup(self, imgsz=(1, 3, 640, 640)):
         """
         Warm up the model by running one forward pass with a dummy input.
@@ -1158,21 +1158,46 @@ class TorchVision(nn.Module):
         return y
 
 import logging
+from functools import lru_cache
+
 logger = logging.getLogger(__name__)
 
 USE_FLASH_ATTN = False
+USE_SDPA = hasattr(F, "scaled_dot_product_attention")  # torch>=2.0
 try:
     import torch
     if torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8:  # Ampere or newer
         from flash_attn.flash_attn_interface import flash_attn_func
         USE_FLASH_ATTN = True
     else:
-        from torch.nn.functional import scaled_dot_product_attention as sdpa
         logger.warning("FlashAttention is not available on this device. Using scaled_dot_product_attention instead.")
 except Exception:
-    from torch.nn.functional import scaled_dot_product_attention as sdpa
     logger.warning("FlashAttention is not available on this device. Using scaled_dot_product_attention instead.")
 
+AATTN_BACKENDS = ("flash", "sdpa", "explicit")  # area-attention kernels, fastest first
+
+
+@lru_cache(maxsize=None)
+def select_attn_backend(device_type="cpu", dtype=torch.float32):
+    """
+    Select the fastest available AAttn backend for a device type and dtype.
+
+    Args:
+        device_type (str): Torch device type of the attention inputs, i.e. 'cpu', 'cuda' or 'mps'.
+        dtype (torch.dtype): Dtype of the attention inputs.
+
+    Returns:
+        (str): One of AATTN_BACKENDS. 'flash' requires flash_attn on an Ampere or newer GPU, 'sdpa' uses the fused
+            torch.nn.functional.scaled_dot_product_attention kernel (math, memory-efficient or flash picked by torch),
+            and 'explicit' materialises the full attention matrix as a reference implementation.
+    """
+    if device_type == "cuda" and USE_FLASH_ATTN:
+        return "flash"
+    if USE_SDPA and not (device_type == "cpu" and dtype == torch.float16):  # fp16 SDPA unsupported on older CPU torch
+        return "sdpa"
+    return "explicit"
+
+
 class AAttn(nn.Module):
     """
     Area-attention module with the requirement of flash attention.
@@ -1181,6 +1206,8 @@ class AAttn(nn.Module):
         dim (int): Number of hidden channels;
         num_heads (int): Number of heads into which the attention mechanism is divided;
         area (int, optional): Number of areas the feature map is divided. Defaults to 1.
+        backend (str | None): Attention kernel, one of AATTN_BACKENDS. None selects the fastest available kernel for
+            the input device and dtype.
 
     Methods:
         forward: Performs a forward process of input tensor and outputs a tensor after the execution of the area attention mechanism.
@@ -1212,7 +1239,7 @@ class AAttn(nn.Module):
         self.proj = Conv(all_head_dim, dim, 1, act=False)
 
         self.pe = Conv(all_head_dim, dim, 5, 1, 2, g=dim, act=False)
-
+        self.backend = None  # one of AATTN_BACKENDS, None selects per input device/dtype with select_attn_backend()
 
     def forward(self, x):
         """Processes the input tensor 'x' through the area-attention"""
@@ -1230,28 +1257,13 @@ class AAttn(nn.Module):
             B, N, _ = qk.shape
         q, k = qk.split([C, C], dim=2)
 
-        if x.is_cuda and USE_FLASH_ATTN:
-            q = q.view(B, N, self.num_heads, self.head_dim)
-            k = k.view(B, N, self.num_heads, self.head_dim)
-            v = v.view(B, N, self.num_heads, self.head_dim)
-
-            x = flash_attn_func(
-                q.contiguous().half(),
-                k.contiguous().half(),
-                v.contiguous().half()
-            ).to(q.dtype)
+        backend = getattr(self, "backend", None) or select_attn_backend(x.device.type, x.dtype)
+        if backend == "flash":
+            x = self._flash_attn(q, k, v)
+        elif backend == "sdpa":
+            x = self._sdpa_attn(q, k, v)
         else:
-            q = q.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
-            k = k.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
-            v = v.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
-
-            attn = (q.transpose(-2, -1) @ k) * (self.head_dim ** -0.5)
-            max_attn = attn.max(dim=-1, keepdim=True).values
-            exp_attn = torch.exp(attn - max_attn)
-            attn = exp_attn / exp_attn.sum(dim=-1, keepdim=True)
-            x = (v @ attn.transpose(-2, -1))
-
-            x = x.permute(0, 3, 1, 2)
+            x = self._explicit_attn(q, k, v)
 
         if self.area > 1:
             x = x.reshape(B // self.area, N * self.area, C)
@@ -1259,6 +1271,37 @@ class AAttn(nn.Module):
         x = x.reshape(B, H, W, C).permute(0, 3, 1, 2)
 
         return self.proj(x + pp)
+
+    def _flash_attn(self, q, k, v):
+        """Attention with flash_attn on (B, N, C) inputs, returning a (B, N, num_heads, head_dim) tensor."""
+        B, N, _ = q.shape
+        q = q.view(B, N, self.num_heads, self.head_dim)
+        k = k.view(B, N, self.num_heads, self.head_dim)
+        v = v.view(B, N, self.num_heads, self.head_dim)
+        return flash_attn_func(q.contiguous().half(), k.contiguous().half(), v.contiguous().half()).to(q.dtype)
+
+    def _sdpa_attn(self, q, k, v):
+        """Attention with the fused torch SDPA kernel on (B, N, C) inputs, returning (B, N, num_heads, head_dim)."""
+        B, N, _ = q.shape
+        q = q.view(B, N, self.num_heads, self.head_dim).transpose(1, 2)
+        k = k.view(B, N, self.num_heads, self.head_dim).transpose(1, 2)
+        v = v.view(B, N, self.num_heads, self.head_dim).transpose(1, 2)
+        return F.scaled_dot_product_attention(q, k, v).transpose(1, 2)
+
+    def _explicit_attn(self, q, k, v):
+        """Reference attention materialising the full (N, N) matrix, returning (B, N, num_heads, head_dim)."""
+        B, N, _ = q.shape
+        q = q.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
+        k = k.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
+        v = v.transpose(1, 2).view(B, self.num_heads, self.head_dim, N)
+
+        attn = (q.transpose(-2, -1) @ k) * (self.head_dim ** -0.5)
+        max_attn = attn.max(dim=-1, keepdim=True).values
+        exp_attn = torch.exp(attn - max_attn)
+        attn = exp_attn / exp_attn.sum(dim=-1, keepdim=True)
+        x = (v @ attn.transpose(-2, -1))
+
+        return x.permute(0, 3, 1, 2)
     
 
 class ABlock(nn.Module):
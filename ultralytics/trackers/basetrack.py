@@ -122,3 +122,122 @@ class BaseTrack:
     def reset_id():
         """Reset the global track ID counter to its initial value."""
         BaseTrack._count = 0
+
+
+class TrackStore:
+    """
+    Structure-of-arrays store of detections and tracks for vectorized Kalman filtering, motion compensation and
+    association.
+
+    Each row holds one detection or track. Trackers refer to rows by index, so predicting, warping or updating any set
+    of tracks is a single array operation instead of a loop over track objects. Capacity doubles when full and rows are
+    recycled once released.
+
+    Attributes:
+        mean (np.ndarray): (N, 8) Kalman filter state means.
+        covariance (np.ndarray): (N, 8, 8) Kalman filter state covariances.
+        tlwh (np.ndarray): (N, 4) float32 detection boxes in (top left x, top left y, width, height) format.
+        angle (np.ndarray): (N,) box angles for oriented boxes, NaN for axis-aligned boxes.
+        score (np.ndarray): (N,) detection confidences.
+        cls (np.ndarray): (N,) class labels.
+        idx (np.ndarray): (N,) index of the latest detection in the frame's results.
+        stream (np.ndarray): (N,) index of the video stream of each row.
+        state (np.ndarray): (N,) TrackState values.
+        track_id (np.ndarray): (N,) track IDs, 0 until activated.
+        activated (np.ndarray): (N,) whether tracks are confirmed.
+        frame_id (np.ndarray): (N,) frame of the latest update.
+        start_frame (np.ndarray): (N,) frame of activation.
+        tracklet_len (np.ndarray): (N,) number of consecutive updates since (re)activation.
+        curr_feat (np.ndarray | None): (N, D) latest appearance features, allocated when first set.
+        smooth_feat (np.ndarray | None): (N, D) exponentially smoothed appearance features.
+        has_feat (np.ndarray): (N,) whether rows hold features.
+        used (np.ndarray): (N,) whether rows hold a detection or track.
+
+    Methods:
+        alloc: Reserve rows with default values.
+        keep: Release all rows except the given ones.
+        set_features: Set appearance features of rows.
+
+    Examples:
+        >>> store = TrackStore()
+        >>> rows = store.alloc(3)
+        >>> store.tlwh[rows] = boxes
+        >>> store.keep(rows[:1])
+    """
+
+    columns = {  # name: (trailing shape, dtype, default)
+        "mean": ((8,), np.float64, 0),
+        "covariance": ((8, 8), np.float64, 0),
+        "tlwh": ((4,), np.float32, 0),
+        "angle": ((), np.float64, np.nan),
+        "score": ((), np.float32, 0),
+        "cls": ((), np.float32, 0),
+        "idx": ((), np.float64, 0),
+        "stream": ((), np.int64, 0),
+        "state": ((), np.int8, TrackState.New),
+        "track_id": ((), np.int64, 0),
+        "activated": ((), bool, False),
+        "frame_id": ((), np.int64, 0),
+        "start_frame": ((), np.int64, 0),
+        "tracklet_len": ((), np.int64, 0),
+        "has_feat": ((), bool, False),
+        "used": ((), bool, False),
+    }
+
+    def __init__(self, capacity=64):
+        """Preallocate all columns for `capacity` rows."""
+        for k, (shape, dtype, default) in self.columns.items():
+            setattr(self, k, np.full((capacity, *shape), default, dtype=dtype))
+        self.curr_feat = self.smooth_feat = None
+
+    def __len__(self):
+        """Return the number of rows in use."""
+        return int(self.used.sum())
+
+    @property
+    def capacity(self):
+        """Return the number of allocated rows."""
+        return len(self.used)
+
+    def _grow(self, capacity):
+        """Extend all columns to `capacity` rows, keeping existing contents."""
+        n = self.capacity
+        for k, (shape, dtype, default) in self.columns.items():
+            setattr(self, k, np.concatenate([getattr(self, k), np.full((capacity - n, *shape), default, dtype)]))
+        for k in "curr_feat", "smooth_feat":
+            if getattr(self, k) is not None:
+                v = getattr(self, k)
+                setattr(self, k, np.concatenate([v, np.zeros((capacity - n, v.shape[1]), v.dtype)]))
+
+    def alloc(self, n):
+        """
+        Reserve `n` free rows, growing the store if needed, and reset them to default values.
+
+        Args:
+            n (int): Number of rows.
+
+        Returns:
+            (np.ndarray): Indices of the reserved rows in ascending order.
+        """
+        free = np.flatnonzero(~self.used)
+        if len(free) < n:
+            self._grow(max(2 * self.capacity, self.capacity + n - len(free)))
+            free = np.flatnonzero(~self.used)
+        rows = free[:n]
+        for k, (_, _, default) in self.columns.items():
+            getattr(self, k)[rows] = default
+        self.used[rows] = True
+        return rows
+
+    def keep(self, rows):
+        """Release all rows except `rows`, making them available to alloc()."""
+        self.used[:] = False
+        self.used[rows] = True
+
+    def set_features(self, rows, feats):
+        """Set the current appearance features of rows, allocating the feature columns on first use."""
+        if self.curr_feat is None:
+            self.curr_feat = np.zeros((self.capacity, feats.shape[1]), dtype=np.float32)
+            self.smooth_feat = np.zeros_like(self.curr_feat)
+        self.curr_feat[rows] = feats
+        self.has_feat[rows] = True
@@ -9,6 +9,7 @@ from .byte_tracker import BYTETracker, STrack
 from .utils import matching
 from .utils.gmc import GMC
 from .utils.kalman_filter import KalmanFilterXYWH
+from .utils.reid import ReID
 
 
 class BOTrack(STrack):
@@ -151,15 +152,21 @@ class BOTSORT(BYTETracker):
     Attributes:
         proximity_thresh (float): Threshold for spatial proximity (IoU) between tracks and detections.
         appearance_thresh (float): Threshold for appearance similarity (ReID embeddings) between tracks and detections.
-        encoder (Any): Object to handle ReID embeddings, set to None if ReID is not enabled.
-        gmc (GMC): An instance of the GMC algorithm for data association.
+        encoder (ReID | None): Appearance encoder embedding detection crops, None if ReID is not enabled.
+        alpha (float): Smoothing factor for the exponential moving average of track features.
+        gmc (List[GMC]): Instances of the GMC algorithm for data association, one per stream.
         args (Any): Parsed command-line arguments containing tracking parameters.
 
     Methods:
         get_kalmanfilter(): Returns an instance of KalmanFilterXYWH for object tracking.
-        init_track(dets, scores, cls, img): Initialize track with detections, scores, and classes.
+        get_features(img, dets, keep, feats=None): Embed a frame's detections in one batch, if ReID is enabled.
         get_dists(tracks, detections): Get distances between tracks and detections using IoU and (optionally) ReID.
+        pair_dists(tracks, detections, iou): Get distances of aligned track and detection pairs as get_dists() does.
+        gate(thresh): Get the IoU distance below which pairs may be matched, widened by ReID to proximity_thresh.
         multi_predict(tracks): Predict and track multiple objects with YOLOv8 model.
+        update_tracks(tracks, detections): Correct tracks and smooth their ReID features.
+        get_gmc(stream, img, dets): Estimate camera motion of a stream's frame.
+        reset(stream=None): Reset all streams or one stream.
 
     Examples:
         Initialize BOTSORT and process detections
@@ -167,6 +174,11 @@ class BOTSORT(BYTETracker):
         >>> bot_sort.init_track(dets, scores, cls, img)
         >>> bot_sort.multi_predict(tracks)
 
+        Track with appearance features of a tiny CNN, or pooled from the detector when tracking with model.track()
+        >>> args.with_reid, args.model = True, "auto"
+        >>> bot_sort = BOTSORT(args, frame_rate=30)
+        >>> tracks = bot_sort.update(results, img)
+
     Note:
         The class is designed to work with the YOLOv8 object detection model and supports ReID only if enabled via args.
     """
@@ -177,7 +189,7 @@ class BOTSORT(BYTETracker):
 
         Args:
             args (object): Parsed command-line arguments containing tracking parameters.
-            frame_rate (int): Frame rate of the video being processed.
+            frame_rate (int | List[float]): Frame rate of the video being processed, or of each stream.
 
         Examples:
             Initialize BOTSORT with command-line arguments and a specified frame rate:
@@ -189,45 +201,121 @@ class BOTSORT(BYTETracker):
         self.proximity_thresh = args.proximity_thresh
         self.appearance_thresh = args.appearance_thresh
 
-        if args.with_reid:
-            # Haven't supported BoT-SORT(reid) yet
-            self.encoder = None
-        self.gmc = GMC(method=args.gmc_method)
+        self.encoder = ReID(getattr(args, "model", "auto")) if args.with_reid else None
+        self.alpha = 0.9  # feature smoothing factor
+        self.gmc = [
+            GMC(args.gmc_method, max_size=getattr(args, "gmc_size", None), min_motion=getattr(args, "gmc_motion", 0.0))
+            for _ in range(self.streams)
+        ]  # one per stream
 
     def get_kalmanfilter(self):
         """Returns an instance of KalmanFilterXYWH for predicting and updating object states in the tracking process."""
         return KalmanFilterXYWH()
 
-    def init_track(self, dets, scores, cls, img=None):
-        """Initialize object tracks using detection bounding boxes, scores, class labels, and optional ReID features."""
-        if len(dets) == 0:
-            return []
-        if self.args.with_reid and self.encoder is not None:
-            features_keep = self.encoder.inference(img, dets)
-            return [BOTrack(xyxy, s, c, f) for (xyxy, s, c, f) in zip(dets, scores, cls, features_keep)]  # detections
-        else:
-            return [BOTrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)]  # detections
+    def get_features(self, img, dets, keep, feats=None):
+        """
+        Returns L2-normalized ReID features of a frame's detections, embedding the `keep` rows in one batch.
+
+        Args:
+            img (np.ndarray | None): BGR frame, used when `feats` are not given.
+            dets (np.ndarray): (N, 5+) detections as (x, y, w, h, [a], idx).
+            keep (np.ndarray): (N,) mask of the detections used for association.
+            feats (np.ndarray, optional): (N, D) precomputed features, i.e. pooled from the detector's neck.
+
+        Returns:
+            (np.ndarray | None): (N, D) features, None if ReID is disabled or no features are available.
+        """
+        if not self.args.with_reid:
+            return None
+        if feats is not None:
+            feats = np.asarray(feats, dtype=np.float32)
+            return feats / np.maximum(np.linalg.norm(feats, axis=1, keepdims=True), 1e-12)
+        if img is None or not keep.any():
+            return None
+        embeddings = self.encoder(img, dets[keep])
+        feats = np.zeros((len(dets), embeddings.shape[1]), dtype=np.float32)
+        feats[keep] = embeddings
+        return feats
 
     def get_dists(self, tracks, detections):
         """Calculates distances between tracks and detections using IoU and optionally ReID embeddings."""
-        dists = matching.iou_distance(tracks, detections)
+        store = self.store
+        dists = matching.iou_distance(self.track_boxes(tracks), self.det_boxes(detections))
         dists_mask = dists > self.proximity_thresh
 
         if self.args.fuse_score:
-            dists = matching.fuse_score(dists, detections)
+            dists = matching.fuse_score(dists, store.score[detections])
 
-        if self.args.with_reid and self.encoder is not None:
-            emb_dists = matching.embedding_distance(tracks, detections) / 2.0
+        if self.args.with_reid and store.curr_feat is not None:
+            emb_dists = matching.embedding_distance(store.smooth_feat[tracks], store.curr_feat[detections]) / 2.0
             emb_dists[emb_dists > self.appearance_thresh] = 1.0
             emb_dists[dists_mask] = 1.0
+            emb_dists[~store.has_feat[tracks]] = 1.0  # rows stored without features
+            emb_dists[:, ~store.has_feat[detections]] = 1.0
+            dists = np.minimum(dists, emb_dists)
+        return dists
+
+    def pair_dists(self, tracks, detections, iou):
+        """Calculates the get_dists() distance of aligned track and detection rows from their IoU distances."""
+        store = self.store
+        dists = super().pair_dists(tracks, detections, iou)
+        if self.args.with_reid and store.curr_feat is not None:
+            a, b = store.smooth_feat[tracks].astype(np.float64), store.curr_feat[detections].astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):  # rows without features are masked below
+                emb_dists = 1 - (a * b).sum(1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+            emb_dists = np.maximum(0.0, emb_dists) / 2.0  # cosine distance as in matching.embedding_distance()
+            emb_dists[emb_dists > self.appearance_thresh] = 1.0
+            emb_dists[iou > self.proximity_thresh] = 1.0
+            emb_dists[~(store.has_feat[tracks] & store.has_feat[detections])] = 1.0
             dists = np.minimum(dists, emb_dists)
         return dists
 
+    def gate(self, thresh):
+        """Returns an IoU distance such that pairs at or above it cost at least `thresh` in get_dists()."""
+        if self.args.with_reid and self.store.curr_feat is not None:  # appearance matches within proximity_thresh
+            thresh = max(thresh, self.proximity_thresh)
+        return super().gate(thresh)
+
     def multi_predict(self, tracks):
         """Predicts the mean and covariance of multiple object tracks using a shared Kalman filter."""
-        BOTrack.multi_predict(tracks)
+        if len(tracks) == 0:
+            return
+        store = self.store
+        mean = store.mean[tracks]
+        mean[store.state[tracks] != TrackState.Tracked, 6:8] = 0
+        store.mean[tracks], store.covariance[tracks] = self.kalman_filter.multi_predict(mean, store.covariance[tracks])
+
+    def update_tracks(self, tracks, detections):
+        """Corrects matched tracks with their detections, smoothing features with an exponential moving average."""
+        store = self.store
+        if len(tracks) and store.curr_feat is not None:
+            i = store.has_feat[detections]
+            t, feat = tracks[i], store.curr_feat[detections[i]]
+            smooth = self.alpha * store.smooth_feat[t] + (1 - self.alpha) * feat
+            smooth = np.where(store.has_feat[t, None], smooth, feat)
+            store.smooth_feat[t] = smooth / np.linalg.norm(smooth, axis=1, keepdims=True)
+            store.curr_feat[t] = feat
+            store.has_feat[t] = True
+        super().update_tracks(tracks, detections)
+
+    def convert_coords(self, tlwh):
+        """Convert (N, 4) top-left-width-height boxes to the x-y-width-height measurements of the Kalman filter."""
+        ret = tlwh.copy()
+        ret[:, :2] += ret[:, 2:] / 2
+        return ret
+
+    def mean_to_tlwh(self, mean):
+        """Convert (N, 8) Kalman filter states to top-left-width-height boxes."""
+        ret = mean[:, :4].copy()
+        ret[:, :2] -= ret[:, 2:] / 2
+        return ret
+
+    def get_gmc(self, stream, img, dets):
+        """Returns the global motion compensation matrix of a stream's frame, or None without a frame."""
+        return None if img is None else self.gmc[stream].apply(img, dets)
 
-    def reset(self):
-        """Resets the BOTSORT tracker to its initial state, clearing all tracked objects and internal states."""
-        super().reset()
-        self.gmc.reset_params()
+    def reset(self, stream=None):
+        """Resets the BOTSORT tracker, or one of its streams, to its initial state, clearing tracks and GMC state."""
+        super().reset(stream)
+        for gmc in self.gmc if stream is None else [self.gmc[stream]]:
+            gmc.reset_params()
@@ -4,7 +4,7 @@ import numpy as np
 
 from ..utils import LOGGER
 from ..utils.ops import xywh2ltwh
-from .basetrack import BaseTrack, TrackState
+from .basetrack import BaseTrack, TrackState, TrackStore
 from .utils import matching
 from .utils.kalman_filter import KalmanFilterXYAH
 
@@ -240,31 +240,56 @@ class BYTETracker:
     It maintains the state of tracked, lost, and removed tracks over frames, utilizes Kalman filtering for predicting
     the new object locations, and performs data association.
 
+    Detections and tracks are rows of a TrackStore, and the tracked and lost track lists are arrays of row indices, so
+    Kalman prediction and correction, motion compensation and list bookkeeping are vectorized over all tracks. One
+    tracker can follow several video streams: update_streams() advances every stream by one frame with batched Kalman
+    filtering, while association, track IDs, frame counters and resets stay separate per stream.
+
+    In crowded frames association is spatially gated: a grid finds the overlapping track and detection boxes, only
+    their costs are computed and the sparse assignment gives the same matches as the dense cost matrix would.
+
     Attributes:
-        tracked_stracks (List[STrack]): List of successfully activated tracks.
-        lost_stracks (List[STrack]): List of lost tracks.
-        removed_stracks (List[STrack]): List of removed tracks.
-        frame_id (int): The current frame ID.
+        store (TrackStore): Structure-of-arrays storage of detection and track states.
+        tracked (np.ndarray): Rows of tracked tracks, confirmed or not.
+        lost (np.ndarray): Rows of lost tracks.
+        removed (np.ndarray): Keys of the most recently removed tracks, see keys().
+        streams (int): Number of streams.
+        frame_id (np.ndarray): The current frame ID of each stream.
+        track_count (np.ndarray): The last track ID assigned in each stream.
         args (Namespace): Command-line arguments.
-        max_time_lost (int): The maximum frames for a track to be considered as 'lost'.
+        max_time_lost (np.ndarray): The maximum frames for a track to be considered as 'lost' in each stream.
         kalman_filter (KalmanFilterXYAH): Kalman Filter object.
+        sparse_min (int): Number of track-detection pairs of a stream from which association is spatially gated.
 
     Methods:
-        update(results, img=None): Updates object tracker with new detections.
+        update(results, img=None, feats=None): Updates object tracker with new detections.
+        update_streams(results, imgs=None, streams=None, feats=None): Updates several streams with one frame each.
         get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
-        init_track(dets, scores, cls, img=None): Initialize object tracking with detections.
+        init_track(dets, scores, cls, img=None, feats=None): Store detections, returning their rows.
+        get_features(img, dets, keep, feats=None): Returns appearance features of detections, None for BYTETracker.
         get_dists(tracks, detections): Calculates the distance between tracks and detections.
+        pair_dists(tracks, detections, iou): Calculates the distance of aligned track and detection pairs.
+        gate(thresh): Returns the IoU distance below which pairs may cost less than a threshold.
+        associate(tracks, detections, thresh, iou_only=False): Matches tracks and detections of the same stream.
         multi_predict(tracks): Predicts the location of tracks.
+        multi_gmc(tracks, H): Warps track states with global motion compensation matrices.
+        activate(tracks): Starts new tracks from detection rows.
+        update_tracks(tracks, detections): Corrects tracks with their matched detections.
+        reset(stream=None): Resets all streams or one stream.
         reset_id(): Resets the ID counter of STrack.
-        joint_stracks(tlista, tlistb): Combines two lists of stracks.
-        sub_stracks(tlista, tlistb): Filters out the stracks present in the second list from the first list.
-        remove_duplicate_stracks(stracksa, stracksb): Removes duplicate stracks based on IoU.
+        joint_stracks(tlista, tlistb): Combines two arrays of track rows.
+        sub_stracks(tlista, tlistb): Filters out the tracks present in the second array from the first array.
+        remove_duplicate_stracks(stracksa, stracksb): Removes duplicate tracks based on IoU.
 
     Examples:
         Initialize BYTETracker and update with detection results
         >>> tracker = BYTETracker(args, frame_rate=30)
         >>> results = yolo_model.detect(image)
         >>> tracked_objects = tracker.update(results)
+
+        Track 3 cameras at their own frame rates in one batched tracker
+        >>> tracker = BYTETracker(args, frame_rate=[30, 25, 15])
+        >>> tracked_objects = tracker.update_streams([results0, results1, results2], [im0, im1, im2])
     """
 
     def __init__(self, args, frame_rate=30):
@@ -273,204 +298,413 @@ class BYTETracker:
 
         Args:
             args (Namespace): Command-line arguments containing tracking parameters.
-            frame_rate (int): Frame rate of the video sequence.
+            frame_rate (int | List[float]): Frame rate of the video sequence, or of each stream to track several
+                streams in one tracker.
 
         Examples:
             Initialize BYTETracker with command-line arguments and a frame rate of 30
             >>> args = Namespace(track_buffer=30)
             >>> tracker = BYTETracker(args, frame_rate=30)
         """
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
-        self.removed_stracks = []  # type: list[STrack]
-
-        self.frame_id = 0
+        frame_rate = np.atleast_1d(np.asarray(frame_rate, dtype=float))
+        self.streams = len(frame_rate)
+        self.store = TrackStore()
+        self.tracked = np.empty(0, dtype=int)
+        self.lost = np.empty(0, dtype=int)
+        self.removed = np.empty(0, dtype=np.int64)
+
+        self.frame_id = np.zeros(self.streams, dtype=int)
+        self.track_count = np.zeros(self.streams, dtype=int)
         self.args = args
-        self.max_time_lost = int(frame_rate / 30.0 * args.track_buffer)
+        self.max_time_lost = (frame_rate / 30.0 * args.track_buffer).astype(int)
         self.kalman_filter = self.get_kalmanfilter()
+        self.sparse_min = 256 * 256  # gated association is faster from about 256 tracks and detections
         self.reset_id()
 
-    def update(self, results, img=None):
+    def update(self, results, img=None, feats=None):
         """Updates the tracker with new detections and returns the current list of tracked objects."""
-        self.frame_id += 1
-        activated_stracks = []
-        refind_stracks = []
-        lost_stracks = []
-        removed_stracks = []
-
-        scores = results.conf
-        bboxes = results.xywhr if hasattr(results, "xywhr") else results.xywh
-        # Add index
-        bboxes = np.concatenate([bboxes, np.arange(len(bboxes)).reshape(-1, 1)], axis=-1)
-        cls = results.cls
-
-        remain_inds = scores >= self.args.track_high_thresh
-        inds_low = scores > self.args.track_low_thresh
-        inds_high = scores < self.args.track_high_thresh
-
-        inds_second = inds_low & inds_high
-        dets_second = bboxes[inds_second]
-        dets = bboxes[remain_inds]
-        scores_keep = scores[remain_inds]
-        scores_second = scores[inds_second]
-        cls_keep = cls[remain_inds]
-        cls_second = cls[inds_second]
-
-        detections = self.init_track(dets, scores_keep, cls_keep, img)
-        # Add newly detected tracklets to tracked_stracks
-        unconfirmed = []
-        tracked_stracks = []  # type: list[STrack]
-        for track in self.tracked_stracks:
-            if not track.is_activated:
-                unconfirmed.append(track)
-            else:
-                tracked_stracks.append(track)
+        return self.update_streams([results], [img], feats=None if feats is None else [feats])[0]
+
+    def update_streams(self, results, imgs=None, streams=None, feats=None):
+        """
+        Update several streams with one frame each, batching Kalman filtering and bookkeeping across streams.
+
+        Args:
+            results (List): Detections of each stream, i.e. Boxes or OBB results converted to numpy.
+            imgs (List[np.ndarray], optional): Frame of each stream, used for global motion compensation.
+            streams (List[int], optional): Distinct stream index of each result. Defaults to range(len(results)).
+            feats (List[np.ndarray], optional): (N, D) appearance features of each stream's detections, i.e. pooled
+                from the detector, computed from the frames by get_features() if not given.
+
+        Returns:
+            (List[np.ndarray]): Tracking results of each stream in the format of update().
+        """
+        streams = np.arange(len(results)) if streams is None else np.asarray(streams, dtype=int)
+        imgs = [None] * len(results) if imgs is None else imgs
+        feats = [None] * len(results) if feats is None else feats
+        store = self.store
+        self.frame_id[streams] += 1
+        detections, detections_second, warps = [], [], []
+        for stream, r, img, feat in zip(streams, results, imgs, feats):
+            scores = r.conf
+            bboxes = r.xywhr if hasattr(r, "xywhr") else r.xywh
+            # Add index
+            bboxes = np.concatenate([bboxes, np.arange(len(bboxes)).reshape(-1, 1)], axis=-1)
+            cls = r.cls
+
+            remain_inds = scores >= self.args.track_high_thresh
+            inds_low = scores > self.args.track_low_thresh
+            inds_high = scores < self.args.track_high_thresh
+
+            inds_second = inds_low & inds_high
+            dets = bboxes[remain_inds]
+            feat = self.get_features(img, bboxes, inds_low, feat)  # one batch for both associations
+            first, second = (None, None) if feat is None else (feat[remain_inds], feat[inds_second])
+            detections.append(self.init_track(dets, scores[remain_inds], cls[remain_inds], img, first))
+            detections_second.append(
+                self.init_track(bboxes[inds_second], scores[inds_second], cls[inds_second], img, second)
+            )
+            store.stream[detections[-1]] = store.stream[detections_second[-1]] = stream
+            warps.append(self.get_gmc(stream, img, dets))
+        detections, detections_second = np.concatenate(detections), np.concatenate(detections_second)
+
+        # Tracks of streams without a frame in this batch are left untouched
+        active = np.isin(store.stream[self.tracked], streams)
+        idle_tracked, tracked = self.tracked[~active], self.tracked[active]
+        active = np.isin(store.stream[self.lost], streams)
+        idle_lost, lost_stracks = self.lost[~active], self.lost[active]
+
+        # Add newly detected tracklets to tracked
+        confirmed = store.activated[tracked]
+        unconfirmed = tracked[~confirmed]
         # Step 2: First association, with high score detection boxes
-        strack_pool = self.joint_stracks(tracked_stracks, self.lost_stracks)
+        strack_pool = self.joint_stracks(tracked[confirmed], lost_stracks)
         # Predict the current location with KF
         self.multi_predict(strack_pool)
-        if hasattr(self, "gmc") and img is not None:
-            warp = self.gmc.apply(img, dets)
-            STrack.multi_gmc(strack_pool, warp)
-            STrack.multi_gmc(unconfirmed, warp)
-
-        dists = self.get_dists(strack_pool, detections)
-        matches, u_track, u_detection = matching.linear_assignment(dists, thresh=self.args.match_thresh)
-
-        for itracked, idet in matches:
-            track = strack_pool[itracked]
-            det = detections[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
+        if any(w is not None for w in warps):
+            index = np.zeros(self.streams, dtype=int)
+            index[streams] = np.arange(len(streams))
+            warps = np.stack([np.eye(2, 3) if w is None else w for w in warps])
+            rows = np.concatenate([strack_pool, unconfirmed])
+            self.multi_gmc(rows, warps[index[store.stream[rows]]])
+
+        matches, u_track, u_detection = self.associate(strack_pool, detections, thresh=self.args.match_thresh)
+        was_tracked = store.state[matches[:, 0]] == TrackState.Tracked
+        activated, refind = [matches[was_tracked, 0]], matches[~was_tracked, 0]
+        self.update_tracks(matches[:, 0], matches[:, 1])
+
         # Step 3: Second association, with low score detection boxes association the untrack to the low score detections
-        detections_second = self.init_track(dets_second, scores_second, cls_second, img)
-        r_tracked_stracks = [strack_pool[i] for i in u_track if strack_pool[i].state == TrackState.Tracked]
-        # TODO
-        dists = matching.iou_distance(r_tracked_stracks, detections_second)
-        matches, u_track, u_detection_second = matching.linear_assignment(dists, thresh=0.5)
-        for itracked, idet in matches:
-            track = r_tracked_stracks[itracked]
-            det = detections_second[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
-
-        for it in u_track:
-            track = r_tracked_stracks[it]
-            if track.state != TrackState.Lost:
-                track.mark_lost()
-                lost_stracks.append(track)
+        r_tracked = u_track[store.state[u_track] == TrackState.Tracked]
+        matches, u_track, _ = self.associate(r_tracked, detections_second, thresh=0.5, iou_only=True)
+        self.update_tracks(matches[:, 0], matches[:, 1])
+        activated.append(matches[:, 0])
+
+        lost = u_track[store.state[u_track] != TrackState.Lost]
+        store.state[lost] = TrackState.Lost
         # Deal with unconfirmed tracks, usually tracks with only one beginning frame
-        detections = [detections[i] for i in u_detection]
-        dists = self.get_dists(unconfirmed, detections)
-        matches, u_unconfirmed, u_detection = matching.linear_assignment(dists, thresh=0.7)
-        for itracked, idet in matches:
-            unconfirmed[itracked].update(detections[idet], self.frame_id)
-            activated_stracks.append(unconfirmed[itracked])
-        for it in u_unconfirmed:
-            track = unconfirmed[it]
-            track.mark_removed()
-            removed_stracks.append(track)
+        matches, removed, u_detection = self.associate(unconfirmed, u_detection, thresh=0.7)
+        self.update_tracks(matches[:, 0], matches[:, 1])
+        activated.append(matches[:, 0])
         # Step 4: Init new stracks
-        for inew in u_detection:
-            track = detections[inew]
-            if track.score < self.args.new_track_thresh:
-                continue
-            track.activate(self.kalman_filter, self.frame_id)
-            activated_stracks.append(track)
+        new = u_detection[store.score[u_detection] >= self.args.new_track_thresh]
+        self.activate(new)
+        activated.append(new)
         # Step 5: Update state
-        for track in self.lost_stracks:
-            if self.frame_id - track.end_frame > self.max_time_lost:
-                track.mark_removed()
-                removed_stracks.append(track)
-
-        self.tracked_stracks = [t for t in self.tracked_stracks if t.state == TrackState.Tracked]
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, activated_stracks)
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, refind_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.tracked_stracks)
-        self.lost_stracks.extend(lost_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.removed_stracks)
-        self.tracked_stracks, self.lost_stracks = self.remove_duplicate_stracks(self.tracked_stracks, self.lost_stracks)
-        self.removed_stracks.extend(removed_stracks)
-        if len(self.removed_stracks) > 1000:
-            self.removed_stracks = self.removed_stracks[-999:]  # clip remove stracks to 1000 maximum
-
-        return np.asarray([x.result for x in self.tracked_stracks if x.is_activated], dtype=np.float32)
+        stream = store.stream[lost_stracks]
+        timed_out = self.frame_id[stream] - store.frame_id[lost_stracks] > self.max_time_lost[stream]
+        removed = np.concatenate([removed, lost_stracks[timed_out]])
+        store.state[removed] = TrackState.Removed
+
+        tracked = tracked[store.state[tracked] == TrackState.Tracked]
+        tracked = self.joint_stracks(tracked, np.concatenate(activated))
+        tracked = self.joint_stracks(tracked, refind)
+        lost_stracks = self.sub_stracks(lost_stracks, tracked)
+        lost_stracks = np.concatenate([lost_stracks, lost])
+        lost_stracks = lost_stracks[~np.isin(self.keys(lost_stracks), self.removed)]
+        tracked, lost_stracks = self.remove_duplicate_stracks(tracked, lost_stracks)
+        self.removed = np.concatenate([self.removed, self.keys(removed)])
+        if len(self.removed) > 1000 * self.streams:
+            self.removed = self.removed[-(1000 * self.streams - 1) :]  # clip removed track keys to 1000 per stream
+        self.tracked = np.concatenate([idle_tracked, tracked])
+        self.lost = np.concatenate([idle_lost, lost_stracks])
+        store.keep(np.concatenate([self.tracked, self.lost]))  # release finished detections and tracks
+
+        tracked = tracked[store.activated[tracked]]
+        output, stream = self.results(tracked), store.stream[tracked]
+        return [output[stream == s] for s in streams]
 
     def get_kalmanfilter(self):
         """Returns a Kalman filter object for tracking bounding boxes using KalmanFilterXYAH."""
         return KalmanFilterXYAH()
 
-    def init_track(self, dets, scores, cls, img=None):
-        """Initializes object tracking with given detections, scores, and class labels using the STrack algorithm."""
-        return [STrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)] if len(dets) else []  # detections
+    def init_track(self, dets, scores, cls, img=None, feats=None):
+        """Stores (x, y, w, h, [a], idx) detections with scores, class labels and optional features, returning rows."""
+        rows = self.store.alloc(len(dets))
+        if len(dets):
+            self.store.tlwh[rows] = xywh2ltwh(dets[:, :4])
+            self.store.score[rows] = scores
+            self.store.cls[rows] = cls
+            self.store.idx[rows] = dets[:, -1]
+            if dets.shape[1] == 6:
+                self.store.angle[rows] = dets[:, 4]
+            if feats is not None:
+                self.store.set_features(rows, feats)
+                self.store.smooth_feat[rows] = feats
+        return rows
+
+    def get_features(self, img, dets, keep, feats=None):
+        """Returns (N, D) appearance features of a frame's detections, valid for `keep` rows, or None if unused."""
+        return None
+
+    def get_gmc(self, stream, img, dets):
+        """Returns the global motion compensation matrix of a stream's frame, or None if motion is not compensated."""
+        return None
+
+    def iou_dists(self, tracks, detections):
+        """Calculates the IoU distance between tracks and detections."""
+        return matching.iou_distance(self.track_boxes(tracks), self.det_boxes(detections))
 
     def get_dists(self, tracks, detections):
         """Calculates the distance between tracks and detections using IoU and optionally fuses scores."""
-        dists = matching.iou_distance(tracks, detections)
+        dists = self.iou_dists(tracks, detections)
         if self.args.fuse_score:
-            dists = matching.fuse_score(dists, detections)
+            dists = matching.fuse_score(dists, self.store.score[detections])
         return dists
 
+    def pair_dists(self, tracks, detections, iou):
+        """Calculates the get_dists() distance of aligned track and detection rows from their IoU distances."""
+        return 1 - (1 - iou) * self.store.score[detections] if self.args.fuse_score else iou
+
+    def gate(self, thresh):
+        """Returns an IoU distance such that pairs at or above it cost at least `thresh` in get_dists()."""
+        return thresh + 1e-6  # fused scores only raise the cost, margin for float32 rounding
+
+    @staticmethod
+    def iou_pairs(aboxes, bboxes, gate):
+        """Returns index pairs of xyxy boxes whose IoU distance is below `gate`, and their IoU distances."""
+        ia, ib = matching.overlap_candidates(aboxes, bboxes)
+        iou = matching.iou_distance_pairs(aboxes[ia], bboxes[ib])
+        keep = iou < gate
+        return ia[keep], ib[keep], iou[keep]
+
+    @staticmethod
+    def assign(dists, thresh):
+        """Run linear assignment, returning matches as an (K, 2) int array and unmatched indices as int arrays."""
+        matches, u_a, u_b = matching.linear_assignment(dists, thresh=thresh)
+        return np.asarray(matches, dtype=int).reshape(-1, 2), np.asarray(u_a, dtype=int), np.asarray(u_b, dtype=int)
+
+    def associate(self, tracks, detections, thresh, iou_only=False):
+        """
+        Match tracks to detections of the same stream.
+
+        The cost matrix is block-diagonal across streams, so each stream's block is computed and solved on its own,
+        which keeps assignment cost linear in the number of streams rather than cubic in the total number of objects.
+        Blocks of at least `sparse_min` axis-aligned pairs are gated: only pairs with an IoU distance below gate() can
+        cost less than `thresh`, so just their costs are computed and solved with matching.sparse_assignment().
+
+        Args:
+            tracks (np.ndarray): Track rows.
+            detections (np.ndarray): Detection rows.
+            thresh (float): Maximum cost of a match.
+            iou_only (bool): Use the IoU distance as cost instead of get_dists().
+
+        Returns:
+            matches (np.ndarray): (K, 2) matched track and detection rows.
+            u_track (np.ndarray): Unmatched track rows.
+            u_detection (np.ndarray): Unmatched detection rows.
+        """
+        dists = self.iou_dists if iou_only else self.get_dists
+        ts, ds = self.store.stream[tracks], self.store.stream[detections]
+        blocks = (
+            [(tracks, detections)]
+            if self.streams == 1
+            else [(tracks[ts == s], detections[ds == s]) for s in np.unique(np.concatenate([ts, ds]))]
+        )
+        matches, u_track, u_detection = [np.empty((0, 2), dtype=int)], [tracks[:0]], [detections[:0]]
+        for t, d in blocks:
+            gate = thresh + 1e-6 if iou_only else self.gate(thresh)
+            if len(t) * len(d) < self.sparse_min or gate >= 1 or not np.isnan(self.store.angle[d]).all():
+                m, ut, ud = self.assign(dists(t, d), thresh=thresh)
+            else:  # spatially gated, oriented boxes overlap everything under probiou and stay dense
+                ia, ib, iou = self.iou_pairs(self.track_boxes(t), self.det_boxes(d), gate)
+                costs = iou if iou_only else self.pair_dists(t[ia], d[ib], iou)
+                m, ut, ud = matching.sparse_assignment(ia, ib, costs, (len(t), len(d)), thresh)
+            matches.append(np.stack([t[m[:, 0]], d[m[:, 1]]], axis=1))
+            u_track.append(t[ut])
+            u_detection.append(d[ud])
+        return np.concatenate(matches), np.concatenate(u_track), np.concatenate(u_detection)
+
     def multi_predict(self, tracks):
         """Predict the next states for multiple tracks using Kalman filter."""
-        STrack.multi_predict(tracks)
+        if len(tracks) == 0:
+            return
+        store = self.store
+        mean = store.mean[tracks]
+        mean[store.state[tracks] != TrackState.Tracked, 7] = 0
+        store.mean[tracks], store.covariance[tracks] = self.kalman_filter.multi_predict(mean, store.covariance[tracks])
+
+    def multi_gmc(self, tracks, H=np.eye(2, 3)):
+        """Update track positions and covariances using one (2, 3) or per-track (N, 2, 3) homography matrices."""
+        if len(tracks) == 0:
+            return
+        store = self.store
+        H = np.broadcast_to(H, (len(tracks), 2, 3))
+        R8x8 = np.zeros((len(tracks), 8, 8))
+        for i in range(0, 8, 2):
+            R8x8[:, i : i + 2, i : i + 2] = H[:, :, :2]
+        mean = np.einsum("nij,nj->ni", R8x8, store.mean[tracks])
+        mean[:, :2] += H[:, :, 2]
+        store.mean[tracks] = mean
+        store.covariance[tracks] = R8x8 @ store.covariance[tracks] @ R8x8.transpose((0, 2, 1))
+
+    def activate(self, tracks):
+        """Start new tracks from detection rows, initializing their Kalman states and assigning per-stream IDs."""
+        if len(tracks) == 0:
+            return
+        store = self.store
+        stream = store.stream[tracks]
+        store.mean[tracks], store.covariance[tracks] = self.kalman_filter.multi_initiate(
+            self.convert_coords(store.tlwh[tracks])
+        )
+        order = np.argsort(stream, kind="stable")
+        counts = np.bincount(stream, minlength=self.streams)
+        rank = np.empty(len(tracks), dtype=int)
+        rank[order] = np.arange(len(tracks)) - np.repeat(np.cumsum(counts) - counts, counts)  # index within stream
+        store.track_id[tracks] = self.track_count[stream] + rank + 1
+        self.track_count += counts
+        store.tracklet_len[tracks] = 0
+        store.state[tracks] = TrackState.Tracked
+        store.activated[tracks] = self.frame_id[stream] == 1
+        store.frame_id[tracks] = self.frame_id[stream]
+        store.start_frame[tracks] = self.frame_id[stream]
+
+    def update_tracks(self, tracks, detections):
+        """
+        Correct matched tracks with their detections, reactivating lost tracks.
 
-    @staticmethod
-    def reset_id():
-        """Resets the ID counter for STrack instances to ensure unique track IDs across tracking sessions."""
-        STrack.reset_id()
+        Args:
+            tracks (np.ndarray): Rows of the matched tracks.
+            detections (np.ndarray): Rows of the matched detections, in the same order.
+        """
+        if len(tracks) == 0:
+            return
+        store = self.store
+        store.mean[tracks], store.covariance[tracks] = self.kalman_filter.multi_update(
+            store.mean[tracks], store.covariance[tracks], self.convert_coords(store.tlwh[detections])
+        )
+        store.tracklet_len[tracks] = np.where(
+            store.state[tracks] == TrackState.Tracked, store.tracklet_len[tracks] + 1, 0
+        )  # reactivated tracks restart
+        store.state[tracks] = TrackState.Tracked
+        store.activated[tracks] = True
+        store.frame_id[tracks] = self.frame_id[store.stream[tracks]]
+        for k in "score", "cls", "angle", "idx":
+            getattr(store, k)[tracks] = getattr(store, k)[detections]
 
-    def reset(self):
-        """Resets the tracker by clearing all tracked, lost, and removed tracks and reinitializing the Kalman filter."""
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
-        self.removed_stracks = []  # type: list[STrack]
-        self.frame_id = 0
-        self.kalman_filter = self.get_kalmanfilter()
-        self.reset_id()
+    def convert_coords(self, tlwh):
+        """Convert (N, 4) top-left-width-height boxes to the x-y-aspect-height measurements of the Kalman filter."""
+        ret = tlwh.copy()
+        ret[:, :2] += ret[:, 2:] / 2
+        ret[:, 2] /= ret[:, 3]
+        return ret
 
-    @staticmethod
-    def joint_stracks(tlista, tlistb):
-        """Combines two lists of STrack objects into a single list, ensuring no duplicates based on track IDs."""
-        exists = {}
-        res = []
-        for t in tlista:
-            exists[t.track_id] = 1
-            res.append(t)
-        for t in tlistb:
-            tid = t.track_id
-            if not exists.get(tid, 0):
-                exists[tid] = 1
-                res.append(t)
-        return res
+    def mean_to_tlwh(self, mean):
+        """Convert (N, 8) Kalman filter states to top-left-width-height boxes."""
+        ret = mean[:, :4].copy()
+        ret[:, 2] *= ret[:, 3]
+        ret[:, :2] -= ret[:, 2:] / 2
+        return ret
+
+    def track_boxes(self, tracks):
+        """Return the current xyxy boxes of tracks, or xywha boxes if they are oriented."""
+        return self._boxes(self.mean_to_tlwh(self.store.mean[tracks]), self.store.angle[tracks])
+
+    def det_boxes(self, detections):
+        """Return the xyxy boxes of detections, or xywha boxes if they are oriented."""
+        return self._boxes(self.store.tlwh[detections].copy(), self.store.angle[detections])
 
     @staticmethod
-    def sub_stracks(tlista, tlistb):
-        """Filters out the stracks present in the second list from the first list."""
-        track_ids_b = {t.track_id for t in tlistb}
-        return [t for t in tlista if t.track_id not in track_ids_b]
+    def _boxes(tlwh, angle):
+        """Convert tlwh boxes to xyxy, or to xywha if angles are given."""
+        if len(angle) and not np.isnan(angle).any():
+            tlwh[:, :2] += tlwh[:, 2:] / 2
+            return np.concatenate([tlwh, angle[:, None]], axis=1)
+        tlwh[:, 2:] += tlwh[:, :2]
+        return tlwh
+
+    def results(self, tracks):
+        """Returns (N, 7) xyxy or (N, 8) xywha tracking results with track ID, score, class and detection index."""
+        store = self.store
+        return np.concatenate(
+            [
+                self.track_boxes(tracks),
+                store.track_id[tracks, None],
+                store.score[tracks, None],
+                store.cls[tracks, None],
+                store.idx[tracks, None],
+            ],
+            axis=1,
+            dtype=np.float32,
+        )
 
     @staticmethod
-    def remove_duplicate_stracks(stracksa, stracksb):
-        """Removes duplicate stracks from two lists based on Intersection over Union (IoU) distance."""
-        pdist = matching.iou_distance(stracksa, stracksb)
-        pairs = np.where(pdist < 0.15)
-        dupa, dupb = [], []
-        for p, q in zip(*pairs):
-            timep = stracksa[p].frame_id - stracksa[p].start_frame
-            timeq = stracksb[q].frame_id - stracksb[q].start_frame
-            if timep > timeq:
-                dupb.append(q)
+    def reset_id():
+        """Resets the ID counter for STrack instances to ensure unique track IDs across tracking sessions."""
+        STrack.reset_id()
+
+    def reset(self, stream=None):
+        """
+        Resets the tracker by clearing tracked, lost, and removed tracks, their IDs and frame counters.
+
+        Args:
+            stream (int, optional): Reset only this stream, leaving the tracks of other streams untouched.
+        """
+        if stream is None:
+            self.store = TrackStore()
+            self.tracked = np.empty(0, dtype=int)
+            self.lost = np.empty(0, dtype=int)
+            self.removed = np.empty(0, dtype=np.int64)
+            self.frame_id[:] = 0
+            self.track_count[:] = 0
+            self.kalman_filter = self.get_kalmanfilter()
+            self.reset_id()
+            return
+        self.tracked = self.tracked[self.store.stream[self.tracked] != stream]
+        self.lost = self.lost[self.store.stream[self.lost] != stream]
+        self.removed = self.removed[self.removed >> 32 != stream]
+        self.frame_id[stream] = 0
+        self.track_count[stream] = 0
+        self.store.keep(np.concatenate([self.tracked, self.lost]))
+
+    def keys(self, tracks):
+        """Returns keys identifying tracks across streams, combining the stream index and the track ID."""
+        return self.store.stream[tracks].astype(np.int64) << 32 | self.store.track_id[tracks]
+
+    def joint_stracks(self, tlista, tlistb):
+        """Combines two arrays of track rows into one, keeping the first occurrence of each track."""
+        tracks = np.concatenate([tlista, tlistb])
+        _, first = np.unique(self.keys(tracks), return_index=True)
+        return tracks[np.sort(first)]
+
+    def sub_stracks(self, tlista, tlistb):
+        """Filters out the tracks present in the second array from the first array."""
+        return tlista[~np.isin(self.keys(tlista), self.keys(tlistb))]
+
+    def remove_duplicate_stracks(self, stracksa, stracksb):
+        """Removes duplicate tracks of the same stream from two arrays of rows based on IoU distance."""
+        store = self.store
+        keepa, keepb = np.ones(len(stracksa), dtype=bool), np.ones(len(stracksb), dtype=bool)
+        sa, sb = store.stream[stracksa], store.stream[stracksb]
+        for s in np.intersect1d(sa, sb):
+            ia, ib = np.flatnonzero(sa == s), np.flatnonzero(sb == s)
+            boxesa, boxesb = self.track_boxes(stracksa[ia]), self.track_boxes(stracksb[ib])
+            if len(ia) * len(ib) < self.sparse_min or boxesa.shape[1] != 4:
+                p, q = np.where(matching.iou_distance(boxesa, boxesb) < 0.15)
             else:
-                dupa.append(p)
-        resa = [t for i, t in enumerate(stracksa) if i not in dupa]
-        resb = [t for i, t in enumerate(stracksb) if i not in dupb]
-        return resa, resb
+                p, q, _ = self.iou_pairs(boxesa, boxesb, 0.15)
+            p, q = ia[p], ib[q]
+            timep = store.frame_id[stracksa[p]] - store.start_frame[stracksa[p]]
+            timeq = store.frame_id[stracksb[q]] - store.start_frame[stracksb[q]]
+            keepa[p[timep <= timeq]] = False
+            keepb[q[timep > timeq]] = False
+        return stracksa[keepa], stracksb[keepb]
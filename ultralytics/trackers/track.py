@@ -1,8 +1,10 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
+from collections import deque
 from functools import partial
 from pathlib import Path
 
+import numpy as np
 import torch
 
 from ultralytics.utils import IterableSimpleNamespace, yaml_load
@@ -10,6 +12,7 @@ from ultralytics.utils.checks import check_yaml
 
 from .bot_sort import BOTSORT
 from .byte_tracker import BYTETracker
+from .utils.reid import pool_boxes
 
 # A mapping of tracker types to corresponding tracker classes
 TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
@@ -31,6 +34,8 @@ def on_predict_start(predictor: object, persist: bool = False) -> None:
         >>> predictor = SomePredictorClass()
         >>> on_predict_start(predictor, persist=True)
     """
+    if getattr(predictor, "neck_feats", None):
+        predictor.neck_feats.clear()  # left over from an interrupted run
     if hasattr(predictor, "trackers") and persist:
         return
 
@@ -40,14 +45,83 @@ def on_predict_start(predictor: object, persist: bool = False) -> None:
     if cfg.tracker_type not in {"bytetrack", "botsort"}:
         raise AssertionError(f"Only 'bytetrack' and 'botsort' are supported for now, but got '{cfg.tracker_type}'")
 
-    trackers = []
-    for _ in range(predictor.dataset.bs):
-        tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30)
-        trackers.append(tracker)
-        if predictor.dataset.mode != "stream":  # only need one tracker for other modes.
-            break
-    predictor.trackers = trackers
+    dataset = predictor.dataset
+    frame_rate = 30
+    if dataset.mode == "stream":  # one batched tracker following every stream at its own frame rate
+        frame_rate = [fps / getattr(dataset, "vid_stride", 1) for fps in np.atleast_1d(dataset.fps)]
+    predictor.trackers = [TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)]
     predictor.vid_path = [None] * predictor.dataset.bs  # for determining when to reset tracker on new video
+    register_neck_hook(predictor, cfg)
+
+
+def register_neck_hook(predictor: object, cfg: IterableSimpleNamespace) -> None:
+    """
+    Capture the feature maps entering the detection head, so BOTSORT ReID pools them instead of embedding crops.
+
+    The hook is only registered for `with_reid` with `model: auto` on PyTorch detection models without sliced or
+    augmented inference. Other setups embed detection crops with the tracker's own ReID encoder. Exactly one entry is
+    queued per predictor inference call, holding the first head pass of the call, or None if the head did not run.
+    Passes outside inference calls, i.e. torch.compile warmup in AutoBackend.compile_shape(), are ignored.
+
+    Args:
+        predictor (object): The predictor object to capture features from.
+        cfg (IterableSimpleNamespace): Tracker configuration.
+    """
+    from ultralytics.nn.modules.head import Detect
+
+    for hook in getattr(predictor, "neck_hooks", None) or []:
+        hook.remove()
+    predictor.neck_hooks, predictor.neck_feats = [], None
+    model = predictor.model.model if getattr(predictor.model, "pt", False) else None
+    head = model.model[-1] if isinstance(getattr(model, "model", None), torch.nn.Sequential) else None
+    reid = cfg.tracker_type == "botsort" and cfg.with_reid and getattr(cfg, "model", "auto") == "auto"
+    if reid and isinstance(head, Detect) and not (predictor.args.tile or predictor.args.augment):
+        feats = deque()  # (feature maps, strides) or None of each inference call, consumed in order after postprocess
+        call = {"active": False, "feats": None}  # state of the running inference call
+
+        def start(m, args):
+            """Open an inference call."""
+            call.update(active=True, feats=None)
+
+        def capture(m, x):
+            """Keep the head inputs of the first head pass of the open inference call."""
+            if call["active"] and call["feats"] is None:
+                call["feats"] = (list(x[0]), m.stride)
+
+        def finish(m, args, output):
+            """Queue the captured head inputs of the inference call."""
+            if call["active"]:
+                feats.append(call["feats"])
+            call.update(active=False, feats=None)
+
+        predictor.neck_feats = feats
+        predictor.neck_hooks = [
+            predictor.model.register_forward_pre_hook(start),
+            head.register_forward_pre_hook(capture),
+            predictor.model.register_forward_hook(finish),
+        ]
+
+
+def on_predict_batch_start(predictor: object) -> None:
+    """
+    Start estimating camera motion of a batch's frames in BOTSORT's GMC worker threads, overlapping the detector.
+
+    Only used with `gmc_thread` in serial prediction. With `pipeline` this callback runs after inference, so there is
+    nothing to overlap and motion is estimated in postprocessing as usual. Detections of these frames are not known
+    yet, so the previous ones are masked instead. The GMC of a video keeps one prefetched frame, so batches of
+    consecutive video frames prefetch their first frame only.
+
+    Args:
+        predictor (object): The predictor object about to run the detector on its batch.
+    """
+    tracker = predictor.trackers[0]
+    serial = not predictor.args.pipeline or predictor.args.visualize
+    if serial and getattr(tracker, "gmc", None) and getattr(tracker.args, "gmc_thread", False):
+        if predictor.dataset.mode == "stream":
+            for gmc, im in zip(tracker.gmc, predictor.batch[1]):
+                gmc.prefetch(im)
+        else:
+            tracker.gmc[0].prefetch(predictor.batch[1][0])
 
 
 def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None:
@@ -67,24 +141,66 @@ def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None
 
     is_obb = predictor.args.task == "obb"
     is_stream = predictor.dataset.mode == "stream"
+    tracker = predictor.trackers[0]
+    gmc = getattr(tracker, "gmc", None)
+    predictor.gmc_latency = {}  # per-frame GMC latency in ms, added to the results' speed at the end of the batch
+    feats = [None] * len(im0s)
+    neck = predictor.neck_feats.popleft() if getattr(predictor, "neck_feats", None) else None
+    if neck is not None:  # ReID features pooled from the detector's neck
+        maps, strides = neck
+        boxes = [(r.obb if is_obb else r.boxes).xyxy for r in predictor.results]
+        if len(maps[0]) == len(im0s) and any(len(b) for b in boxes):
+            feats = pool_boxes(maps, strides, boxes, [im.shape[:2] for im in im0s])
+    dets = []
     for i in range(len(im0s)):
-        tracker = predictor.trackers[i if is_stream else 0]
         vid_path = predictor.save_dir / Path(path[i]).name
         if not persist and predictor.vid_path[i if is_stream else 0] != vid_path:
-            tracker.reset()
+            tracker.reset(i if is_stream else None)
             predictor.vid_path[i if is_stream else 0] = vid_path
 
         det = (predictor.results[i].obb if is_obb else predictor.results[i].boxes).cpu().numpy()
         if len(det) == 0:
             continue
-        tracks = tracker.update(det, im0s[i])
-        if len(tracks) == 0:
-            continue
-        idx = tracks[:, -1].astype(int)
-        predictor.results[i] = predictor.results[i][idx]
+        if is_stream:
+            dets.append((i, det))
+        else:  # consecutive frames of one video
+            update_results(predictor, i, tracker.update(det, im0s[i], feats[i]), is_obb)
+            if gmc:
+                predictor.gmc_latency[i] = gmc[0].latency
+    if dets:  # one batched update of all streams with detections
+        streams = [i for i, _ in dets]
+        tracks = tracker.update_streams(
+            [det for _, det in dets], [im0s[i] for i in streams], streams, [feats[i] for i in streams]
+        )
+        for i, t in zip(streams, tracks):
+            update_results(predictor, i, t, is_obb)
+            if gmc:
+                predictor.gmc_latency[i] = gmc[i].latency
+
+
+def on_predict_batch_end(predictor: object) -> None:
+    """Add the GMC latency of each tracked frame to the speed of its result as 'gmc', in milliseconds."""
+    for i, latency in getattr(predictor, "gmc_latency", {}).items():
+        predictor.results[i].speed["gmc"] = latency
+
+
+def update_results(predictor: object, i: int, tracks: np.ndarray, is_obb: bool = False) -> None:
+    """
+    Replace the boxes of a predictor result with their tracks.
+
+    Args:
+        predictor (object): The predictor object containing the predictions.
+        i (int): Index of the result in the batch.
+        tracks (np.ndarray): Tracking results in the format of BYTETracker.update().
+        is_obb (bool): Whether the results are oriented bounding boxes.
+    """
+    if len(tracks) == 0:
+        return
+    idx = tracks[:, -1].astype(int)
+    predictor.results[i] = predictor.results[i][idx]
 
-        update_args = {"obb" if is_obb else "boxes": torch.as_tensor(tracks[:, :-1])}
-        predictor.results[i].update(**update_args)
+    update_args = {"obb" if is_obb else "boxes": torch.as_tensor(tracks[:, :-1])}
+    predictor.results[i].update(**update_args)
 
 
 def register_tracker(model: object, persist: bool) -> None:
@@ -101,4 +217,6 @@ def register_tracker(model: object, persist: bool) -> None:
         >>> register_tracker(model, persist=True)
     """
     model.add_callback("on_predict_start", partial(on_predict_start, persist=persist))
+    model.add_callback("on_predict_batch_start", on_predict_batch_start)
     model.add_callback("on_predict_postprocess_end", partial(on_predict_postprocess_end, persist=persist))
+    model.add_callback("on_predict_batch_end", on_predict_batch_end)
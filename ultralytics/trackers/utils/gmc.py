@@ -1,6 +1,9 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
 import copy
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
@@ -15,20 +18,41 @@ class GMC:
     This class provides methods for tracking and detecting objects based on several tracking algorithms including ORB,
     SIFT, ECC, and Sparse Optical Flow. It also supports downscaling of frames for computational efficiency.
 
+    Frames are downscaled before grayscale conversion and detection boxes are masked out, so moving objects do not bias
+    the camera motion estimate. Sparse optical flow keeps tracking the previous frame's inlier keypoints and only
+    detects new ones when too few remain. With `min_motion`, a phase correlation probe keeps the last keyframe while the
+    camera moves less than `min_motion` pixels, returning the identity without re-estimating motion. prefetch() starts
+    estimating a frame's motion in a worker thread, i.e. while the detector runs on it. Only the last prefetched frame
+    is kept for apply() to match, the motion of earlier frames that were never applied is accumulated and added to the
+    next applied frame.
+
     Attributes:
         method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
         downscale (int): Factor by which to downscale the frames for processing.
+        max_size (int | None): Longest side of processed frames, larger frames are downscaled further.
+        min_motion (float): Camera motion in pixels below which the keyframe is kept, 0 to estimate every frame.
         prevFrame (np.ndarray): Stores the previous frame for tracking.
         prevKeyPoints (List): Stores the keypoints from the previous frame.
         prevDescriptors (np.ndarray): Stores the descriptors from the previous frame.
         initializedFirstFrame (bool): Flag to indicate if the first frame has been processed.
+        latency (float): Time in milliseconds spent estimating the motion of the last frame.
+        detections (np.ndarray | None): Detections of the last applied frame, masked in prefetched frames.
+        pending (tuple | None): Last prefetched raw frame and the future of its motion, until it is applied.
+        skipped_motion (np.ndarray | None): Motion of prefetched frames that were never applied, i.e. had no detections.
 
     Methods:
         __init__: Initializes a GMC object with the specified method and downscale factor.
         apply: Applies the chosen method to a raw frame and optionally uses provided detections.
+        prefetch: Starts estimating the motion of a raw frame in a worker thread.
+        skip_pending: Adds the motion of the pending prefetched frame to the skipped motion.
+        compose: Chains two affine motion compensation matrices.
+        estimate: Estimates the motion of a raw frame with the chosen method and measures its latency.
+        preprocess: Converts a raw frame to the downscaled grayscale frame and mask used for estimation.
+        keep_keyframe: Checks whether the camera moved less than `min_motion` since the keyframe.
         apply_ecc: Applies the ECC algorithm to a raw frame.
         apply_features: Applies feature-based methods like ORB or SIFT to a raw frame.
         apply_sparseoptflow: Applies the Sparse Optical Flow method to a raw frame.
+        detect_keypoints: Detects sparse optical flow keypoints outside masked regions.
         reset_params: Resets the internal parameters of the GMC object.
 
     Examples:
@@ -39,15 +63,24 @@ class GMC:
         >>> print(processed_frame)
         array([[1, 2, 3],
                [4, 5, 6]])
+
+        Estimate 4K camera motion at 960 pixels, one frame ahead in a worker thread
+        >>> gmc = GMC(method="sparseOptFlow", max_size=960, min_motion=1.0)
+        >>> gmc.prefetch(frame)  # before running the detector
+        >>> H = gmc.apply(frame, detections)  # waits for the prefetched estimate
     """
 
-    def __init__(self, method: str = "sparseOptFlow", downscale: int = 2) -> None:
+    def __init__(
+        self, method: str = "sparseOptFlow", downscale: int = 2, max_size: int = None, min_motion: float = 0.0
+    ) -> None:
         """
         Initialize a Generalized Motion Compensation (GMC) object with tracking method and downscale factor.
 
         Args:
             method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
             downscale (int): Downscale factor for processing frames.
+            max_size (int, optional): Longest side of processed frames, larger frames are downscaled further.
+            min_motion (float): Camera motion in pixels below which motion is not re-estimated, 0 to disable.
 
         Examples:
             Initialize a GMC object with the 'sparseOptFlow' method and a downscale factor of 2
@@ -57,6 +90,8 @@ class GMC:
 
         self.method = method
         self.downscale = max(1, downscale)
+        self.max_size = max_size
+        self.min_motion = min_motion
 
         if self.method == "orb":
             self.detector = cv2.FastFeatureDetector_create(20)
@@ -84,10 +119,11 @@ class GMC:
         else:
             raise ValueError(f"Error: Unknown GMC method:{method}")
 
-        self.prevFrame = None
-        self.prevKeyPoints = None
-        self.prevDescriptors = None
-        self.initializedFirstFrame = False
+        self.latency = 0.0
+        self.detections = None
+        self.executor = None  # worker thread, created by the first prefetch()
+        self.pending = None  # (raw frame, future) of the last prefetched frame
+        self.reset_params()
 
     def apply(self, raw_frame: np.array, detections: list = None) -> np.array:
         """
@@ -95,7 +131,8 @@ class GMC:
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
-            detections (List | None): List of detections to be used in the processing.
+            detections (np.ndarray | None): Detections of the frame to mask out, (N, 5) xywh and index or (N, 6) xywhr
+                and index as passed by BOTSORT.
 
         Returns:
             (np.ndarray): Processed frame with applied object detection.
@@ -107,21 +144,144 @@ class GMC:
             >>> print(processed_frame.shape)
             (480, 640, 3)
         """
-        if self.method in {"orb", "sift"}:
-            return self.apply_features(raw_frame, detections)
+        self.detections = detections
+        if self.pending is not None and self.pending[0] is raw_frame:
+            H, self.latency = self.pending[1].result()
+            self.pending = None
+        else:
+            self.skip_pending()
+            H, self.latency = self.estimate(raw_frame, detections)
+        skipped, self.skipped_motion = self.skipped_motion, None
+        return H if skipped is None else self.compose(H, skipped)
+
+    def prefetch(self, raw_frame: np.array) -> None:
+        """
+        Start estimating the motion of a raw frame in a worker thread, returned by the next apply() of the same frame.
+
+        Detections of the frame are not known yet, so the detections of the last applied frame are masked instead. A
+        previously prefetched frame that was not applied is waited for and its motion added to the skipped motion, so
+        at most one raw frame is held.
+
+        Args:
+            raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
+        """
+        if self.method is None:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix="gmc")
+        self.skip_pending()
+        self.pending = (raw_frame, self.executor.submit(self.estimate, raw_frame, self.detections))
+
+    def skip_pending(self) -> None:
+        """Wait for the pending prefetched frame, which is not applied, and add its motion to the skipped motion."""
+        if self.pending is None:
+            return
+        (_, future), self.pending = self.pending, None
+        H, self.latency = future.result()
+        self.skipped_motion = H if self.skipped_motion is None else self.compose(H, self.skipped_motion)
+
+    @staticmethod
+    def compose(H2: np.array, H1: np.array) -> np.array:
+        """Return the 2x3 affine transform applying H1 and then H2."""
+        return np.concatenate([H2[:, :2] @ H1[:, :2], H2[:, :2] @ H1[:, 2:] + H2[:, 2:]], axis=1)
+
+    def estimate(self, raw_frame: np.array, detections: np.array = None) -> tuple:
+        """Estimate the motion of a raw frame with the chosen method, returning it and its latency in milliseconds."""
+        t0 = time.perf_counter()
+        if self.method is None:
+            H = np.eye(2, 3)
+        elif self.keep_keyframe(raw_frame, detections):
+            H = np.eye(2, 3)
+        elif self.method in {"orb", "sift"}:
+            H = self.apply_features(raw_frame, detections)
         elif self.method == "ecc":
-            return self.apply_ecc(raw_frame)
-        elif self.method == "sparseOptFlow":
-            return self.apply_sparseoptflow(raw_frame)
+            H = self.apply_ecc(raw_frame, detections)
         else:
-            return np.eye(2, 3)
+            H = self.apply_sparseoptflow(raw_frame, detections)
+        self.cache = None  # release the raw frame
+        return H, (time.perf_counter() - t0) * 1000
 
-    def apply_ecc(self, raw_frame: np.array) -> np.array:
+    def preprocess(self, raw_frame: np.array, detections: np.array = None) -> tuple:
+        """
+        Convert a raw frame to the grayscale frame used for motion estimation and a mask of its static background.
+
+        Frames are resized before grayscale conversion, which is twice as fast on large frames as converting first.
+        The result is cached for the current estimate, so the keyframe probe and the estimation method share one
+        conversion.
+
+        Args:
+            raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
+            detections (np.ndarray | None): (N, 5) xywh and index or (N, 6) xywhr and index detections to mask out.
+
+        Returns:
+            frame (np.ndarray): Downscaled grayscale frame.
+            mask (np.ndarray): uint8 mask of the frame, 0 near its borders and inside detections.
+            scale (int): Downscale factor applied to the raw frame.
+        """
+        cache = self.cache
+        if cache is not None and cache[0] is raw_frame and cache[1] is detections:
+            return cache[2]
+        height, width = raw_frame.shape[:2]
+        scale = self.downscale
+        if self.max_size:
+            scale = max(scale, math.ceil(max(height, width) / self.max_size))
+        image = cv2.resize(raw_frame, (width // scale, height // scale)) if scale > 1 else raw_frame
+        frame = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image.copy()
+        height, width = frame.shape
+
+        mask = np.zeros_like(frame)
+        mask[int(0.02 * height) : int(0.98 * height), int(0.02 * width) : int(0.98 * width)] = 255
+        if detections is not None and len(detections):
+            dets = np.asarray(detections, dtype=np.float32)
+            xywh = dets[:, :4] / scale
+            if dets.shape[1] == 6:  # xywhr and index, mask the axis-aligned extent of rotated boxes
+                cos, sin = np.abs(np.cos(dets[:, 4])), np.abs(np.sin(dets[:, 4]))
+                xywh[:, 2:] = np.stack([xywh[:, 2] * cos + xywh[:, 3] * sin, xywh[:, 2] * sin + xywh[:, 3] * cos], 1)
+            x1y1 = (xywh[:, :2] - xywh[:, 2:] / 2).astype(np.int_).clip(0)
+            x2y2 = np.ceil(xywh[:, :2] + xywh[:, 2:] / 2).astype(np.int_).clip(0)
+            for (x1, y1), (x2, y2) in zip(x1y1, x2y2):
+                mask[y1:y2, x1:x2] = 0
+        self.cache = (raw_frame, detections, (frame, mask, scale))
+        return frame, mask, scale
+
+    def keep_keyframe(self, raw_frame: np.array, detections: np.array = None) -> bool:
+        """
+        Return True if the camera moved less than `min_motion` pixels since the keyframe, keeping the keyframe.
+
+        The translation since the keyframe is measured by phase correlation of half-size frames with detections filled
+        in by the mean intensity. The keyframe is also refreshed at least every 10 frames, as the probe does not see
+        rotation or zoom.
+
+        Args:
+            raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
+            detections (np.ndarray | None): Detections to mask out of the probe.
+
+        Returns:
+            (bool): Whether motion estimation may be skipped for this frame.
+        """
+        if not self.min_motion:
+            return False
+        frame, mask, scale = self.preprocess(raw_frame, detections)
+        probe = cv2.resize(frame, (frame.shape[1] // 2, frame.shape[0] // 2)).astype(np.float32)
+        probe[cv2.resize(mask, probe.shape[::-1], interpolation=cv2.INTER_NEAREST) == 0] = probe.mean()
+        key = self.keyProbe
+        if key is not None and key.shape == probe.shape and self.skipped < 10:
+            (dx, dy), _ = cv2.phaseCorrelate(key, probe, self.window)
+            if math.hypot(dx, dy) * 2 * scale < self.min_motion:
+                self.skipped += 1
+                return True
+        if key is None or key.shape != probe.shape:
+            self.window = cv2.createHanningWindow(probe.shape[::-1], cv2.CV_32F)
+        self.keyProbe, self.skipped = probe, 0
+        return False
+
+    def apply_ecc(self, raw_frame: np.array, detections: np.array = None) -> np.array:
         """
         Apply the ECC (Enhanced Correlation Coefficient) algorithm to a raw frame for motion compensation.
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
+            detections (np.ndarray | None): Detections to mask out.
 
         Returns:
             (np.ndarray): The processed frame with the applied ECC transformation.
@@ -133,14 +293,12 @@ class GMC:
             [[1. 0. 0.]
              [0. 1. 0.]]
         """
-        height, width, _ = raw_frame.shape
-        frame = cv2.cvtColor(raw_frame, cv2.COLOR_BGR2GRAY)
+        frame, mask, scale = self.preprocess(raw_frame, detections)
         H = np.eye(2, 3, dtype=np.float32)
 
-        # Downscale image
-        if self.downscale > 1.0:
+        # Smooth the downscaled image
+        if scale > 1:
             frame = cv2.GaussianBlur(frame, (3, 3), 1.5)
-            frame = cv2.resize(frame, (width // self.downscale, height // self.downscale))
 
         # Handle first frame
         if not self.initializedFirstFrame:
@@ -155,10 +313,14 @@ class GMC:
         # Run the ECC algorithm. The results are stored in warp_matrix.
         # (cc, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria)
         try:
-            (_, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria, None, 1)
+            (_, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria, mask, 1)
+            H[:, 2] *= scale  # translation of the downscaled frame to the raw frame
         except Exception as e:
             LOGGER.warning(f"WARNING: find transform failed. Set warp as identity {e}")
 
+        # Store to next iteration
+        self.prevFrame = frame.copy()
+
         return H
 
     def apply_features(self, raw_frame: np.array, detections: list = None) -> np.array:
@@ -167,7 +329,7 @@ class GMC:
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
-            detections (List | None): List of detections to be used in the processing.
+            detections (np.ndarray | None): Detections to mask out.
 
         Returns:
             (np.ndarray): Processed frame.
@@ -179,24 +341,11 @@ class GMC:
             >>> print(processed_frame.shape)
             (2, 3)
         """
-        height, width, _ = raw_frame.shape
-        frame = cv2.cvtColor(raw_frame, cv2.COLOR_BGR2GRAY)
+        frame, mask, scale = self.preprocess(raw_frame, detections)
+        height, width = frame.shape
         H = np.eye(2, 3)
 
-        # Downscale image
-        if self.downscale > 1.0:
-            frame = cv2.resize(frame, (width // self.downscale, height // self.downscale))
-            width = width // self.downscale
-            height = height // self.downscale
-
         # Find the keypoints
-        mask = np.zeros_like(frame)
-        mask[int(0.02 * height) : int(0.98 * height), int(0.02 * width) : int(0.98 * width)] = 255
-        if detections is not None:
-            for det in detections:
-                tlbr = (det[:4] / self.downscale).astype(np.int_)
-                mask[tlbr[1] : tlbr[3], tlbr[0] : tlbr[2]] = 0
-
         keypoints = self.detector.detect(frame, mask)
 
         # Compute the descriptors
@@ -291,9 +440,9 @@ class GMC:
             H, inliers = cv2.estimateAffinePartial2D(prevPoints, currPoints, cv2.RANSAC)
 
             # Handle downscale
-            if self.downscale > 1.0:
-                H[0, 2] *= self.downscale
-                H[1, 2] *= self.downscale
+            if scale > 1:
+                H[0, 2] *= scale
+                H[1, 2] *= scale
         else:
             LOGGER.warning("WARNING: not enough matching points")
 
@@ -304,12 +453,16 @@ class GMC:
 
         return H
 
-    def apply_sparseoptflow(self, raw_frame: np.array) -> np.array:
+    def apply_sparseoptflow(self, raw_frame: np.array, detections: np.array = None) -> np.array:
         """
         Apply Sparse Optical Flow method to a raw frame.
 
+        Keypoints are detected on the first frame and then tracked from frame to frame. Points that are RANSAC outliers
+        or fall inside detections are dropped, and new keypoints are only detected once fewer than half remain.
+
         Args:
             raw_frame (np.ndarray): The raw frame to be processed, with shape (H, W, C).
+            detections (np.ndarray | None): Detections to mask out.
 
         Returns:
             (np.ndarray): Processed frame with shape (2, 3).
@@ -321,57 +474,65 @@ class GMC:
             [[1. 0. 0.]
              [0. 1. 0.]]
         """
-        height, width, _ = raw_frame.shape
-        frame = cv2.cvtColor(raw_frame, cv2.COLOR_BGR2GRAY)
+        frame, mask, scale = self.preprocess(raw_frame, detections)
         H = np.eye(2, 3)
 
-        # Downscale image
-        if self.downscale > 1.0:
-            frame = cv2.resize(frame, (width // self.downscale, height // self.downscale))
-
-        # Find the keypoints
-        keypoints = cv2.goodFeaturesToTrack(frame, mask=None, **self.feature_params)
-
         # Handle first frame
-        if not self.initializedFirstFrame or self.prevKeyPoints is None:
+        if not self.initializedFirstFrame or self.prevKeyPoints is None or len(self.prevKeyPoints) == 0:
             self.prevFrame = frame.copy()
-            self.prevKeyPoints = copy.copy(keypoints)
+            self.prevKeyPoints = self.detect_keypoints(frame, mask)
             self.initializedFirstFrame = True
             return H
 
-        # Find correspondences
+        # Find correspondences, leave good correspondences only
         matchedKeypoints, status, _ = cv2.calcOpticalFlowPyrLK(self.prevFrame, frame, self.prevKeyPoints, None)
-
-        # Leave good correspondences only
-        prevPoints = []
-        currPoints = []
-
-        for i in range(len(status)):
-            if status[i]:
-                prevPoints.append(self.prevKeyPoints[i])
-                currPoints.append(matchedKeypoints[i])
-
-        prevPoints = np.array(prevPoints)
-        currPoints = np.array(currPoints)
+        status = status.ravel().astype(bool)
+        prevPoints, currPoints = self.prevKeyPoints[status], matchedKeypoints[status]
 
         # Find rigid matrix
-        if (prevPoints.shape[0] > 4) and (prevPoints.shape[0] == prevPoints.shape[0]):
-            H, _ = cv2.estimateAffinePartial2D(prevPoints, currPoints, cv2.RANSAC)
-
-            if self.downscale > 1.0:
-                H[0, 2] *= self.downscale
-                H[1, 2] *= self.downscale
+        keep = np.zeros(len(currPoints), dtype=bool)
+        if prevPoints.shape[0] > 4:
+            H, inliers = cv2.estimateAffinePartial2D(prevPoints, currPoints, cv2.RANSAC)
+            if H is None:
+                H = np.eye(2, 3)
+            else:
+                keep = inliers.ravel().astype(bool)
+
+            if scale > 1:
+                H[0, 2] *= scale
+                H[1, 2] *= scale
         else:
             LOGGER.warning("WARNING: not enough matching points")
 
+        # Track inlier keypoints on the background into the next frame, detect new ones when too few are left
+        x, y = currPoints[:, 0, 0].astype(np.int_), currPoints[:, 0, 1].astype(np.int_)
+        inside = (x >= 0) & (y >= 0) & (x < frame.shape[1]) & (y < frame.shape[0])
+        keep &= inside
+        keep[keep] = mask[y[keep], x[keep]] > 0
         self.prevFrame = frame.copy()
-        self.prevKeyPoints = copy.copy(keypoints)
+        if keep.sum() >= self.minKeyPoints:
+            self.prevKeyPoints = currPoints[keep]
+        else:
+            self.prevKeyPoints = self.detect_keypoints(frame, mask)
 
         return H
 
+    def detect_keypoints(self, frame: np.array, mask: np.array) -> np.array:
+        """Detect (N, 1, 2) optical flow keypoints in the unmasked region of a frame and set the refresh count."""
+        keypoints = cv2.goodFeaturesToTrack(frame, mask=mask, **self.feature_params)
+        keypoints = np.empty((0, 1, 2), dtype=np.float32) if keypoints is None else keypoints
+        self.minKeyPoints = max(len(keypoints) // 2, 5)
+        return keypoints
+
     def reset_params(self) -> None:
         """Reset the internal parameters including previous frame, keypoints, and descriptors."""
+        if self.pending is not None:  # finish the prefetched frame of the previous video before clearing its state
+            self.pending[1].result()
+        self.pending, self.skipped_motion = None, None
         self.prevFrame = None
         self.prevKeyPoints = None
         self.prevDescriptors = None
         self.initializedFirstFrame = False
+        self.minKeyPoints = 0
+        self.keyProbe, self.window, self.skipped = None, None, 0
+        self.cache = None
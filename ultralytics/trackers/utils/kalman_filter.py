@@ -25,6 +25,9 @@ class KalmanFilterXYAH:
         project: Projects the state distribution to measurement space.
         multi_predict: Runs the Kalman filter prediction step (vectorized version).
         update: Runs the Kalman filter correction step.
+        multi_initiate: Creates tracks from unassociated measurements (vectorized version).
+        multi_project: Projects state distributions to measurement space (vectorized version).
+        multi_update: Runs the Kalman filter correction step (vectorized version).
         gating_distance: Computes the gating distance between state distribution and measurements.
 
     Examples:
@@ -194,8 +197,7 @@ class KalmanFilterXYAH:
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = sqr[:, None] * np.eye(8)  # (N, 8, 8) diagonal matrices
 
         mean = np.dot(mean, self._motion_mat.T)
         left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
@@ -235,6 +237,87 @@ class KalmanFilterXYAH:
         new_covariance = covariance - np.linalg.multi_dot((kalman_gain, projected_cov, kalman_gain.T))
         return new_mean, new_covariance
 
+    def multi_initiate(self, measurement: np.ndarray) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional matrix of bounding boxes (x, y, a, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+                Unobserved velocities are initialized to 0 mean.
+
+        Examples:
+            >>> kf = KalmanFilterXYAH()
+            >>> mean, covariance = kf.multi_initiate(np.array([[100, 50, 1.5, 200], [10, 20, 0.5, 40]]))
+        """
+        mean = np.concatenate([measurement, np.zeros_like(measurement)], axis=1)
+        h = measurement[:, 3]
+        std = [
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * h,
+            1e-2 * np.ones_like(h),
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * h,
+            1e-5 * np.ones_like(h),
+            10 * self._std_weight_velocity * h,
+        ]
+        covariance = np.square(np.asarray(std, dtype=float)).T[:, None] * np.eye(8)
+        return mean, covariance
+
+    def multi_project(self, mean: np.ndarray, covariance: np.ndarray) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected means and Nx4x4 projected covariances.
+
+        Examples:
+            >>> kf = KalmanFilterXYAH()
+            >>> projected_mean, projected_cov = kf.multi_project(np.random.rand(5, 8), np.eye(8)[None].repeat(5, 0))
+        """
+        std = [
+            self._std_weight_position * mean[:, 3],
+            self._std_weight_position * mean[:, 3],
+            1e-1 * np.ones_like(mean[:, 3]),
+            self._std_weight_position * mean[:, 3],
+        ]
+        innovation_cov = np.square(std).T[:, None] * np.eye(4)
+
+        mean = np.dot(mean, self._update_mat.T)
+        covariance = self._update_mat @ covariance @ self._update_mat.T
+        return mean, covariance + innovation_cov
+
+    def multi_update(self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray) -> tuple:
+        """
+        Run Kalman filter correction step for multiple object states (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the predicted states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the predicted states.
+            measurement (ndarray): The Nx4 dimensional matrix of measurements in the filter's box format.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the measurement-corrected mean and covariance matrices.
+
+        Examples:
+            >>> kf = KalmanFilterXYAH()
+            >>> mean, covariance = kf.multi_initiate(np.array([[100, 50, 1.5, 200]]))
+            >>> new_mean, new_covariance = kf.multi_update(mean, covariance, np.array([[102, 51, 1.5, 198]]))
+        """
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+        kalman_gain = np.linalg.solve(projected_cov, self._update_mat @ covariance).transpose((0, 2, 1))
+        innovation = measurement - projected_mean
+        new_mean = mean + np.einsum("nij,nj->ni", kalman_gain, innovation)
+        new_covariance = covariance - kalman_gain @ projected_cov @ kalman_gain.transpose((0, 2, 1))
+        return new_mean, new_covariance
+
     def gating_distance(
         self,
         mean: np.ndarray,
@@ -307,6 +390,8 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
         project: Projects the state distribution to measurement space.
         multi_predict: Runs the Kalman filter prediction step in a vectorized manner.
         update: Runs the Kalman filter correction step.
+        multi_initiate: Creates tracks from unassociated measurements in a vectorized manner.
+        multi_project: Projects state distributions to measurement space in a vectorized manner.
 
     Examples:
         Create a Kalman filter and initialize a track
@@ -459,8 +544,7 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = sqr[:, None] * np.eye(8)  # (N, 8, 8) diagonal matrices
 
         mean = np.dot(mean, self._motion_mat.T)
         left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
@@ -489,3 +573,60 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
             >>> new_mean, new_covariance = kf.update(mean, covariance, measurement)
         """
         return super().update(mean, covariance, measurement)
+
+    def multi_initiate(self, measurement) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional matrix of bounding boxes (x, y, w, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+                Unobserved velocities are initialized to 0 mean.
+
+        Examples:
+            >>> kf = KalmanFilterXYWH()
+            >>> mean, covariance = kf.multi_initiate(np.array([[100, 50, 20, 40], [10, 20, 5, 10]]))
+        """
+        mean = np.concatenate([measurement, np.zeros_like(measurement)], axis=1)
+        w, h = measurement[:, 2], measurement[:, 3]
+        std = [
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+        ]
+        covariance = np.square(np.asarray(std, dtype=float)).T[:, None] * np.eye(8)
+        return mean, covariance
+
+    def multi_project(self, mean, covariance) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected means and Nx4x4 projected covariances.
+
+        Examples:
+            >>> kf = KalmanFilterXYWH()
+            >>> projected_mean, projected_cov = kf.multi_project(np.random.rand(5, 8), np.eye(8)[None].repeat(5, 0))
+        """
+        std = [
+            self._std_weight_position * mean[:, 2],
+            self._std_weight_position * mean[:, 3],
+            self._std_weight_position * mean[:, 2],
+            self._std_weight_position * mean[:, 3],
+        ]
+        innovation_cov = np.square(std).T[:, None] * np.eye(4)
+
+        mean = np.dot(mean, self._update_mat.T)
+        covariance = self._update_mat @ covariance @ self._update_mat.T
+        return mean, covariance + innovation_cov
@@ -2,6 +2,7 @@
 
 import numpy as np
 import scipy
+import scipy.sparse.csgraph
 from scipy.spatial.distance import cdist
 
 from ultralytics.utils.metrics import batch_probiou, bbox_ioa
@@ -43,7 +44,7 @@ def linear_assignment(cost_matrix: np.ndarray, thresh: float, use_lap: bool = Tr
         # Use lap.lapjv
         # https://github.com/gatagat/lap
         _, x, y = lap.lapjv(cost_matrix, extend_cost=True, cost_limit=thresh)
-        matches = [[ix, mx] for ix, mx in enumerate(x) if mx >= 0]
+        matches = np.stack([np.flatnonzero(x >= 0), x[x >= 0]], axis=1)
         unmatched_a = np.where(x < 0)[0]
         unmatched_b = np.where(y < 0)[0]
     else:
@@ -61,13 +62,139 @@ def linear_assignment(cost_matrix: np.ndarray, thresh: float, use_lap: bool = Tr
     return matches, unmatched_a, unmatched_b
 
 
+def sparse_assignment(ia: np.ndarray, ib: np.ndarray, costs: np.ndarray, shape: tuple, thresh: float) -> tuple:
+    """
+    Perform linear assignment over sparse cost entries, where absent pairs cost more than `thresh`.
+
+    Pairs costing `thresh` or more are never matched by linear_assignment(), so the bipartite graph of the remaining
+    pairs splits into independent connected components. Components with a single row or column match their cheapest
+    pair and the others are solved densely with lap.lapjv, giving the same matches as linear_assignment() on the full
+    matrix up to ties between equal costs.
+
+    Args:
+        ia (np.ndarray): (P,) row indices of the cost entries.
+        ib (np.ndarray): (P,) column indices of the cost entries.
+        costs (np.ndarray): (P,) cost entries.
+        shape (tuple): Shape (N, M) of the full cost matrix.
+        thresh (float): Threshold for considering an assignment valid.
+
+    Returns:
+        matched_indices (np.ndarray): Array of matched indices of shape (K, 2), sorted by row.
+        unmatched_a (np.ndarray): Array of unmatched row indices, with shape (L,).
+        unmatched_b (np.ndarray): Array of unmatched column indices, with shape (M,).
+
+    Examples:
+        >>> ia, ib, costs = np.array([0, 1, 1]), np.array([0, 0, 2]), np.array([0.2, 0.1, 0.3])
+        >>> matches, unmatched_a, unmatched_b = sparse_assignment(ia, ib, costs, shape=(3, 3), thresh=0.8)
+    """
+    n, m = shape
+    keep = costs < thresh
+    ia, ib, costs = ia[keep], ib[keep], costs[keep]
+    graph = scipy.sparse.coo_matrix((np.ones(len(ia)), (ia, n + ib)), shape=(n + m, n + m))
+    k, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+    la, lb = labels[:n], labels[n:]
+    na, nb = np.bincount(la, minlength=k), np.bincount(lb, minlength=k)
+
+    x = np.full(n, -1)
+    star = np.flatnonzero((na[la[ia]] == 1) | (nb[lb[ib]] == 1))  # pairs of components with one row or column
+    star = star[np.lexsort((costs[star], la[ia[star]]))]
+    star = star[np.diff(la[ia[star]], prepend=-1) != 0]  # cheapest pair of each component
+    x[ia[star]] = ib[star]
+    multi = (na > 1) & (nb > 1)
+    if multi.any():  # solve components with several rows or columns, grouping their nodes and entries
+        comps = np.flatnonzero(multi)
+        rows = np.flatnonzero(multi[la])
+        rows = np.split(rows[np.argsort(la[rows], kind="stable")], np.cumsum(na[comps])[:-1])
+        cols = np.flatnonzero(multi[lb])
+        cols = np.split(cols[np.argsort(lb[cols], kind="stable")], np.cumsum(nb[comps])[:-1])
+        entries = np.flatnonzero(multi[la[ia]])
+        splits = np.cumsum(np.bincount(la[ia], minlength=k)[comps])[:-1]
+        entries = np.split(entries[np.argsort(la[ia[entries]], kind="stable")], splits)
+        pos_a, pos_b = np.empty(n, dtype=int), np.empty(m, dtype=int)
+        for r, c, e in zip(rows, cols, entries):
+            pos_a[r], pos_b[c] = np.arange(len(r)), np.arange(len(c))
+            cost_matrix = np.full((len(r), len(c)), 2 * abs(thresh) + 1, dtype=costs.dtype)  # absent pairs
+            cost_matrix[pos_a[ia[e]], pos_b[ib[e]]] = costs[e]
+            matches = linear_assignment(cost_matrix, thresh)[0]
+            x[r[matches[:, 0]]] = c[matches[:, 1]]
+
+    y = np.full(m, -1)
+    y[x[x >= 0]] = np.flatnonzero(x >= 0)
+    return np.stack([np.flatnonzero(x >= 0), x[x >= 0]], axis=1), np.flatnonzero(x < 0), np.flatnonzero(y < 0)
+
+
+def overlap_candidates(aboxes: np.ndarray, bboxes: np.ndarray) -> tuple:
+    """
+    Find candidate pairs of overlapping boxes with a uniform grid instead of comparing every pair.
+
+    Grid cells are as large as the largest box, so the centers of two overlapping boxes lie in the same or in
+    neighboring cells. Every overlapping pair is returned, together with some nearby pairs that do not overlap.
+
+    Args:
+        aboxes (np.ndarray): (N, 4) boxes in xyxy format.
+        bboxes (np.ndarray): (M, 4) boxes in xyxy format.
+
+    Returns:
+        ia (np.ndarray): (P,) indices into `aboxes` of the candidate pairs.
+        ib (np.ndarray): (P,) indices into `bboxes` of the candidate pairs.
+
+    Examples:
+        >>> aboxes = np.array([[0, 0, 10, 10], [100, 100, 110, 110]])
+        >>> bboxes = np.array([[5, 5, 15, 15]])
+        >>> ia, ib = overlap_candidates(aboxes, bboxes)  # (array([0]), array([0]))
+    """
+    if len(aboxes) == 0 or len(bboxes) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    boxes = np.concatenate([aboxes, bboxes])
+    cell = np.maximum(np.nanmax(boxes[:, 2:] - boxes[:, :2], axis=0), 1e-3)
+    centers = np.nan_to_num((boxes[:, :2] + boxes[:, 2:]) / 2)
+    ij = ((centers - centers.min(0)) // cell).astype(np.int64) + 1  # cell indices from 1, neighbors from 0
+    ncols = ij[:, 1].max() + 2
+    keys = ij[:, 0] * ncols + ij[:, 1]
+    ka, kb = keys[: len(aboxes)], keys[len(aboxes) :]
+    order = np.argsort(kb, kind="stable")
+    kb = kb[order]
+    offsets = (np.arange(-1, 2)[:, None] * ncols + np.arange(-1, 2)).ravel()  # 3x3 neighborhood
+    query = (ka[:, None] + offsets).ravel()
+    lo, hi = np.searchsorted(kb, query, "left"), np.searchsorted(kb, query, "right")
+    counts = hi - lo
+    ia = np.repeat(np.arange(len(aboxes)).repeat(len(offsets)), counts)
+    ib = order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+    return ia, ib
+
+
+def iou_distance_pairs(aboxes: np.ndarray, bboxes: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU distance of aligned pairs of xyxy boxes, with the same values as iou_distance() would give.
+
+    Args:
+        aboxes (np.ndarray): (P, 4) boxes in xyxy format.
+        bboxes (np.ndarray): (P, 4) boxes in xyxy format.
+
+    Returns:
+        (np.ndarray): (P,) float32 cost of each pair, 1 - IoU.
+
+    Examples:
+        >>> aboxes = np.array([[0, 0, 10, 10], [20, 20, 30, 30]])
+        >>> bboxes = np.array([[5, 5, 15, 15], [20, 20, 30, 30]])
+        >>> costs = iou_distance_pairs(aboxes, bboxes)  # array([0.857, 0.0])
+    """
+    a, b = np.asarray(aboxes, dtype=np.float32), np.asarray(bboxes, dtype=np.float32)
+    inter = (np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])).clip(0) * (
+        np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    ).clip(0)
+    area = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    area = area + (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1]) - inter  # same operations as bbox_ioa(iou=True)
+    return 1 - inter / (area + 1e-7)
+
+
 def iou_distance(atracks: list, btracks: list) -> np.ndarray:
     """
     Compute cost based on Intersection over Union (IoU) between tracks.
 
     Args:
-        atracks (list[STrack] | list[np.ndarray]): List of tracks 'a' or bounding boxes.
-        btracks (list[STrack] | list[np.ndarray]): List of tracks 'b' or bounding boxes.
+        atracks (list[STrack] | list[np.ndarray] | np.ndarray): List of tracks 'a' or bounding boxes.
+        btracks (list[STrack] | list[np.ndarray] | np.ndarray): List of tracks 'b' or bounding boxes.
 
     Returns:
         (np.ndarray): Cost matrix computed based on IoU.
@@ -78,7 +205,7 @@ def iou_distance(atracks: list, btracks: list) -> np.ndarray:
         >>> btracks = [np.array([5, 5, 15, 15]), np.array([25, 25, 35, 35])]
         >>> cost_matrix = iou_distance(atracks, btracks)
     """
-    if atracks and isinstance(atracks[0], np.ndarray) or btracks and isinstance(btracks[0], np.ndarray):
+    if len(atracks) and isinstance(atracks[0], np.ndarray) or len(btracks) and isinstance(btracks[0], np.ndarray):
         atlbrs = atracks
         btlbrs = btracks
     else:
@@ -106,8 +233,10 @@ def embedding_distance(tracks: list, detections: list, metric: str = "cosine") -
     Compute distance between tracks and detections based on embeddings.
 
     Args:
-        tracks (list[STrack]): List of tracks, where each track contains embedding features.
-        detections (list[BaseTrack]): List of detections, where each detection contains embedding features.
+        tracks (list[STrack] | np.ndarray): List of tracks, where each track contains embedding features, or an
+            (N, D) array of track features.
+        detections (list[BaseTrack] | np.ndarray): List of detections, where each detection contains embedding
+            features, or an (M, D) array of detection features.
         metric (str): Metric for distance computation. Supported metrics include 'cosine', 'euclidean', etc.
 
     Returns:
@@ -123,10 +252,16 @@ def embedding_distance(tracks: list, detections: list, metric: str = "cosine") -
     cost_matrix = np.zeros((len(tracks), len(detections)), dtype=np.float32)
     if cost_matrix.size == 0:
         return cost_matrix
-    det_features = np.asarray([track.curr_feat for track in detections], dtype=np.float32)
+    if isinstance(detections, np.ndarray):
+        det_features = np.asarray(detections, dtype=np.float32)
+    else:
+        det_features = np.asarray([track.curr_feat for track in detections], dtype=np.float32)
     # for i, track in enumerate(tracks):
     # cost_matrix[i, :] = np.maximum(0.0, cdist(track.smooth_feat.reshape(1,-1), det_features, metric))
-    track_features = np.asarray([track.smooth_feat for track in tracks], dtype=np.float32)
+    if isinstance(tracks, np.ndarray):
+        track_features = np.asarray(tracks, dtype=np.float32)
+    else:
+        track_features = np.asarray([track.smooth_feat for track in tracks], dtype=np.float32)
     cost_matrix = np.maximum(0.0, cdist(track_features, det_features, metric))  # Normalized features
     return cost_matrix
 
@@ -137,7 +272,8 @@ def fuse_score(cost_matrix: np.ndarray, detections: list) -> np.ndarray:
 
     Args:
         cost_matrix (np.ndarray): The matrix containing cost values for assignments, with shape (N, M).
-        detections (list[BaseTrack]): List of detections, each containing a score attribute.
+        detections (list[BaseTrack] | np.ndarray): List of detections, each containing a score attribute, or an array
+            of detection scores.
 
     Returns:
         (np.ndarray): Fused similarity matrix with shape (N, M).
@@ -151,7 +287,7 @@ def fuse_score(cost_matrix: np.ndarray, detections: list) -> np.ndarray:
     if cost_matrix.size == 0:
         return cost_matrix
     iou_sim = 1 - cost_matrix
-    det_scores = np.array([det.score for det in detections])
+    det_scores = detections if isinstance(detections, np.ndarray) else np.array([det.score for det in detections])
     det_scores = np.expand_dims(det_scores, axis=0).repeat(cost_matrix.shape[0], axis=0)
     fuse_sim = iou_sim * det_scores
     return 1 - fuse_sim  # fuse_cost
@@ -0,0 +1,147 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+
+from ultralytics.utils.ops import xywh2xyxy
+
+
+class TinyReID(nn.Module):
+    """
+    Tiny CNN mapping (N, 3, 64, 32) object crops to appearance embeddings.
+
+    Weights are drawn from a fixed seed, so embeddings are reproducible across runs and processes without a download.
+    Random tanh features of crops centered on mid-gray keep their color and vertical layout and are close to orthogonal
+    for different objects. That is enough to tell apart objects whose boxes overlap, but not to re-identify people
+    across cameras; use a trained classification model for that.
+
+    Attributes:
+        conv1 (nn.Conv2d): First stride-2 convolution.
+        conv2 (nn.Conv2d): Second stride-2 convolution.
+        pool (nn.AdaptiveAvgPool2d): Pools features into 4 horizontal stripes.
+        fc (nn.Linear): Projects stripe features to the embedding.
+
+    Examples:
+        >>> model = TinyReID()
+        >>> embeddings = model(torch.rand(8, 3, 64, 32))  # (8, 128)
+    """
+
+    def __init__(self, c=32, dim=128, seed=0):
+        """Initialize the network with `c` hidden channels, `dim` embedding size and weights drawn from `seed`."""
+        super().__init__()
+        self.conv1 = nn.Conv2d(3, c // 2, 3, 2, 1)
+        self.conv2 = nn.Conv2d(c // 2, c, 3, 2, 1)
+        self.pool = nn.AdaptiveAvgPool2d((4, 1))
+        self.fc = nn.Linear(4 * c, dim)
+        g = torch.Generator().manual_seed(seed)
+        for m in self.conv1, self.conv2, self.fc:
+            m.weight.data = torch.randn(m.weight.shape, generator=g) * (2 / m.weight[0].numel()) ** 0.5  # He init
+            m.bias.data.zero_()
+
+    def forward(self, x):
+        """Returns (N, dim) embeddings of (N, 3, H, W) RGB crops in the 0-1 range."""
+        x = torch.tanh(self.conv1(x - 0.5))
+        x = torch.tanh(self.conv2(x))
+        return self.fc(self.pool(x).flatten(1))
+
+
+class ReID:
+    """
+    Appearance encoder for BOTSORT, embedding all detections of a frame in one batched forward pass.
+
+    Crops are resized into one uint8 batch and embedded by the tiny CNN or by the penultimate layer of a YOLO
+    classification model in a single forward pass.
+
+    Attributes:
+        model (nn.Module): Embedding network.
+        imgsz (tuple): Crop (height, width).
+        embed (List[int] | None): Embedding layer index of a YOLO classification model, None for TinyReID.
+        device (torch.device): Inference device.
+
+    Methods:
+        crop: Cut and resize the boxes of a frame into a batch of crops.
+        __call__: Return L2-normalized embeddings of a frame's detections.
+
+    Examples:
+        >>> encoder = ReID()  # tiny CNN
+        >>> encoder = ReID("yolo11n-cls.pt")  # YOLO classification model embeddings
+        >>> features = encoder(img, dets)  # (N, D) for (N, 4+) xywh detections of a BGR frame
+    """
+
+    def __init__(self, model="auto", device="cpu"):
+        """
+        Initialize the encoder.
+
+        Args:
+            model (str | Path): 'auto' for the tiny CNN, or a YOLO classification model, i.e. 'yolo11n-cls.pt'.
+            device (str | torch.device): Inference device.
+        """
+        self.device = torch.device(device)
+        if model in {None, "auto"}:
+            self.model, self.imgsz, self.embed = TinyReID(), (64, 32), None
+        else:
+            from ultralytics import YOLO
+
+            yolo = YOLO(model)
+            s = yolo.overrides.get("imgsz", 224)  # training size of *.pt checkpoints
+            self.model, self.imgsz, self.embed = yolo.model, (s, s), [len(yolo.model.model) - 2]  # before Classify
+        self.model = self.model.float().eval().to(self.device)
+
+    def crop(self, img, boxes):
+        """Return (N, 3, *imgsz) RGB crops of (N, 4) xyxy boxes from a BGR uint8 frame, zero outside the frame."""
+        h, w = img.shape[:2]
+        crops = np.zeros((len(boxes), *self.imgsz, 3), dtype=np.uint8)
+        for i, (x1, y1, x2, y2) in enumerate(np.asarray(boxes).round().astype(int).clip(0, [w, h, w, h])):
+            if x2 > x1 and y2 > y1:
+                crops[i] = cv2.resize(img[y1:y2, x1:x2], self.imgsz[::-1], interpolation=cv2.INTER_LINEAR)
+        x = torch.from_numpy(crops).to(self.device).permute(0, 3, 1, 2).flip(1)  # BGR to RGB
+        return x.float() / 255
+
+    @torch.inference_mode()
+    def __call__(self, img, dets):
+        """
+        Embed detections.
+
+        Args:
+            img (np.ndarray): BGR frame.
+            dets (np.ndarray): (N, 4+) detections starting with xywh boxes, N > 0.
+
+        Returns:
+            (np.ndarray): (N, D) float32 L2-normalized embeddings.
+        """
+        x = self.crop(img, xywh2xyxy(np.asarray(dets, dtype=np.float32)[:, :4]))
+        y = self.model(x) if self.embed is None else torch.stack(self.model(x, embed=self.embed))
+        return nn.functional.normalize(y.float(), dim=1).cpu().numpy()
+
+
+def pool_boxes(feats, strides, boxes, shapes):
+    """
+    Pool detector feature maps inside detection boxes, giving appearance features without a second network.
+
+    Each box is mapped from its original image into the letterboxed model input, RoI-aligned to one cell on every
+    feature level and the levels are concatenated.
+
+    Args:
+        feats (List[torch.Tensor]): (B, C_i, H_i, W_i) feature maps entering the detection head.
+        strides (torch.Tensor): Stride of each feature level.
+        boxes (List[torch.Tensor]): (N_j, 4) xyxy boxes of each image in original image coordinates.
+        shapes (List[tuple]): Original (height, width) of each image.
+
+    Returns:
+        (List[np.ndarray]): (N_j, sum(C_i)) float32 L2-normalized features of each image.
+    """
+    from torchvision.ops import roi_align  # scope for faster 'import ultralytics'
+
+    h, w = (x * int(strides[0]) for x in feats[0].shape[2:])  # model input shape
+    rois = []
+    for b, (xyxy, (h0, w0)) in enumerate(zip(boxes, shapes)):
+        gain = min(h / h0, w / w0)
+        pad = torch.tensor([round((w - w0 * gain) / 2 - 0.1), round((h - h0 * gain) / 2 - 0.1)] * 2)
+        xyxy = torch.as_tensor(xyxy, dtype=torch.float32).cpu() * gain + pad  # inverse of ops.scale_boxes
+        rois.append(torch.cat([torch.full((len(xyxy), 1), b), xyxy], 1))
+    rois = torch.cat(rois).to(feats[0].device)
+    y = torch.cat([roi_align(f.float(), rois, 1, 1 / float(s), 2, True).flatten(1) for f, s in zip(feats, strides)], 1)
+    y = nn.functional.normalize(y, dim=1).cpu().numpy()
+    return np.split(y, np.cumsum([len(x) for x in boxes])[:-1])
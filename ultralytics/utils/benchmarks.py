@@ -6,6 +6,11 @@ Usage:
     from ultralytics.utils.benchmarks import ProfileModels, benchmark
     ProfileModels(['yolov8n.yaml', 'yolov8s.yaml']).profile()
     benchmark(model='yolov8n.pt', imgsz=160)
+    benchmark_area_attention(imgsz=640, device='cpu')
+    benchmark_nms(batch_sizes=(1, 8, 32), candidates=(100, 1000, 8400), device='cpu')
+    benchmark_reid(models=('auto', 'yolo11n-cls.pt'))
+    benchmark_association(objects=(100, 1000, 3000))
+    benchmark_gmc(max_size=960, min_motion=1.0)
 
 Format                  | `format=argument`         | Model
 ---                     | ---                       | ---
@@ -26,21 +31,36 @@ NCNN                    | `ncnn`                    | yolov8n_ncnn_model/
 """
 
 import glob
+import math
 import os
 import platform
 import re
 import shutil
+import threading
 import time
 from pathlib import Path
 
+import cv2
 import numpy as np
 import torch.cuda
 import yaml
 
 from ultralytics import YOLO, YOLOWorld
-from ultralytics.cfg import TASK2DATA, TASK2METRIC
+from ultralytics.cfg import TASK2DATA, TASK2METRIC, get_cfg
 from ultralytics.engine.exporter import export_formats
-from ultralytics.utils import ARM64, ASSETS, IS_JETSON, IS_RASPBERRYPI, LINUX, LOGGER, MACOS, TQDM, WEIGHTS_DIR
+from ultralytics.utils import (
+    ARM64,
+    ASSETS,
+    DEFAULT_CFG,
+    IS_JETSON,
+    IS_RASPBERRYPI,
+    LINUX,
+    LOGGER,
+    MACOS,
+    TQDM,
+    WEIGHTS_DIR,
+    ops,
+)
 from ultralytics.utils.checks import IS_PYTHON_3_12, check_requirements, check_yolo
 from ultralytics.utils.downloads import safe_download
 from ultralytics.utils.files import file_size
@@ -177,6 +197,530 @@ def benchmark(
     return df
 
 
+class PeakMemory:
+    """
+    Context manager measuring peak memory use above the level at entry.
+
+    On CUDA devices the caching allocator statistics are used, on CPU the process resident set size (RSS) is sampled
+    on a background thread, so short-lived allocations below the sampling interval may be missed.
+
+    Attributes:
+        peak (int): Peak memory in bytes above the baseline measured on entry.
+
+    Examples:
+        >>> with PeakMemory("cpu") as mem:
+        ...     x = torch.zeros(1024, 1024)
+        >>> print(f"{mem.peak / 2**20:.1f} MB")
+    """
+
+    def __init__(self, device="cpu", interval=1e-3):
+        """Initialize the context manager for a torch device, with an RSS sampling interval in seconds for CPU."""
+        self.device = torch.device(device)
+        self.interval = interval
+        self.peak = 0
+
+    def __enter__(self):
+        """Record the baseline memory and start tracking the peak."""
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+            torch.cuda.reset_peak_memory_stats(self.device)
+            self.base = torch.cuda.memory_allocated(self.device)
+        else:
+            import psutil  # scope for faster 'import ultralytics'
+
+            self.process = psutil.Process()
+            self.base = self.max_rss = self.process.memory_info().rss
+            self.running = True
+            self.thread = threading.Thread(target=self._sample, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        """Stop tracking and store the peak memory above the baseline in bytes."""
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+            peak = torch.cuda.max_memory_allocated(self.device)
+        else:
+            self.running = False
+            self.thread.join()
+            peak = max(self.max_rss, self.process.memory_info().rss)
+        self.peak = max(peak - self.base, 0)
+
+    def _sample(self):
+        """Sample the process RSS until stopped."""
+        while self.running:
+            self.max_rss = max(self.max_rss, self.process.memory_info().rss)
+            time.sleep(self.interval)
+
+
+def benchmark_area_attention(imgsz=640, batch=1, scales="nsmlx", device="cpu", half=False, runs=10, warmup=2):
+    """
+    Benchmark the AAttn attention backends inside the YOLOv12 P4 A2C2f block for each model scale.
+
+    Args:
+        imgsz (int): Input image size, the block runs on the stride 16 feature map of this size.
+        batch (int): Batch size.
+        scales (str): Model scales to benchmark, any of 'nsmlx'.
+        device (str): Device to run the benchmark on, i.e. 'cpu' or 'cuda:0'.
+        half (bool): Use FP16 on CUDA devices.
+        runs (int): Number of timed forward passes per backend.
+        warmup (int): Number of untimed forward passes per backend.
+
+    Returns:
+        (pandas.DataFrame): Latency, peak memory and max absolute difference to the 'explicit' reference backend for
+            every scale and available backend.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_area_attention
+        >>> benchmark_area_attention(imgsz=640, scales="ns", device="cpu")
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.nn.modules.block import USE_FLASH_ATTN, USE_SDPA, A2C2f, AAttn
+    from ultralytics.nn.tasks import yaml_model_load
+    from ultralytics.utils.ops import make_divisible
+
+    device = select_device(device, verbose=False)
+    dtype = torch.float16 if half and device.type == "cuda" else torch.float32
+    backends = ["explicit"]  # reference backend first
+    if USE_SDPA:
+        backends.append("sdpa")
+    if USE_FLASH_ATTN and device.type == "cuda":
+        backends.append("flash")
+
+    y = []
+    for scale in scales:
+        depth, width, max_channels = yaml_model_load(f"yolov12{scale}.yaml")["scales"][scale]
+        c = make_divisible(min(512, max_channels) * width, 8)  # P4 A2C2f channels, i.e. [512, True, 4]
+        m = A2C2f(c, c, max(round(4 * depth), 1), True, 4).to(device, dtype).eval()
+        x = torch.randn(batch, c, imgsz // 16, imgsz // 16, device=device, dtype=dtype)
+        ref = None
+        for backend in backends:
+            for a in m.modules():
+                if isinstance(a, AAttn):
+                    a.backend = backend
+            with torch.inference_mode():
+                for _ in range(warmup):
+                    out = m(x)
+                with PeakMemory(device) as mem:
+                    t = time.perf_counter()
+                    for _ in range(runs):
+                        out = m(x)
+                    if device.type == "cuda":
+                        torch.cuda.synchronize(device)
+                    t = (time.perf_counter() - t) / runs
+            ref = out if ref is None else ref
+            diff = (out.float() - ref.float()).abs().max().item()
+            y.append([f"yolov12{scale}", c, backend, round(t * 1000, 2), round(mem.peak / 2**20, 1), diff])
+
+    df = pd.DataFrame(y, columns=["Model", "Channels", "Backend", "Latency (ms)", "Peak memory (MB)", "Max abs diff"])
+    LOGGER.info(f"\nA2C2f area-attention benchmarks at imgsz={imgsz}, batch={batch} on {device}\n{df}\n")
+    return df
+
+
+def benchmark_nms(batch_sizes=(1, 8, 32), candidates=(100, 1000, 8400), nc=80, anchors=8400, device="cpu", runs=10):
+    """
+    Benchmark batched non_max_suppression() against the per-image NMS loop.
+
+    Args:
+        batch_sizes (tuple): Batch sizes to benchmark.
+        candidates (tuple): Numbers of boxes per image above the confidence threshold.
+        nc (int): Number of classes.
+        anchors (int): Number of predicted boxes per image, i.e. 8400 for a 640 image.
+        device (str): Device to run the benchmark on, i.e. 'cpu' or 'cuda:0'.
+        runs (int): Number of timed runs per setting.
+
+    Returns:
+        (pandas.DataFrame): Per-batch latency of both paths, speedup and whether the kept detections match.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_nms
+        >>> benchmark_nms(batch_sizes=(1, 32), candidates=(1000,))
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.utils.ops import non_max_suppression
+
+    device = select_device(device, verbose=False)
+    y = []
+    for bs in batch_sizes:
+        for n in candidates:
+            xy, wh = torch.rand(bs, 2, anchors) * 640, torch.rand(bs, 2, anchors) * 128 + 2
+            scores = torch.rand(bs, nc, anchors) * 0.2  # below conf_thres=0.25
+            for b in range(bs):  # n candidates per image with one confident class
+                i = torch.randperm(anchors)[: min(n, anchors)]
+                scores[b, torch.randint(nc, (len(i),)), i] = 0.25 + 0.75 * torch.rand(len(i))
+            prediction = torch.cat((xy, wh, scores), 1).to(device)
+
+            t, outputs = [], []
+            for batched in False, True:
+                out = non_max_suppression(prediction.clone(), batched=batched, max_time_img=60)  # warmup
+                dt = ops.Profile(device=device)
+                for _ in range(runs):
+                    x = prediction.clone()
+                    with dt:
+                        out = non_max_suppression(x, batched=batched, max_time_img=60)
+                t.append(dt.t / runs * 1000)
+                outputs.append(out)
+            match = all(sorted(a.tolist()) == sorted(b.tolist()) for a, b in zip(*outputs))
+            y.append([bs, n, round(t[0], 2), round(t[1], 2), round(t[0] / t[1], 2), match])
+
+    df = pd.DataFrame(y, columns=["Batch", "Candidates", "Loop (ms)", "Batched (ms)", "Speedup", "Match"])
+    LOGGER.info(f"\nNMS benchmarks with {nc} classes and {anchors} anchors on {device}\n{df}\n")
+    return df
+
+
+def _pool_worker(model, pool, imgsz, device, t0, results):
+    """Load a model in a worker process, run one prediction and report cold start time and memory."""
+    import psutil  # scope for faster 'import ultralytics'
+
+    im = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    if pool is None:
+        YOLO(model).predict(im, imgsz=imgsz, device=device, verbose=False)
+    else:
+        pool.predict(model, im, device=device, imgsz=imgsz, verbose=False)
+    t = time.time() - t0
+    mem = psutil.Process().memory_full_info()
+    results.put((t, mem.rss, getattr(mem, "uss", mem.rss)))
+
+
+def benchmark_model_pool(model="yolo11n.pt", workers=2, imgsz=640, device="cpu"):
+    """
+    Benchmark cold start time and per-worker memory of spawned inference workers with and without a ModelPool.
+
+    Without a pool every worker unpickles and fuses its own copy of the checkpoint. With a pool the parent loads it
+    once into shared memory and workers receive the shared weights, so their unique memory (USS) excludes the weights.
+
+    Args:
+        model (str | Path): PyTorch *.pt weights.
+        workers (int): Number of concurrent worker processes.
+        imgsz (int): Inference image size.
+        device (str): Device to run the workers on, i.e. 'cpu' or 'cuda:0'.
+
+    Returns:
+        (pandas.DataFrame): Parent load time, mean worker cold start from process start to first result, and mean
+            worker resident (RSS) and unique (USS) memory for each mode.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_model_pool
+        >>> if __name__ == "__main__":  # required for spawned workers
+        ...     benchmark_model_pool("yolo11n.pt", workers=4)
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.engine.pool import ModelPool
+
+    ctx = torch.multiprocessing.get_context("spawn")
+    y = []
+    for mode in "YOLO", "ModelPool":
+        t = time.perf_counter()
+        pool = None
+        if mode == "ModelPool":
+            pool = ModelPool()
+            pool.load(model)
+        load = time.perf_counter() - t
+        results, t0 = ctx.Queue(), time.time()
+        procs = [
+            ctx.Process(target=_pool_worker, args=(model, pool, imgsz, device, t0, results)) for _ in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        stats = np.array([results.get() for _ in procs])
+        for p in procs:
+            p.join()
+        t, rss, uss = stats.mean(0)
+        y.append([mode, workers, round(load, 2), round(t, 2), round(rss / 2**20, 1), round(uss / 2**20, 1)])
+
+    columns = ["Mode", "Workers", "Load (s)", "Cold start (s)", "RSS/worker (MB)", "USS/worker (MB)"]
+    df = pd.DataFrame(y, columns=columns)
+    LOGGER.info(f"\nModelPool benchmarks for {model} at imgsz={imgsz} on {device}\n{df}\n")
+    return df
+
+
+def benchmark_buckets(model="yolo11n.yaml", data="coco8.yaml", imgsz=640, batch=16, device="cpu", batches=10):
+    """
+    Benchmark padding and training throughput of aspect ratio buckets against square letterboxed batches.
+
+    Args:
+        model (str | Path): Model YAML or *.pt weights to train.
+        data (str): Dataset YAML, the train split is used.
+        imgsz (int): Training image size.
+        batch (int): Batch size.
+        device (str): Device to train on, i.e. 'cpu' or 'cuda:0'.
+        batches (int): Number of timed forward and backward passes, after one warmup batch.
+
+    Returns:
+        (pandas.DataFrame): Batch shapes, pixels per image, share of padding pixels and training images per second for
+            square letterboxes and buckets.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_buckets
+        >>> benchmark_buckets("yolo11n.yaml", data="coco8.yaml", imgsz=640, batch=4)
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.data import build_dataloader, build_yolo_dataset
+    from ultralytics.data.utils import check_det_dataset
+
+    device = select_device(device, verbose=False)
+    data = check_det_dataset(data)
+    net = YOLO(model).model.to(device).train()
+    for p in net.parameters():
+        p.requires_grad_(True)
+    y = []
+    for buckets in False, True:
+        cfg = get_cfg(DEFAULT_CFG, {"imgsz": imgsz, "batch": batch, "buckets": buckets, "workers": 0, "plots": False})
+        net.args = cfg
+        dataset = build_yolo_dataset(cfg, data["train"], batch, data, mode="train")
+        loader = iter(build_dataloader(dataset, batch, workers=0, shuffle=True))
+        shapes, n, t = set(), 0, 0.0
+        for i in range(batches + 1):
+            b = next(loader, None)
+            if b is None:
+                loader = iter(build_dataloader(dataset, batch, workers=0, shuffle=True))
+                b = next(loader)
+            b["img"] = b["img"].to(device).float() / 255
+            shapes.add(tuple(b["img"].shape[2:]))
+            t0 = time.perf_counter()
+            net.loss(b)[0].sum().backward()
+            net.zero_grad(set_to_none=True)
+            if device.type == "cuda":
+                torch.cuda.synchronize(device)
+            if i:  # skip warmup
+                t += time.perf_counter() - t0
+                n += len(b["img"])
+        r = dataset.bucket_report()
+        y.append(
+            [
+                "buckets" if buckets else "square",
+                len(shapes),
+                round(r["pixels"] / r["images"]),
+                f"{r['padding'] / r['pixels']:.1%}",
+                round(n / t, 2),
+            ]
+        )
+
+    df = pd.DataFrame(y, columns=["Batching", "Shapes seen", "Pixels/image", "Padding", "Images/s"])
+    LOGGER.info(f"\nBucket benchmarks for {model} on {data['yaml_file']} at imgsz={imgsz} on {device}\n{df}\n")
+    return df
+
+
+def _tracking_sequence(objects=12, frames=150, imgsz=(384, 640), seed=0):
+    """
+    Render a synthetic tracking sequence of two-colored boxes that meet in pairs, half of the pairs turning back.
+
+    Boxes that turn back while overlapping follow the opposite path to the one a constant velocity Kalman filter
+    predicts, so IoU association alone tends to swap their IDs.
+
+    Args:
+        objects (int): Number of objects, in pairs sharing a row.
+        frames (int): Number of frames.
+        imgsz (tuple): Frame (height, width).
+        seed (int): Random seed.
+
+    Returns:
+        (List[tuple]): (frame, xyxy, ids) for every frame, with the BGR frame, (N, 4) float32 boxes of objects that
+            are at least 40% visible, jittered like detections, and their (N,) ground truth object indices.
+    """
+    rng = np.random.default_rng(seed)
+    h, w = imgsz
+    n = objects // 2 * 2
+    y, x = np.mgrid[:h, :w]
+    background = np.stack([x / w * 80 + 60, y / h * 80 + 60, np.full(x.shape, 90.0)], -1)
+    colors = rng.integers(0, 256, (n, 2, 3))  # top and bottom half
+    size = np.stack([rng.uniform(30, 50, n), rng.uniform(70, 110, n)], 1)
+    speed = rng.uniform(3, 6, n // 2)
+    pos = np.stack([rng.uniform(40, w / 2 - 60, n // 2), rng.uniform(w / 2 + 60, w - 40, n // 2)], 1).reshape(-1)
+    pos = np.stack([pos, np.repeat(rng.uniform(60, h - 60, n // 2), 2) + rng.uniform(-8, 8, n)], 1)
+    vel = np.stack([np.stack([speed, -speed], 1).reshape(-1), rng.normal(0, 0.3, n)], 1)
+    turn = np.repeat(rng.random(n // 2) < 0.5, 2)
+    sequence = []
+    for _ in range(frames):
+        im = (background + rng.normal(0, 8, background.shape)).clip(0, 255).astype(np.uint8)
+        xyxy = np.concatenate([pos - size / 2, pos + size / 2], 1)
+        owner = np.full((h, w), -1)
+        for i in rng.permutation(n):  # random depth order
+            x1, y1, x2, y2 = xyxy[i].round().astype(int).clip(0, [w, h, w, h])
+            im[y1 : (y1 + y2) // 2, x1:x2], im[(y1 + y2) // 2 : y2, x1:x2] = colors[i]
+            owner[y1:y2, x1:x2] = i
+        visible = np.bincount(owner.ravel() + 1, minlength=n + 1)[1:] / size.prod(1) > 0.4
+        boxes = xyxy[visible] + rng.normal(0, 1.5, (visible.sum(), 4))
+        sequence.append((im, boxes.astype(np.float32), np.flatnonzero(visible)))
+        pos += vel
+        a, b = pos[0::2, 0], pos[1::2, 0]
+        met = turn[0::2] & (np.abs(a - b) < 4) & (vel[0::2, 0] * (b - a) > 0)  # still approaching each other
+        vel[np.repeat(met, 2), 0] *= -1
+        vel[(pos[:, 0] < 20) | (pos[:, 0] > w - 20), 0] *= -1  # bounce off frame edges
+    return sequence
+
+
+def benchmark_reid(models=("auto",), objects=12, frames=150, seeds=5):
+    """
+    Benchmark BOTSORT ReID encoders for added latency per frame against the ID switches they avoid.
+
+    Every encoder tracks the same synthetic sequences of objects that meet in pairs, see _tracking_sequence(), next to
+    a baseline without ReID. Global motion compensation is disabled as the synthetic camera is static.
+
+    Args:
+        models (tuple): ReID encoders, 'auto' for the tiny CNN or YOLO classification models, i.e. 'yolo11n-cls.pt'.
+        objects (int): Number of objects per sequence.
+        frames (int): Number of frames per sequence.
+        seeds (int): Number of sequences.
+
+    Returns:
+        (pandas.DataFrame): Tracker latency per frame, latency added over the baseline, total ID switches and number of
+            track IDs for each encoder.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_reid
+        >>> benchmark_reid(models=("auto", "yolo11n-cls.pt"))
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers import BOTSORT
+    from ultralytics.utils import ROOT, IterableSimpleNamespace, yaml_load
+
+    cfg = yaml_load(ROOT / "cfg/trackers/botsort.yaml")
+    sequences = [_tracking_sequence(objects, frames, seed=seed) for seed in range(seeds)]
+    y = []
+    for model in (None, *models):
+        args = IterableSimpleNamespace(**{**cfg, "gmc_method": "none", "with_reid": model is not None, "model": model})
+        t, switches, ids = 0.0, 0, 0
+        for sequence in sequences:
+            tracker, last = BOTSORT(args), {}
+            for im, xyxy, gt in sequence:
+                data = torch.cat([torch.from_numpy(xyxy), torch.tensor([[0.9, 0]]).repeat(len(xyxy), 1)], 1)
+                det = Boxes(data, im.shape[:2]).numpy()
+                t0 = time.perf_counter()
+                tracks = tracker.update(det, im)
+                t += time.perf_counter() - t0
+                for track_id, i in zip(tracks[:, 4].astype(int), tracks[:, -1].astype(int)):
+                    switches += last.get(gt[i], track_id) != track_id
+                    last[gt[i]] = track_id
+            ids += int(tracker.track_count.sum())
+        t = t / (seeds * frames) * 1000
+        y.append([model or "none", round(t, 2), round(t - y[0][1], 2) if y else 0.0, switches, ids])
+
+    df = pd.DataFrame(y, columns=["ReID", "Tracker (ms/frame)", "Added (ms/frame)", "ID switches", "Track IDs"])
+    LOGGER.info(f"\nReID benchmarks on {seeds} synthetic sequences of {objects} objects and {frames} frames\n{df}\n")
+    return df
+
+
+def benchmark_association(objects=(100, 300, 1000, 3000), frames=30, tracker="bytetrack", seed=0):
+    """
+    Benchmark dense against spatially gated tracker association in crowded scenes of increasing object counts.
+
+    Objects are packed on a jittered grid, touching their neighbors, and drift together with detection noise, missed
+    detections and random scores. Each scene is tracked once with dense cost matrices and once with gated association,
+    see BYTETracker.associate(), and the track outputs of every frame are compared.
+
+    Args:
+        objects (tuple): Numbers of objects per scene.
+        frames (int): Number of frames per scene.
+        tracker (str): Tracker config, 'bytetrack' or 'botsort'.
+        seed (int): Random seed.
+
+    Returns:
+        (pandas.DataFrame): Dense and gated tracker latency per frame, speedup and whether both produced identical
+            tracks for each object count.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_association
+        >>> benchmark_association(objects=(100, 1000, 3000), tracker="botsort")
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers import BOTSORT, BYTETracker
+    from ultralytics.utils import ROOT, IterableSimpleNamespace, yaml_load
+
+    args = IterableSimpleNamespace(**{**yaml_load(ROOT / f"cfg/trackers/{tracker}.yaml"), "gmc_method": "none"})
+    rng = np.random.default_rng(seed)
+    y = []
+    for n in objects:
+        side = math.ceil(n**0.5)
+        pos = np.stack(np.divmod(np.arange(n), side), 1)[:, ::-1] * 40.0 + 40 + rng.uniform(-4, 4, (n, 2))
+        size = rng.uniform(36, 48, (n, 2))
+        scene = []
+        for _ in range(frames):
+            pos += [3.0, 1.0]  # conveyor drift
+            keep = rng.random(n) > 0.05
+            xywh = np.concatenate([pos + rng.normal(0, 1.5, (n, 2)), size + rng.normal(0, 1, (n, 2))], 1)[keep]
+            data = np.concatenate([xywh, rng.uniform(0.05, 1, (len(xywh), 1)), np.zeros((len(xywh), 1))], 1)
+            data[:, :4] = ops.xywh2xyxy(data[:, :4])
+            scene.append(Boxes(torch.from_numpy(data).float(), (side * 40 + 400, side * 40 + 400)).numpy())
+        times, outputs = [], []
+        for sparse_min in (float("inf"), 0):
+            t = BYTETracker(args) if tracker == "bytetrack" else BOTSORT(args)
+            t.sparse_min = sparse_min
+            t0 = time.perf_counter()
+            outputs.append([t.update(det) for det in scene])
+            times.append((time.perf_counter() - t0) / frames * 1000)
+        same = all(a.shape == b.shape and (a == b).all() for a, b in zip(*outputs))
+        y.append([n, round(times[0], 2), round(times[1], 2), round(times[0] / times[1], 2), same])
+
+    df = pd.DataFrame(y, columns=["Objects", "Dense (ms/frame)", "Gated (ms/frame)", "Speedup", "Identical"])
+    LOGGER.info(f"\n{tracker} association benchmarks on {frames} frames of crowded scenes\n{df}\n")
+    return df
+
+
+def benchmark_gmc(methods=("sparseOptFlow", "orb", "ecc"), sizes=((1080, 1920), (2160, 3840)), frames=30, **kwargs):
+    """
+    Benchmark global motion compensation latency and accuracy on synthetic panning video with moving objects.
+
+    Frames are crops of an upscaled, textured asset image shifted by a constant camera motion, with colored boxes moving
+    independently that are passed to GMC as detections.
+
+    Args:
+        methods (tuple): GMC methods, any of 'sparseOptFlow', 'orb', 'sift' and 'ecc'.
+        sizes (tuple): Frame (height, width) sizes.
+        frames (int): Number of frames per sequence.
+        **kwargs (Any): Other GMC arguments, i.e. max_size=960 or min_motion=1.0.
+
+    Returns:
+        (pandas.DataFrame): Latency per frame and mean error of the estimated camera translation for each method and
+            frame size.
+
+    Examples:
+        >>> from ultralytics.utils.benchmarks import benchmark_gmc
+        >>> benchmark_gmc(methods=("sparseOptFlow",), max_size=960, min_motion=1.0)
+    """
+    import pandas as pd  # scope for faster 'import ultralytics'
+
+    from ultralytics.trackers.utils.gmc import GMC
+
+    rng = np.random.default_rng(0)
+    y = []
+    for h, w in sizes:
+        base = cv2.resize(cv2.imread(str(ASSETS / "bus.jpg")), (w * 2, h * 2))
+        noise = cv2.GaussianBlur(rng.integers(0, 256, base.shape, dtype=np.uint8), (0, 0), 3)
+        base = cv2.addWeighted(base, 0.7, noise, 0.6, 0)  # texture for the flat regions of the image
+        shift = np.array([4, 2])  # camera motion in pixels per frame
+        pos, vel = rng.uniform(0, 1, (15, 2)) * [w, h], rng.normal(0, 15, (15, 2))
+        size = rng.uniform(60, 200, (15, 2)) * w / 1920
+        sequence = []
+        for t in range(frames):
+            frame = np.ascontiguousarray(base[t * shift[1] : t * shift[1] + h, t * shift[0] : t * shift[0] + w])
+            pos = (pos + vel) % [w, h]
+            for (x1, y1), (x2, y2), c in zip(pos - size / 2, pos + size / 2, rng.integers(0, 256, (15, 3)).tolist()):
+                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), c, -1)
+            sequence.append((frame, np.concatenate([pos, size, np.arange(15)[:, None]], 1)))
+        for method in methods:
+            gmc, latency, error = GMC(method, **kwargs), 0.0, 0.0
+            for frame, dets in sequence:
+                H = gmc.apply(frame, dets)
+                latency += gmc.latency
+                error += np.abs(H[:, 2] + shift).sum()  # content moves against the camera
+            error -= np.abs(shift).sum()  # first frame returns the identity
+            n = frames - 1
+            y.append([method, f"{w}x{h}", round(latency / frames, 2), round(error / n, 3)])
+
+    df = pd.DataFrame(y, columns=["Method", "Frame", "Latency (ms/frame)", "Error (px/frame)"])
+    LOGGER.info(f"\nGMC benchmarks on {frames} frames of synthetic panning video {kwargs or ''}\n{df}\n")
+    return df
+
+
 class RF100Benchmark:
     """Benchmark YOLO model performance across various formats for speed and accuracy."""
 
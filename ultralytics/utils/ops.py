@@ -179,6 +179,7 @@ def non_max_suppression(
     max_wh=7680,
     in_place=True,
     rotated=False,
+    batched=True,
 ):
     """
     Perform non-maximum suppression (NMS) on a set of boxes, with support for masks and multiple labels per box.
@@ -200,11 +201,13 @@ def non_max_suppression(
             output by a dataloader, with each label being a tuple of (class_index, x1, y1, x2, y2).
         max_det (int): The maximum number of boxes to keep after NMS.
         nc (int, optional): The number of classes output by the model. Any indices after this will be considered masks.
-        max_time_img (float): The maximum time (seconds) for processing one image.
-        max_nms (int): The maximum number of boxes into torchvision.ops.nms().
+        max_time_img (float): The maximum time (seconds) for processing one image, only used if batched=False.
+        max_nms (int): The maximum number of boxes per image into torchvision.ops.nms().
         max_wh (int): The maximum box width and height in pixels.
         in_place (bool): If True, the input prediction tensor will be modified in place.
         rotated (bool): If Oriented Bounding Boxes (OBB) are being passed for NMS.
+        batched (bool): If True, filter the whole batch at once and run NMS with boxes offset by image and class, see
+            batched_nms(), otherwise loop over images with a time limit. Apriori labels always use the per-image loop.
 
     Returns:
         (List[torch.Tensor]): A list of length batch_size, where each element is a tensor of
@@ -245,6 +248,11 @@ def non_max_suppression(
         else:
             prediction = torch.cat((xywh2xyxy(prediction[..., :4]), prediction[..., 4:]), dim=-1)  # xywh to xyxy
 
+    if batched and not labels:
+        return batched_nms(
+            prediction, xc, conf_thres, iou_thres, classes, agnostic, multi_label, max_det, nc, max_nms, max_wh, rotated
+        )
+
     t = time.time()
     output = [torch.zeros((0, 6 + nm), device=prediction.device)] * bs
     for xi, x in enumerate(prediction):  # image index, image inference
@@ -316,6 +324,111 @@ def non_max_suppression(
     return output
 
 
+def batched_nms(
+    prediction,
+    xc,
+    conf_thres=0.25,
+    iou_thres=0.45,
+    classes=None,
+    agnostic=False,
+    multi_label=False,
+    max_det=300,
+    nc=80,
+    max_nms=30000,
+    max_wh=7680,
+    rotated=False,
+):
+    """
+    Vectorised NMS over a whole batch with a single NMS call, used by non_max_suppression().
+
+    Boxes are offset by class exactly as in the per-image loop and then by image index in float64, so boxes from
+    different images never overlap and the kept detections match the per-image results. As NMS cost grows with the
+    square of the number of boxes per call, large batches (over 1000 boxes on CPU, 20000 on CUDA) and rotated boxes
+    call NMS once per image on the image-grouped boxes instead, skipping the Python per-image filtering either way.
+
+    Args:
+        prediction (torch.Tensor): Predictions of shape (batch_size, num_boxes, 4 + num_classes + num_masks) with xyxy
+            boxes, or xywh boxes if rotated.
+        xc (torch.Tensor): Boolean candidate mask of shape (batch_size, num_boxes).
+        conf_thres (float): The confidence threshold below which boxes will be filtered out.
+        iou_thres (float): The IoU threshold below which boxes will be filtered out during NMS.
+        classes (torch.Tensor, optional): Class indices to consider.
+        agnostic (bool): If True, all classes will be considered as one.
+        multi_label (bool): If True, each box may have multiple labels.
+        max_det (int): The maximum number of boxes to keep per image.
+        nc (int): The number of classes output by the model.
+        max_nms (int): The maximum number of boxes per image into NMS.
+        max_wh (int): The maximum box width and height in pixels.
+        rotated (bool): If Oriented Bounding Boxes (OBB) are being passed for NMS.
+
+    Returns:
+        (List[torch.Tensor]): A list of length batch_size with tensors of shape (num_boxes, 6 + num_masks).
+    """
+    import torchvision  # scope for faster 'import ultralytics'
+
+    bs = prediction.shape[0]
+    nm = prediction.shape[2] - nc - 4  # number of masks
+    b, a = xc.nonzero(as_tuple=True)  # image and anchor indices of candidates
+    x = prediction[b, a]
+
+    # Detections matrix nx6 (xyxy, conf, cls)
+    box, cls, mask = x.split((4, nc, nm), 1)
+    if multi_label:
+        i, j = torch.where(cls > conf_thres)
+        x, b = torch.cat((box[i], x[i, 4 + j, None], j[:, None].float(), mask[i]), 1), b[i]
+    else:  # best class only
+        conf, j = cls.max(1, keepdim=True)
+        keep = conf.view(-1) > conf_thres
+        x, b = torch.cat((box, conf, j.float(), mask), 1)[keep], b[keep]
+
+    # Filter by class
+    if classes is not None:
+        keep = (x[:, 5:6] == classes).any(1)
+        x, b = x[keep], b[keep]
+    if not x.shape[0]:  # no boxes
+        return [torch.zeros((0, 6 + nm), device=prediction.device)] * bs
+
+    # Limit boxes per image to the max_nms most confident
+    if x.shape[0] > max_nms:
+        order = x[:, 4].argsort(descending=True)
+        order = order[b[order].sort(stable=True)[1]]  # group by image, by descending confidence within each image
+        x, b = x[order], b[order]
+        counts = torch.bincount(b, minlength=bs)
+        rank = torch.arange(len(b), device=b.device) - (counts.cumsum(0) - counts)[b]
+        x, b = x[rank < max_nms], b[rank < max_nms]
+
+    # Batched NMS
+    c = x[:, 5:6] * (0 if agnostic else max_wh)  # classes
+    scores = x[:, 4]  # scores
+    if rotated:
+        boxes = torch.cat((x[:, :2] + c, x[:, 2:4], x[:, -1:]), dim=-1)  # xywhr
+    else:
+        boxes = x[:, :4] + c  # boxes (offset by class)
+    if rotated or len(boxes) > (20000 if boxes.device.type == "cuda" else 1000):
+        # NMS cost grows with the square of the boxes per call, so large batches use one call per image
+        counts = torch.bincount(b, minlength=bs).tolist()
+        starts = np.cumsum([0] + counts[:-1]).tolist()
+        nms = nms_rotated if rotated else torchvision.ops.nms
+        i = torch.cat(
+            [
+                nms(bx, sc, iou_thres) + s
+                for bx, sc, s in zip(boxes.split(counts), scores.split(counts), starts)
+                if len(bx)
+            ]
+        )
+    else:  # single call, float64 image offsets keep the float32 class-offset coordinates exact (no float64 on MPS)
+        boxes = boxes.to(torch.float32 if boxes.device.type == "mps" else torch.float64)
+        boxes = boxes + b[:, None] * (boxes.max() - boxes.min() + 1)  # boxes (offset by image)
+        i = torchvision.ops.nms(boxes, scores.to(boxes.dtype), iou_thres)  # NMS, sorted by descending score
+
+    # Split per image, limit detections
+    bi, order = b[i].sort(stable=True)
+    i = i[order]
+    counts = torch.bincount(bi, minlength=bs)
+    rank = torch.arange(len(bi), device=bi.device) - (counts.cumsum(0) - counts)[bi]
+    return list(x[i[rank < max_det]].split(counts.clamp(max=max_det).tolist()))
+
+
 def clip_boxes(boxes, shape):
     """
     Takes a list of bounding boxes and a shape (height, width) and clips the bounding boxes to the shape.
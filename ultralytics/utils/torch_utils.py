@@ -1,9 +1,11 @@
 # Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
 
 import gc
+import io
 import math
 import os
 import random
+import threading
 import time
 from contextlib import contextmanager
 from copy import deepcopy
@@ -350,6 +352,7 @@ def model_info_for_loggers(trainer):
     if trainer.args.profile:  # profile ONNX and TensorRT times
         from ultralytics.utils.benchmarks import ProfileModels
 
+        trainer.checkpoint_writer.flush()  # wait for the background write of last.pt
         results = ProfileModels([trainer.last], device=trainer.device).profile()[0]
         results.pop("model/name")
     else:  # only return PyTorch times from most recent validation
@@ -756,6 +759,77 @@ class EarlyStopping:
         return stop
 
 
+class CheckpointWriter:
+    """
+    Writer that saves training checkpoints on a background thread so training continues while they are written.
+
+    Callers pass a checkpoint already copied to CPU. It is serialized once and written to a temporary file next to every
+    target, which is then atomically renamed over the target so readers never see a partial checkpoint. At most one
+    save is in flight: a new save first waits for the previous one, and a background write error is raised by the next
+    `save` or `flush` call. The writer thread is not a daemon, so a pending save also completes at interpreter exit.
+
+    Attributes:
+        background (bool): Write on a background thread, else synchronously in `save`.
+        thread (threading.Thread | None): The in-flight write, if any.
+        error (Exception | None): Error of the last background write, raised by the next `save` or `flush`.
+
+    Examples:
+        >>> writer = CheckpointWriter()
+        >>> writer.save({"epoch": 0, "ema": deepcopy(model).half().cpu()}, [Path("last.pt"), Path("best.pt")])
+        >>> writer.flush()  # wait for the write and raise its error, if any
+    """
+
+    def __init__(self, background=True):
+        """Initialize the writer, writing in the background if `background`."""
+        self.background = background
+        self.thread = None
+        self.error = None
+
+    def save(self, ckpt, files):
+        """
+        Save a checkpoint to files once the previous save is complete.
+
+        Args:
+            ckpt (dict): Checkpoint holding CPU copies only, as training goes on while it is written.
+            files (List[Path]): Target files, i.e. last.pt and best.pt.
+        """
+        self.flush()
+        if self.background:
+            self.thread = threading.Thread(target=self._run, args=(ckpt, files), name="CheckpointWriter")
+            self.thread.start()
+        else:
+            self.write(ckpt, files)
+
+    def flush(self):
+        """Wait for the in-flight save to complete and raise its error, if any."""
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            e, self.error = self.error, None
+            raise e
+
+    def _run(self, ckpt, files):
+        """Write a checkpoint, keeping any error for the next `save` or `flush` call."""
+        try:
+            self.write(ckpt, files)
+        except Exception as e:
+            self.error = e
+
+    @staticmethod
+    def write(ckpt, files):
+        """Serialize a checkpoint once and write it to every file through a temporary file and an atomic rename."""
+        buffer = io.BytesIO()
+        torch.save(ckpt, buffer)
+        for f in files:
+            tmp = f.with_name(f"{f.name}.tmp")
+            with open(tmp, "wb") as file:
+                file.write(buffer.getbuffer())
+                file.flush()
+                os.fsync(file.fileno())  # on disk before the rename makes it visible
+            os.replace(tmp, f)
+
+
 class FXModel(nn.Module):
     """
     A custom model class for torch.fx compatibility.